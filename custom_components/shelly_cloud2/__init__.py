@@ -3,30 +3,124 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import logging
+import math
+import time
 from datetime import timedelta
-from typing import Any, Dict, List
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Tuple
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
 )
+from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN,
     CONF_SERVER,
     CONF_AUTH_KEY,
     CONF_DEVICE_IDS,
+    CONF_DEDICATED_SESSION,
+    CONF_CHUNK_SIZE_MIN,
+    CONF_CHUNK_SIZE_MAX,
+    CONF_REFRESH_DEBOUNCE,
+    CONF_CAPTURE_TRACE,
+    CONF_LOG_REQUEST_SPANS,
+    CONF_SENSOR_DEADBANDS,
+    CONF_SENSOR_MIN_INTERVAL,
+    CONF_SENSOR_MAX_SILENCE,
+    CONF_LOCAL_HOSTS,
+    CONF_POWER_STATISTICS,
+    CONF_FLEET_AGGREGATES,
+    CONF_DEVICE_TAGS,
     DEFAULT_SCAN_INTERVAL,
+    EVENT_INPUT,
+    CONVERGE_INITIAL_DELAY,
+    CONVERGE_MAX_DELAY,
+    CONVERGE_TIMEOUT,
+    DEFAULT_CHUNK_SIZE_MIN,
+    DEFAULT_CHUNK_SIZE_MAX,
+    DEFAULT_REFRESH_DEBOUNCE,
+    DEFAULT_SENSOR_DEADBANDS,
+    DEFAULT_SENSOR_MIN_INTERVAL,
+    DEFAULT_SENSOR_MAX_SILENCE,
+    DEFAULT_LOCAL_HOSTS,
+    DEFAULT_DEVICE_TAGS,
+    OFFLINE_BACKOFF_INITIAL,
+    OFFLINE_BACKOFF_MAX,
+    POWER_STATS_WINDOWS,
 )
+from .aggregate import Contribution, FleetAggregates, parse_device_tags
+from .client import ControlRequest, SetCoverRequest, SetLightRequest, SetSwitchRequest
+from .components import Component, find_components
+from .device import DeviceMeta
+from .energy import EnergyMeters
+from .engine import ShellyCloud2FetchEngine
+from .filters import SensorWriteFilter, parse_deadbands
+from .local import LocalTransport, LocalUnavailable, parse_local_hosts
+from .plan import EntityPlan, classify, payload_shape
+from .profiling import PHASE_STATE_EXTRACTION, PHASE_STATE_WRITES, CycleProfiler
+from .projection import StatePath, StateProjection
+from .recording import TraceRecorder
+from .stats import PowerStatistics
+from .services import async_setup_services
+from .tracing import LogSpanExporter, SpanExporter
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.SWITCH, Platform.BINARY_SENSOR]
+PLATFORMS: list[Platform] = [
+    Platform.SENSOR,
+    Platform.SWITCH,
+    Platform.BINARY_SENSOR,
+    Platform.COVER,
+    Platform.LIGHT,
+    Platform.EVENT,
+]
+
+
+# Signature of a platform's async_setup_entry
+PlatformSetup = Callable[
+    [HomeAssistant, ConfigEntry, AddEntitiesCallback], Awaitable[None]
+]
+
+
+def timed_platform_setup(platform: str) -> Callable[[PlatformSetup], PlatformSetup]:
+    """Record how long a platform's async_setup_entry takes on the hub."""
+
+    def decorator(setup: PlatformSetup) -> PlatformSetup:
+        @functools.wraps(setup)
+        async def _async_setup_entry(
+            hass: HomeAssistant,
+            entry: ConfigEntry,
+            async_add_entities: AddEntitiesCallback,
+        ) -> None:
+            started = time.perf_counter()
+            try:
+                await setup(hass, entry, async_add_entities)
+            finally:
+                hub = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+                if hub is not None:
+                    hub.platform_setup_times[platform] = (
+                        time.perf_counter() - started
+                    )
+
+        return _async_setup_entry
+
+    return decorator
+
+
+def _is_offline(state: Dict[str, Any]) -> bool:
+    """Return True if the cloud reports the device as disconnected."""
+    if state.get("online") == 0:
+        return True
+    cloud = state.get("status", {}).get("cloud", {})
+    return isinstance(cloud, dict) and not cloud.get("connected", True)
 
 
 class ShellyCloud2Hub(DataUpdateCoordinator[Dict[str, Any]]):
@@ -38,6 +132,15 @@ class ShellyCloud2Hub(DataUpdateCoordinator[Dict[str, Any]]):
         server: str,
         auth_key: str,
         device_ids: List[str],
+        dedicated_session: bool = False,
+        chunk_size_min: int = DEFAULT_CHUNK_SIZE_MIN,
+        chunk_size_max: int = DEFAULT_CHUNK_SIZE_MAX,
+        refresh_debounce: float = DEFAULT_REFRESH_DEBOUNCE,
+        sensor_filter: SensorWriteFilter | None = None,
+        local_hosts: Dict[str, str] | None = None,
+        power_statistics: bool = False,
+        energy: EnergyMeters | None = None,
+        aggregates: FleetAggregates | None = None,
     ) -> None:
         """Initialize the coordinator."""
         self.hass = hass
@@ -45,12 +148,73 @@ class ShellyCloud2Hub(DataUpdateCoordinator[Dict[str, Any]]):
         self.auth_key = auth_key
         self.device_ids = device_ids
 
-        if self.server.startswith("http://") or self.server.startswith("https://"):
-            self._base_url = self.server.rstrip("/")
-        else:
-            self._base_url = f"https://{self.server.rstrip('/')}"
+        self._engine = ShellyCloud2FetchEngine.async_acquire(
+            hass,
+            self,
+            server=self.server,
+            auth_key=auth_key,
+            dedicated_session=dedicated_session,
+            chunk_size_min=chunk_size_min,
+            chunk_size_max=chunk_size_max,
+        )
+        self._base_url = self._engine.base_url
+
+        # Deadband and interval filter applied by sensors before state writes
+        self.sensor_filter = sensor_filter or SensorWriteFilter({}, 0, 0)
+
+        # Devices reachable on the LAN are read and switched there first
+        self._local = LocalTransport(hass, local_hosts) if local_hosts else None
+
+        # Rolling mean/peak/min of meters[].power, if enabled
+        self.power_stats = (
+            PowerStatistics(minutes * 60 for minutes in POWER_STATS_WINDOWS)
+            if power_statistics
+            else None
+        )
+
+        # Reset-stitched or integrated energy per metered channel
+        self.energy = energy
+
+        # Site and per-tag totals, updated from per-device deltas
+        self.aggregates = aggregates
+
+        self._recorder: TraceRecorder | None = None
+        self._profiler: CycleProfiler | None = None
+
+        # Name, model and firmware per device, rebuilt when settings change
+        self._device_meta: Dict[str, DeviceMeta] = {}
+
+        # Entity plans per device and per payload shape; devices that share a
+        # shape share one plan, and a device is only reclassified when its
+        # payload shape changes
+        self._device_plans: Dict[str, Tuple[Dict[str, Any], Any, EntityPlan]] = {}
+        self._shape_plans: Dict[Any, EntityPlan] = {}
+
+        # Offline device -> (next probe time, current backoff in seconds)
+        self._offline: Dict[str, Tuple[float, float]] = {}
+
+        # Payload fields read by the active entities; the rest is dropped
+        self._projection = StateProjection()
+
+        # Devices waiting for the next debounced single-flight refresh
+        self._refresh_debounce = refresh_debounce
+        self._refresh_pending: set[str] = set()
+        self._refresh_batch: asyncio.Future | None = None
+        self._refresh_task: asyncio.Task | None = None
+        self._refresh_lock = asyncio.Lock()
 
-        self._session = async_get_clientsession(hass)
+        # Event entity callbacks per (device_id, input index)
+        self._input_listeners: Dict[Tuple[str, int], List[Callable[[str], None]]] = {}
+        # Platform -> seconds its async_setup_entry took
+        self.platform_setup_times: Dict[str, float] = {}
+        # Entry options the hub was set up with, see _async_update_listener
+        self.entry_options: Dict[str, Any] = {}
+
+        # Pending post-command checks and their burst-poll task per device
+        self._converge_checks: Dict[
+            str, Dict[Hashable, Callable[[Dict[str, Any]], bool]]
+        ] = {}
+        self._converge_tasks: Dict[str, asyncio.Task] = {}
 
         super().__init__(
             hass,
@@ -64,6 +228,152 @@ class ShellyCloud2Hub(DataUpdateCoordinator[Dict[str, Any]]):
         """Return the base URL used for API calls."""
         return self._base_url
 
+    def device_meta(self, device_id: str) -> DeviceMeta:
+        """Return cached metadata for a device, rebuilding it on change."""
+        state = (self.data or {}).get(device_id) or {}
+        meta = self._device_meta.get(device_id)
+        if meta is None or not meta.matches(state):
+            meta = self._device_meta[device_id] = DeviceMeta(device_id, state)
+        return meta
+
+    def entity_plan(self, device_id: str) -> EntityPlan:
+        """Return the entities every platform should create for a device."""
+        state = (self.data or {}).get(device_id) or {}
+        cached = self._device_plans.get(device_id)
+        if cached is not None and cached[0] is state:
+            return cached[2]
+        shape = payload_shape(state)
+        if cached is not None and cached[1] == shape:
+            plan = cached[2]
+        else:
+            plan = self._shape_plans.get(shape)
+            if plan is None:
+                plan = self._shape_plans[shape] = classify(state)
+        self._device_plans[device_id] = (state, shape, plan)
+        return plan
+
+    @callback
+    def async_track_state_paths(
+        self, paths: Iterable[StatePath]
+    ) -> Callable[[], None]:
+        """Keep the given payload paths in hub.data until released."""
+        return self._projection.track(paths)
+
+    @callback
+    def async_add_input_listener(
+        self, device_id: str, index: int, listener: Callable[[str], None]
+    ) -> Callable[[], None]:
+        """Call listener with the event type of every press on an input."""
+        listeners = self._input_listeners.setdefault((device_id, index), [])
+        listeners.append(listener)
+
+        @callback
+        def _remove() -> None:
+            listeners.remove(listener)
+            if not listeners:
+                self._input_listeners.pop((device_id, index), None)
+
+        return _remove
+
+    @callback
+    def async_add_span_exporter(self, exporter: SpanExporter) -> Callable[[], None]:
+        """Export a span for every API request of this account until removed."""
+        return self._engine.tracer.add_exporter(exporter)
+
+    @callback
+    def async_start_capture(
+        self, path: str, on_full: Callable[[], None] | None = None
+    ) -> None:
+        """Record every API request of this account to an NDJSON trace.
+
+        The capture ends by itself at its size or duration limit, after
+        which on_full is called.
+        """
+
+        @callback
+        def _full() -> None:
+            recorder = self._engine.recorder
+            if recorder is not None and recorder.full:
+                self._engine.recorder = None
+            if on_full is not None:
+                on_full()
+
+        self._recorder = TraceRecorder(self.hass, path, self.auth_key, _full)
+        self._engine.recorder = self._recorder
+        _LOGGER.info("Capturing Shelly Cloud 2 API traffic to %s", path)
+
+    async def async_stop_capture(self) -> None:
+        """Stop recording and flush the trace."""
+        recorder, self._recorder = self._recorder, None
+        if recorder is None:
+            return
+        if self._engine.recorder is recorder:
+            self._engine.recorder = None
+        await recorder.async_flush()
+
+    @property
+    def profiling(self) -> bool:
+        """Return True while a profile runs on this hub's account."""
+        return self._engine.profiler is not None
+
+    @callback
+    def async_start_profile(self, path: str, cycles: int) -> None:
+        """Profile the next poll cycles and write a report to path.
+
+        Hubs on one account share a poll cycle, so only one of them can be
+        profiled at a time; raises HomeAssistantError while one is.
+        """
+        if self.profiling:
+            raise HomeAssistantError(
+                "A profile is already running for this Shelly Cloud account"
+            )
+        self._profiler = CycleProfiler(self.hass, path, cycles)
+        self._engine.profiler = self._profiler
+
+    async def _async_refresh(self, *args: Any, **kwargs: Any) -> None:
+        """Refresh data, profiling the cycle if a profile was requested."""
+        profiler = self._profiler
+        if profiler is None:
+            await super()._async_refresh(*args, **kwargs)
+            return
+
+        try:
+            profiler.start_cycle()
+            await super()._async_refresh(*args, **kwargs)
+        finally:
+            profiler.end_cycle()
+        if profiler.finished:
+            self._profiler = None
+            if self._engine.profiler is profiler:
+                self._engine.profiler = None
+            try:
+                await profiler.async_write_report()
+            except Exception:  # noqa: BLE001 - a report must not break polling
+                _LOGGER.exception("Failed to write profile to %s", profiler.path)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all registered listeners, timing the state writes."""
+        profiler = self._profiler
+        if profiler is None:
+            super().async_update_listeners()
+            return
+        with profiler.phase(PHASE_STATE_WRITES):
+            super().async_update_listeners()
+
+    async def async_close(self) -> None:
+        """Stop convergence polling and release the shared fetch engine."""
+        for task in list(self._converge_tasks.values()):
+            task.cancel()
+        self._converge_tasks.clear()
+        self._converge_checks.clear()
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+        await self.async_stop_capture()
+        if self.energy is not None:
+            await self.energy.async_save()
+        await self._engine.async_release(self)
+
     async def _async_update_data(self) -> Dict[str, Any]:
         """Fetch state for all configured devices.
 
@@ -72,40 +382,303 @@ class ShellyCloud2Hub(DataUpdateCoordinator[Dict[str, Any]]):
         if not self.device_ids:
             return {}
 
+        now = time.monotonic()
+        due = [
+            dev_id
+            for dev_id in self.device_ids
+            if dev_id not in self._offline or self._offline[dev_id][0] <= now
+        ]
+        local_ids, cloud_ids = self._split_local(due)
+        # Join the coalesced cloud poll right away, not after the LAN
+        (local_states, failed), (states, deferred) = await asyncio.gather(
+            self._async_fetch_local(local_ids),
+            self._engine.async_poll(self, cloud_ids),
+        )
+        if failed:
+            states.update(await self._engine.async_fetch_states(failed))
+        states.update(local_states)
+        profiler = self._profiler
+        if profiler is None:
+            return self._extract_states(due, states, deferred)
+        with profiler.phase(PHASE_STATE_EXTRACTION):
+            return self._extract_states(due, states, deferred)
+
+    def _extract_states(
+        self, due: List[str], states: Dict[str, Any], deferred: List[str]
+    ) -> Dict[str, Any]:
+        """Build hub.data from the states fetched for the due devices."""
+        states = self._projection.apply(states)
+        self._track_offline(states)
+        self._update_derived(states)
+
+        if len(due) == len(self.device_ids) and not deferred:
+            return states
+        # Backed-off devices, and those the poll deadline cut off, keep
+        # their last payload
+        previous = self.data or {}
+        result = {
+            dev_id: previous[dev_id]
+            for dev_id in self.device_ids
+            if dev_id in previous and dev_id not in states
+        }
+        result.update(states)
+        return result
+
+    async def _async_fetch_states(self, device_ids: List[str]) -> Dict[str, Any]:
+        """Fetch state for the given devices right away."""
+        local_ids, cloud_ids = self._split_local(device_ids)
+        (local_states, failed), states = await asyncio.gather(
+            self._async_fetch_local(local_ids),
+            self._engine.async_fetch_states(cloud_ids),
+        )
+        if failed:
+            states.update(await self._engine.async_fetch_states(failed))
+        states.update(local_states)
+        states = self._projection.apply(states)
+        self._track_offline(states)
+        self._update_derived(states)
+        return states
+
+    def _split_local(self, device_ids: List[str]) -> Tuple[List[str], List[str]]:
+        """Split devices into those read over the LAN now and the rest.
+
+        A local status replaces the status block of the device's last cloud
+        payload, so devices without one yet are left to the cloud.
+        """
+        local = self._local
+        if local is None:
+            return [], device_ids
+        previous = self.data or {}
+        local_ids = [
+            dev_id
+            for dev_id in device_ids
+            if dev_id in previous and local.available(dev_id)
+        ]
+        if not local_ids:
+            return [], device_ids
+        chosen = set(local_ids)
+        return local_ids, [dev_id for dev_id in device_ids if dev_id not in chosen]
+
+    async def _async_fetch_local(
+        self, local_ids: List[str]
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """Read devices over the LAN; returns their states and the failed IDs.
+
+        Devices that do not answer in time fall back to the cloud in the
+        same cycle.
+        """
+        local = self._local
+        if local is None or not local_ids:
+            return {}, []
+        previous = self.data or {}
+
+        results = await asyncio.gather(
+            *(local.async_get_status(dev_id) for dev_id in local_ids),
+            return_exceptions=True,
+        )
         states: Dict[str, Any] = {}
-        chunk_size = 10
-        for i in range(0, len(self.device_ids), chunk_size):
-            chunk = self.device_ids[i : i + chunk_size]
-            body = {
-                "ids": chunk,
-                "select": ["status", "settings"],
+        for dev_id, status in zip(local_ids, results):
+            if isinstance(status, LocalUnavailable):
+                continue
+            if isinstance(status, BaseException):
+                raise status
+            # The device answered, so it is reachable whatever its cloud link
+            cloud = status.get("cloud")
+            if isinstance(cloud, dict) and not cloud.get("connected", True):
+                status["cloud"] = {**cloud, "connected": True}
+            # The LAN status lacks the cloud's bookkeeping: keep the last
+            # firmware info and stamp the read time the way the cloud does
+            cloud_status = previous[dev_id].get("status", {})
+            if "getinfo" in cloud_status:
+                status["getinfo"] = cloud_status["getinfo"]
+            if "_updated" in cloud_status:
+                status["_updated"] = dt_util.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+            states[dev_id] = {**previous[dev_id], "status": status, "online": 1}
+        return states, [dev_id for dev_id in local_ids if dev_id not in states]
+
+    def _track_offline(self, states: Dict[str, Any]) -> None:
+        """Back off offline devices and promote the ones that came back."""
+        now = time.monotonic()
+        for dev_id, state in states.items():
+            if not _is_offline(state):
+                if self._offline.pop(dev_id, None) is not None:
+                    _LOGGER.debug("Device %s is back online", dev_id)
+                continue
+            previous = self._offline.get(dev_id)
+            backoff = (
+                min(previous[1] * 2, OFFLINE_BACKOFF_MAX)
+                if previous is not None
+                else OFFLINE_BACKOFF_INITIAL
+            )
+            # Snap probes to a shared grid so offline devices are probed together
+            next_probe = math.ceil((now + backoff) / OFFLINE_BACKOFF_INITIAL)
+            self._offline[dev_id] = (next_probe * OFFLINE_BACKOFF_INITIAL, backoff)
+
+    def _update_derived(self, states: Dict[str, Any]) -> None:
+        """Feed fresh states to the power stats, energy and aggregates."""
+        if self.power_stats is None and self.energy is None:
+            online: Dict[str, Any] = {}
+        else:
+            online = {
+                dev_id: state
+                for dev_id, state in states.items()
+                if dev_id not in self._offline
             }
-            url = f"{self._base_url}/v2/devices/api/get"
-            params = {"auth_key": self.auth_key}
-            try:
-                async with self._session.post(
-                    url, params=params, json=body, timeout=15
-                ) as resp:
-                    if resp.status != 200:
-                        text = await resp.text()
-                        raise UpdateFailed(
-                            f"Error {resp.status} fetching devices state: {text}"
-                        )
-                    data = await resp.json()
-            except asyncio.CancelledError:
-                raise
-            except Exception as exc:
-                raise UpdateFailed(f"Error fetching devices state: {exc}") from exc
+        if self.power_stats is not None:
+            self.power_stats.add_states(time.monotonic(), online)
+        if self.energy is not None:
+            self.energy.add_states(time.time(), online)
+        if self.aggregates is not None:
+            self.aggregates.update(states, self._contribution)
+        self._fire_input_events(states)
 
-            if not isinstance(data, list):
-                raise UpdateFailed("Unexpected response format from Shelly Cloud API")
+    def _fire_input_events(self, states: Dict[str, Any]) -> None:
+        """Fire events for input edges between the last and fresh states."""
+        previous = self.data
+        if not previous:
+            return
+        for dev_id, state in states.items():
+            old = previous.get(dev_id)
+            if old is None or old is state or _is_offline(old) or _is_offline(state):
+                continue
+            for component in self.entity_plan(dev_id).components:
+                if component.type.events is None:
+                    continue
+                for event_type in component.events(old, state):
+                    self.hass.bus.async_fire(
+                        EVENT_INPUT,
+                        {
+                            "device_id": dev_id,
+                            "channel": component.index,
+                            "event_type": event_type,
+                        },
+                    )
+                    for listener in list(
+                        self._input_listeners.get((dev_id, component.index), ())
+                    ):
+                        listener(event_type)
 
-            for dev_state in data:
-                dev_id = dev_state.get("id")
-                if dev_id:
-                    states[dev_id] = dev_state
+    def _contribution(self, device_id: str, state: Dict[str, Any]) -> Contribution:
+        """Return what a device adds to the fleet aggregates."""
+        status = state.get("status", {})
+        meters = status.get("meters")
+        if not isinstance(meters, list):
+            meters = []
+        energy = 0.0
+        if self.energy is not None:
+            for channel in range(len(meters)):
+                energy += self.energy.value(device_id, channel) or 0.0
+        if _is_offline(state):
+            return (0.0, energy, 0, 0)
 
-        return states
+        power = sum(
+            meter.get("power") or 0.0 for meter in meters if isinstance(meter, dict)
+        )
+        relays_on = 0
+        for component in find_components(status, state.get("type")):
+            if component.type.key == "switch":
+                relays_on += component.read(state)["on"]
+            elif component.type.key == "em":
+                power += component.read(state)["power"] or 0.0
+        sensor_block = status.get("sensor")
+        door_open = int(
+            isinstance(sensor_block, dict) and sensor_block.get("state") == "open"
+        )
+        return (float(power), energy, relays_on, door_open)
+
+    async def async_request_device_refresh(self, device_id: str) -> None:
+        """Refresh one device, merged with other requests in the same window.
+
+        Requests arriving within the debounce window share one fetch scoped
+        to the union of the requested devices. Only one such fetch is in
+        flight at a time; requests made meanwhile form the next batch.
+        """
+        self._refresh_pending.add(device_id)
+        if self._refresh_batch is None:
+            self._refresh_batch = self.hass.loop.create_future()
+            self._refresh_task = self.hass.async_create_task(
+                self._async_flush_refresh(self._refresh_batch)
+            )
+        await asyncio.shield(self._refresh_batch)
+
+    async def _async_flush_refresh(self, batch: asyncio.Future) -> None:
+        """Fetch the devices collected for one refresh batch."""
+        try:
+            await asyncio.sleep(self._refresh_debounce)
+            async with self._refresh_lock:
+                device_ids = [d for d in self.device_ids if d in self._refresh_pending]
+                self._refresh_pending = set()
+                self._refresh_batch = None
+                try:
+                    fresh = await self._async_fetch_states(device_ids)
+                except UpdateFailed as exc:
+                    _LOGGER.debug("Refresh of %s devices failed: %s", len(device_ids), exc)
+                    fresh = {}
+                if fresh:
+                    if self.data is None:
+                        self.data = {}
+                    self.data.update(fresh)
+                    self.async_update_listeners()
+        finally:
+            if self._refresh_batch is batch:
+                self._refresh_batch = None
+            if not batch.done():
+                batch.set_result(None)
+
+    def async_start_convergence(
+        self,
+        device_id: str,
+        check: Callable[[Dict[str, Any]], bool],
+        key: Hashable = None,
+    ) -> None:
+        """Re-fetch one device on a decaying schedule until check(state) holds.
+
+        Used after a control command so the confirmed state shows up within
+        a second or two instead of on the next full poll. Gives up after
+        CONVERGE_TIMEOUT and leaves the device to the normal cadence.
+
+        A newer check with the same key (e.g. the same channel) replaces
+        the stale one, and the device's burst restarts from the beginning.
+        """
+        self._converge_checks.setdefault(device_id, {})[key] = check
+        task = self._converge_tasks.get(device_id)
+        if task is not None and not task.done():
+            task.cancel()
+        self._converge_tasks[device_id] = self.hass.async_create_task(
+            self._async_converge(device_id)
+        )
+
+    async def _async_converge(self, device_id: str) -> None:
+        """Burst-poll a device until its pending checks pass or time runs out."""
+        deadline = time.monotonic() + CONVERGE_TIMEOUT
+        delay = CONVERGE_INITIAL_DELAY
+        try:
+            while self._converge_checks.get(device_id):
+                await asyncio.sleep(delay)
+                await self.async_request_device_refresh(device_id)
+
+                state = (self.data or {}).get(device_id)
+                if state is not None:
+                    self._converge_checks[device_id] = {
+                        key: check
+                        for key, check in self._converge_checks[device_id].items()
+                        if not check(state)
+                    }
+
+                delay = min(delay * 2, CONVERGE_MAX_DELAY)
+                if time.monotonic() + delay > deadline:
+                    if self._converge_checks.get(device_id):
+                        _LOGGER.debug(
+                            "State of %s did not converge within %ss",
+                            device_id,
+                            CONVERGE_TIMEOUT,
+                        )
+                    break
+        finally:
+            # A replaced burst leaves the checks to the task that replaced it
+            if self._converge_tasks.get(device_id) is asyncio.current_task():
+                self._converge_checks.pop(device_id, None)
+                self._converge_tasks.pop(device_id, None)
 
     async def async_set_switch(
         self,
@@ -115,43 +688,74 @@ class ShellyCloud2Hub(DataUpdateCoordinator[Dict[str, Any]]):
         toggle_after: int | None = None,
     ) -> None:
         """Control a switch output on a device."""
-        url = f"{self._base_url}/v2/devices/api/set/switch"
-        params = {"auth_key": self.auth_key}
-        body: Dict[str, Any] = {
-            "id": device_id,
-            "channel": channel,
-            "on": on,
-        }
-        if toggle_after is not None:
-            body["toggle_after"] = toggle_after
+        await self._async_send_control(
+            SetSwitchRequest(device_id, channel, on, toggle_after)
+        )
 
-        try:
-            async with self._session.post(
-                url, params=params, json=body, timeout=15
-            ) as resp:
-                text = await resp.text()
-                if resp.status != 200:
-                    raise UpdateFailed(
-                        f"Control command failed with HTTP {resp.status}: {text}"
-                    )
-                if text:
-                    try:
-                        data = await resp.json()
-                    except Exception:
-                        data = None
-                    if isinstance(data, dict) and "error" in data:
-                        messages = data.get("data", {}).get("messages", [])
-                        raise UpdateFailed(
-                            f"Control command error: {data['error']} messages={messages}"
-                        )
-        except asyncio.CancelledError:
-            raise
-        except Exception as exc:
-            raise UpdateFailed(f"Error sending control command: {exc}") from exc
+    async def async_set_cover(
+        self,
+        device_id: str,
+        channel: int,
+        position: str | int,
+    ) -> None:
+        """Move a cover to "open", "close", "stop" or a 0-100 position."""
+        await self._async_send_control(SetCoverRequest(device_id, channel, position))
+
+    async def async_set_light(
+        self,
+        device_id: str,
+        channel: int,
+        on: bool,
+        mode: str | None = None,
+        temperature: int | None = None,
+        brightness: int | None = None,
+    ) -> None:
+        """Switch a light, optionally setting mode, temperature and brightness."""
+        await self._async_send_control(
+            SetLightRequest(
+                device_id,
+                channel,
+                on,
+                mode=mode,
+                brightness=brightness,
+                temperature=temperature,
+            )
+        )
+
+    async def async_command(
+        self, device_id: str, component: Component, **params: Any
+    ) -> None:
+        """Send the control request of a component instance."""
+        command = component.type.command
+        if command is None:
+            raise ValueError(f"{component.type.key} components take no commands")
+        await self._async_send_control(command(device_id, component.index, **params))
+
+    async def _async_send_control(self, request: ControlRequest) -> None:
+        """Send a control request, over the LAN first for local switches."""
+        local = self._local
+        if (
+            isinstance(request, SetSwitchRequest)
+            and local is not None
+            and local.available(request.device_id)
+        ):
+            try:
+                await local.async_set_switch(
+                    request.device_id,
+                    request.channel,
+                    request.on,
+                    request.toggle_after,
+                )
+            except LocalUnavailable:
+                pass
+            else:
+                return
+        await self._engine.async_send_control(request)
 
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the Shelly Cloud 2 component."""
+    async_setup_services(hass)
     return True
 
 
@@ -165,23 +769,114 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if not isinstance(device_ids, list):
         device_ids = []
 
+    try:
+        deadbands = parse_deadbands(
+            entry.options.get(CONF_SENSOR_DEADBANDS, DEFAULT_SENSOR_DEADBANDS)
+        )
+    except ValueError as exc:
+        _LOGGER.warning("Ignoring invalid sensor deadbands: %s", exc)
+        deadbands = {}
+    sensor_filter = SensorWriteFilter(
+        deadbands,
+        entry.options.get(CONF_SENSOR_MIN_INTERVAL, DEFAULT_SENSOR_MIN_INTERVAL),
+        entry.options.get(CONF_SENSOR_MAX_SILENCE, DEFAULT_SENSOR_MAX_SILENCE),
+    )
+
+    try:
+        local_hosts = parse_local_hosts(
+            entry.options.get(CONF_LOCAL_HOSTS, DEFAULT_LOCAL_HOSTS)
+        )
+    except ValueError as exc:
+        _LOGGER.warning("Ignoring invalid local hosts: %s", exc)
+        local_hosts = {}
+
+    aggregates = None
+    if entry.options.get(CONF_FLEET_AGGREGATES, False):
+        try:
+            tags = parse_device_tags(
+                entry.options.get(CONF_DEVICE_TAGS, DEFAULT_DEVICE_TAGS)
+            )
+        except ValueError as exc:
+            _LOGGER.warning("Ignoring invalid device tags: %s", exc)
+            tags = {}
+        aggregates = FleetAggregates(tags)
+
+    energy = EnergyMeters(hass, entry.entry_id)
+    await energy.async_load()
+
     hub = ShellyCloud2Hub(
         hass=hass,
         server=server,
         auth_key=auth_key,
         device_ids=device_ids,
+        dedicated_session=entry.options.get(CONF_DEDICATED_SESSION, False),
+        chunk_size_min=entry.options.get(CONF_CHUNK_SIZE_MIN, DEFAULT_CHUNK_SIZE_MIN),
+        chunk_size_max=entry.options.get(CONF_CHUNK_SIZE_MAX, DEFAULT_CHUNK_SIZE_MAX),
+        refresh_debounce=entry.options.get(
+            CONF_REFRESH_DEBOUNCE, DEFAULT_REFRESH_DEBOUNCE
+        ),
+        sensor_filter=sensor_filter,
+        local_hosts=local_hosts,
+        power_statistics=entry.options.get(CONF_POWER_STATISTICS, False),
+        energy=energy,
+        aggregates=aggregates,
     )
+    hub.entry_options = dict(entry.options)
     hass.data[DOMAIN][entry.entry_id] = hub
 
-    await hub.async_config_entry_first_refresh()
+    if entry.options.get(CONF_CAPTURE_TRACE, False):
+
+        @callback
+        def _capture_full() -> None:
+            # Keep the capture off across restarts until it is re-enabled;
+            # the update listener does not reload for this
+            hass.config_entries.async_update_entry(
+                entry, options={**entry.options, CONF_CAPTURE_TRACE: False}
+            )
+
+        hub.async_start_capture(
+            hass.config.path(f"{DOMAIN}_trace_{entry.entry_id}.ndjson"),
+            _capture_full,
+        )
+
+    if entry.options.get(CONF_LOG_REQUEST_SPANS, False):
+        entry.async_on_unload(
+            hub.async_add_span_exporter(LogSpanExporter(level=logging.INFO))
+        )
+
+    try:
+        await hub.async_config_entry_first_refresh()
+    except Exception:
+        hass.data[DOMAIN].pop(entry.entry_id, None)
+        await hub.async_close()
+        raise
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry so changed options take effect.
+
+    Turning only the trace capture off, as a full capture does itself,
+    stops the capture and keeps the hub and its entities.
+    """
+    hub: ShellyCloud2Hub | None = hass.data[DOMAIN].get(entry.entry_id)
+    if hub is not None and not entry.options.get(CONF_CAPTURE_TRACE, False):
+        unchanged = {**hub.entry_options, CONF_CAPTURE_TRACE: False}
+        if {**entry.options, CONF_CAPTURE_TRACE: False} == unchanged:
+            hub.entry_options = dict(entry.options)
+            await hub.async_stop_capture()
+            return
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id, None)
+        hub: ShellyCloud2Hub | None = hass.data[DOMAIN].pop(entry.entry_id, None)
+        if hub is not None:
+            await hub.async_close()
     return unload_ok
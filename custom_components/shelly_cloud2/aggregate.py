@@ -0,0 +1,78 @@
+"""Fleet-wide aggregates maintained from per-device deltas."""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Tuple
+
+# Aggregate kinds, in the order of a device's contribution tuple
+AGGREGATE_KINDS = ("power", "energy", "relays_on", "doors_open")
+
+# Group of every device; tagged devices also count towards their tag
+SITE_GROUP = ""
+
+Contribution = Tuple[float, float, int, int]
+_ZERO: Contribution = (0.0, 0.0, 0, 0)
+
+
+def parse_device_tags(raw: str | None) -> Dict[str, str]:
+    """Parse "device_id=tag, ..." into a device_id -> tag mapping.
+
+    Raises ValueError on malformed entries.
+    """
+    tags: Dict[str, str] = {}
+    if not raw:
+        return tags
+    for part in raw.replace("\n", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        device_id, sep, tag = part.partition("=")
+        device_id = device_id.strip()
+        tag = tag.strip()
+        if not sep or not device_id or not tag:
+            raise ValueError(f"Invalid device tag entry: {part}")
+        tags[device_id] = tag
+    return tags
+
+
+class FleetAggregates:
+    """Site and per-tag totals of power, energy, relays on and doors open.
+
+    Each device's last contribution is remembered; an update applies only
+    the difference for devices whose contribution changed, so the cost is
+    proportional to the devices in the update, not to the fleet.
+    """
+
+    def __init__(self, tags: Dict[str, str]) -> None:
+        """Initialize empty totals for the site and every tag."""
+        self.tags = tags
+        self.groups = (SITE_GROUP, *sorted(set(tags.values())))
+        self._totals: Dict[str, list] = {group: list(_ZERO) for group in self.groups}
+        self._contributions: Dict[str, Contribution] = {}
+        # Groups whose totals changed in the last update
+        self.changed: set[str] = set()
+
+    def update(
+        self,
+        states: Dict[str, Any],
+        contribution: Callable[[str, Dict[str, Any]], Contribution],
+    ) -> None:
+        """Apply the contributions of freshly fetched device states."""
+        changed: set[str] = set()
+        for dev_id, state in states.items():
+            new = contribution(dev_id, state)
+            old = self._contributions.get(dev_id, _ZERO)
+            if new == old:
+                continue
+            self._contributions[dev_id] = new
+            tag = self.tags.get(dev_id)
+            for group in (SITE_GROUP, tag) if tag else (SITE_GROUP,):
+                totals = self._totals[group]
+                for index, (before, after) in enumerate(zip(old, new)):
+                    totals[index] += after - before
+                changed.add(group)
+        self.changed = changed
+
+    def total(self, group: str, kind: str) -> float | int:
+        """Return the current total of one kind for a group."""
+        return self._totals[group][AGGREGATE_KINDS.index(kind)]
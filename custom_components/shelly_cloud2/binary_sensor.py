@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, List
+from typing import List
 
 from homeassistant.components.binary_sensor import (
     BinarySensorEntity,
@@ -12,14 +12,16 @@ from homeassistant.components.binary_sensor import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from . import ShellyCloud2Hub
+from . import ShellyCloud2Hub, timed_platform_setup
+from .components import COMPONENT_TYPES, Component
 from .const import DOMAIN, CONF_DEVICE_IDS
+from .entity import ShellyCloud2Entity
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@timed_platform_setup("binary_sensor")
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -32,32 +34,34 @@ async def async_setup_entry(
         entry.data.get(CONF_DEVICE_IDS, []),
     )
 
-    entities: list[ShellyCloud2DoorSensor] = []
-
-    data = hub.data or {}
+    entities: list[BinarySensorEntity] = []
 
     for dev_id in device_ids:
-        state = data.get(dev_id) or {}
-        if state.get("type") != "sensor":
-            continue
-
-        status: Dict[str, Any] = state.get("status", {})
-        sensor_block = status.get("sensor")
-        if isinstance(sensor_block, dict) and "state" in sensor_block:
+        if "door" in hub.entity_plan(dev_id).binary_sensors:
             entities.append(
                 ShellyCloud2DoorSensor(
                     hub=hub,
                     device_id=dev_id,
                 )
             )
+        for component in hub.entity_plan(dev_id).components_for("binary_sensor"):
+            entities.append(
+                ShellyCloud2Input(
+                    hub=hub,
+                    device_id=dev_id,
+                    component=component,
+                )
+            )
 
     if entities:
         async_add_entities(entities)
 
 
-class ShellyCloud2DoorSensor(CoordinatorEntity, BinarySensorEntity):
+class ShellyCloud2DoorSensor(ShellyCloud2Entity, BinarySensorEntity):
     """Representation of a Shelly door/window sensor as a binary sensor."""
 
+    _state_paths = (("status", "sensor", "state"),)
+
     _attr_device_class = BinarySensorDeviceClass.DOOR
 
     def __init__(
@@ -70,13 +74,8 @@ class ShellyCloud2DoorSensor(CoordinatorEntity, BinarySensorEntity):
         self._hub = hub
         self._device_id = device_id
 
-        dev_state = (hub.data or {}).get(device_id) or {}
-        dev_type = dev_state.get("type", "sensor")
-        base_name = dev_state.get("settings", {}).get("name")
-        if not base_name:
-            base_name = f"Shelly {dev_type} {device_id}"
+        base_name = hub.device_meta(device_id).name
 
-        self._device_name = base_name
         self._attr_name = f"{base_name} Door"
         self._attr_unique_id = f"shelly_cloud2_{device_id}_door"
 
@@ -104,27 +103,31 @@ class ShellyCloud2DoorSensor(CoordinatorEntity, BinarySensorEntity):
             return False
         return True
 
+
+class ShellyCloud2Input(ShellyCloud2DoorSensor):
+    """Representation of a Shelly digital input as a binary sensor."""
+
+    _state_paths = COMPONENT_TYPES["input"].state_paths
+
+    _attr_device_class = None
+
+    def __init__(
+        self,
+        hub: ShellyCloud2Hub,
+        device_id: str,
+        component: Component,
+    ) -> None:
+        """Initialize the input sensor."""
+        super().__init__(hub=hub, device_id=device_id)
+        self._component = component
+
+        base_name = hub.device_meta(device_id).name
+
+        self._attr_name = f"{base_name} Input {component.index}"
+        self._attr_unique_id = f"shelly_cloud2_{device_id}_input_{component.index}"
+
     @property
-    def device_info(self) -> Dict[str, Any]:
-        """Return device information for the device registry."""
+    def is_on(self) -> bool:
+        """Return true if the input is active."""
         state = (self.coordinator.data or {}).get(self._device_id) or {}
-        settings = state.get("settings", {})
-        dev_type = state.get("type", "sensor")
-        base_name = settings.get("name") or self._device_name
-        device_meta = settings.get("device", {})
-        model = device_meta.get("type") or state.get("code") or dev_type
-        fw = (
-            state.get("status", {})
-            .get("getinfo", {})
-            .get("fw_info", {})
-            .get("fw")
-        )
-        info: Dict[str, Any] = {
-            "identifiers": {(DOMAIN, self._device_id)},
-            "name": base_name,
-            "manufacturer": "Shelly",
-            "model": model,
-        }
-        if fw:
-            info["sw_version"] = fw
-        return info
+        return self._component.read(state)["on"]
@@ -0,0 +1,89 @@
+"""Circuit breaker for Shelly Cloud 2 HTTP requests."""
+
+from __future__ import annotations
+
+import logging
+import random
+import time
+
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from .const import (
+    CIRCUIT_BACKOFF_INITIAL,
+    CIRCUIT_BACKOFF_MAX,
+    CIRCUIT_FAILURE_THRESHOLD,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CircuitOpenError(UpdateFailed):
+    """Raised instead of sending a request while the circuit is open."""
+
+
+class CircuitBreaker:
+    """Stop calling the cloud after repeated failures.
+
+    Closed: requests flow normally. After CIRCUIT_FAILURE_THRESHOLD
+    consecutive failures the circuit opens and requests fail fast. Once a
+    jittered, exponentially growing backoff has passed, one caller is let
+    through as a probe; its success closes the circuit, its failure opens
+    it again with a longer backoff.
+    """
+
+    def __init__(self, name: str) -> None:
+        """Initialize a closed breaker."""
+        self._name = name
+        self._failures = 0
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self._probing = False
+
+    @property
+    def is_open(self) -> bool:
+        """Return True while requests are being refused."""
+        return self._failures >= CIRCUIT_FAILURE_THRESHOLD
+
+    def before_request(self) -> bool:
+        """Admit a request; returns True if it is the half-open probe.
+
+        Raises CircuitOpenError if the request must not be sent.
+        """
+        if not self.is_open:
+            return False
+        remaining = self._retry_at - time.monotonic()
+        if self._probing or remaining > 0:
+            raise CircuitOpenError(
+                f"Shelly Cloud unavailable, retrying in {max(remaining, 0):.0f}s"
+            )
+        self._probing = True
+        return True
+
+    def abort_probe(self) -> None:
+        """Let another caller probe after a probe was cancelled."""
+        self._probing = False
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful request."""
+        if self.is_open:
+            _LOGGER.info("%s reachable again", self._name)
+        self._failures = 0
+        self._backoff = 0.0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        """Count a failed request, opening the circuit at the threshold."""
+        self._failures += 1
+        self._probing = False
+        if not self.is_open:
+            return
+        if self._backoff:
+            self._backoff = min(self._backoff * 2, CIRCUIT_BACKOFF_MAX)
+        else:
+            self._backoff = CIRCUIT_BACKOFF_INITIAL
+            _LOGGER.warning(
+                "%s failed %s times in a row, pausing requests",
+                self._name,
+                self._failures,
+            )
+        self._retry_at = time.monotonic() + self._backoff * random.uniform(0.5, 1.5)
@@ -0,0 +1,115 @@
+"""Adaptive chunk sizing for Shelly Cloud 2 device state fetches."""
+
+from __future__ import annotations
+
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+# HTTP statuses the cloud answers with when a request carries too many IDs;
+# a plain 400 usually means a bad ID and says nothing about the size
+REJECTED_STATUSES = frozenset({413, 414})
+
+# Share of the request timeout a single chunk may use before we shrink
+_LATENCY_TARGET_RATIO = 0.25
+# Response size above which the next chunks are made smaller
+_PAYLOAD_TARGET_BYTES = 512 * 1024
+# Weight of the latest sample in the moving averages
+_EWMA_ALPHA = 0.3
+# Successful chunks after which a lowered ceiling is raised by one again
+_CEILING_RECOVERY_SUCCESSES = 10
+
+
+class ChunkSizeTuner:
+    """Pick the number of device IDs sent per /v2/devices/api/get call.
+
+    Grows the chunk additively while requests are fast, small and error
+    free, and shrinks it multiplicatively when latency, payload size or
+    the error rate climb. A chunk the cloud rejects as too large lowers
+    the discovered ceiling, which creeps back up by one after every
+    _CEILING_RECOVERY_SUCCESSES successful chunks.
+    """
+
+    def __init__(
+        self,
+        minimum: int,
+        maximum: int,
+        initial: int,
+        timeout: float,
+    ) -> None:
+        """Initialize the tuner within [minimum, maximum]."""
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.ceiling = self.maximum
+        self.size = min(max(initial, self.minimum), self.maximum)
+        self._latency_target = timeout * _LATENCY_TARGET_RATIO
+        self._latency: float | None = None
+        self._per_device_bytes: float | None = None
+        self._error_rate = 0.0
+        self._successes_since_rejected = 0
+
+    def _clamp(self, size: float) -> int:
+        """Clamp a size into the allowed range."""
+        return int(min(max(size, self.minimum), self.ceiling))
+
+    def _ewma(self, old: float | None, sample: float) -> float:
+        """Fold a sample into a moving average."""
+        if old is None:
+            return sample
+        return old + _EWMA_ALPHA * (sample - old)
+
+    def record_success(self, count: int, latency: float, payload_bytes: int) -> None:
+        """Adapt the size after a chunk of count devices succeeded."""
+        self._latency = self._ewma(self._latency, latency)
+        if count:
+            self._per_device_bytes = self._ewma(
+                self._per_device_bytes, payload_bytes / count
+            )
+        self._error_rate = self._ewma(self._error_rate, 0.0)
+
+        if self.ceiling < self.maximum:
+            self._successes_since_rejected += 1
+            if self._successes_since_rejected >= _CEILING_RECOVERY_SUCCESSES:
+                self._successes_since_rejected = 0
+                self.ceiling += 1
+
+        size = self.size
+        if self._latency > self._latency_target:
+            size = size * max(0.5, self._latency_target / self._latency)
+        elif (
+            self._per_device_bytes
+            and self._per_device_bytes * size > _PAYLOAD_TARGET_BYTES
+        ):
+            size = _PAYLOAD_TARGET_BYTES / self._per_device_bytes
+        elif (
+            count >= self.size
+            and self._latency < self._latency_target / 2
+            and self._error_rate < 0.05
+        ):
+            size = size + 1
+        self._set_size(self._clamp(size))
+
+    def record_failure(self, count: int) -> None:
+        """Shrink after a chunk of count devices failed or timed out."""
+        self._error_rate = self._ewma(self._error_rate, 1.0)
+        self._set_size(self._clamp(min(self.size, count) / 2))
+
+    def record_rejected(self, count: int) -> bool:
+        """Lower the ceiling after the cloud refused a chunk as too large.
+
+        Returns True when a smaller chunk is worth retrying.
+        """
+        if count <= self.minimum:
+            return False
+        self.ceiling = max(self.minimum, count - 1)
+        self._successes_since_rejected = 0
+        self._set_size(self._clamp(count // 2))
+        return True
+
+    def _set_size(self, size: int) -> None:
+        """Store a new size, logging changes."""
+        if size != self.size:
+            _LOGGER.debug(
+                "Chunk size %s -> %s (ceiling %s)", self.size, size, self.ceiling
+            )
+            self.size = size
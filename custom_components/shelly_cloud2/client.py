@@ -0,0 +1,262 @@
+"""Async client for the Shelly Cloud v2 device API.
+
+Depends only on aiohttp and the standard library, without Home Assistant
+or relative imports, so it can be loaded on its own (see
+scripts/loadtest.py). Retries, chunk tuning, the circuit breaker, pacing
+and tracing are left to the caller; the fetch engine adds them on top.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+import aiohttp
+
+DEFAULT_TIMEOUT = 15  # seconds
+
+
+class ShellyCloudError(Exception):
+    """Base class for Shelly Cloud client errors."""
+
+
+class ShellyCloudConnectionError(ShellyCloudError):
+    """The request did not get an HTTP response (network error, timeout)."""
+
+
+class ShellyCloudTimeoutError(ShellyCloudConnectionError):
+    """The request timed out."""
+
+
+class ShellyCloudHTTPError(ShellyCloudError):
+    """The cloud answered with a non-200 status."""
+
+    def __init__(self, status: int, text: str) -> None:
+        """Initialize with the response status and body."""
+        super().__init__(f"HTTP {status}: {text}")
+        self.status = status
+        self.text = text
+
+
+class ShellyCloudResponseError(ShellyCloudError):
+    """The cloud answered 200 with a body that is not the expected shape."""
+
+    def __init__(self, message: str, raw: bytes) -> None:
+        """Initialize with a description and the raw body."""
+        super().__init__(message)
+        self.raw = raw
+
+
+class ShellyCloudCommandError(ShellyCloudError):
+    """The cloud accepted a control request but reported an error."""
+
+    def __init__(self, error: Any, messages: List[Any], text: str) -> None:
+        """Initialize with the reported error, messages and response body."""
+        super().__init__(f"{error} messages={messages}")
+        self.error = error
+        self.messages = messages
+        self.text = text
+
+
+@dataclass(frozen=True)
+class GetStatesRequest:
+    """Read status and settings of up to one chunk of devices."""
+
+    ids: Tuple[str, ...]
+    select: Tuple[str, ...] = ("status", "settings")
+
+    def body(self) -> Dict[str, Any]:
+        """Return the JSON body of /v2/devices/api/get."""
+        return {"ids": list(self.ids), "select": list(self.select)}
+
+
+@dataclass
+class GetStatesResponse:
+    """Device states keyed by device ID, with the raw body and timings."""
+
+    states: Dict[str, Dict[str, Any]]
+    raw: bytes
+    http_time: float
+    decode_time: float
+
+
+@dataclass(frozen=True)
+class SetSwitchRequest:
+    """Switch a relay channel on or off, optionally flipping back later."""
+
+    device_id: str
+    channel: int
+    on: bool
+    toggle_after: int | None = None
+
+    kind = "switch"
+
+    def body(self) -> Dict[str, Any]:
+        """Return the JSON body of /v2/devices/api/set/switch."""
+        body: Dict[str, Any] = {
+            "id": self.device_id,
+            "channel": self.channel,
+            "on": self.on,
+        }
+        if self.toggle_after is not None:
+            body["toggle_after"] = self.toggle_after
+        return body
+
+
+@dataclass(frozen=True)
+class SetCoverRequest:
+    """Move a cover to "open", "close", "stop" or a 0-100 position."""
+
+    device_id: str
+    channel: int
+    position: str | int
+
+    kind = "cover"
+
+    def body(self) -> Dict[str, Any]:
+        """Return the JSON body of /v2/devices/api/set/cover."""
+        return {
+            "id": self.device_id,
+            "channel": self.channel,
+            "position": self.position,
+        }
+
+
+@dataclass(frozen=True)
+class SetLightRequest:
+    """Switch a light, optionally setting mode, brightness and temperature."""
+
+    device_id: str
+    channel: int
+    on: bool
+    mode: str | None = None
+    brightness: int | None = None
+    temperature: int | None = None
+
+    kind = "light"
+
+    def body(self) -> Dict[str, Any]:
+        """Return the JSON body of /v2/devices/api/set/light."""
+        body: Dict[str, Any] = {
+            "id": self.device_id,
+            "channel": self.channel,
+            "on": self.on,
+        }
+        for key in ("mode", "brightness", "temperature"):
+            value = getattr(self, key)
+            if value is not None:
+                body[key] = value
+        return body
+
+
+ControlRequest = SetSwitchRequest | SetCoverRequest | SetLightRequest
+
+
+@dataclass
+class ControlResponse:
+    """Outcome of an accepted control request."""
+
+    status: int
+    text: str
+    elapsed: float
+    data: Any = field(default=None)
+
+
+class ShellyCloudClient:
+    """Send typed requests to one Shelly Cloud server with one auth key."""
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        base_url: str,
+        auth_key: str,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        """Initialize with an open session and the server's base URL."""
+        self.session = session
+        self.base_url = base_url
+        self.auth_key = auth_key
+        self.timeout = timeout
+
+    async def async_get_states(
+        self, request: GetStatesRequest, timeout: float | None = None
+    ) -> GetStatesResponse:
+        """POST /v2/devices/api/get and return the states by device ID.
+
+        timeout overrides the client's default for this request.
+        """
+        url = f"{self.base_url}/v2/devices/api/get"
+        started = time.monotonic()
+        try:
+            async with self.session.post(
+                url,
+                params={"auth_key": self.auth_key},
+                json=request.body(),
+                timeout=self.timeout if timeout is None else timeout,
+            ) as resp:
+                if resp.status != 200:
+                    raise ShellyCloudHTTPError(resp.status, await resp.text())
+                raw = await resp.read()
+        except ShellyCloudError:
+            raise
+        except TimeoutError as exc:
+            raise ShellyCloudTimeoutError("Request timed out") from exc
+        except aiohttp.ClientError as exc:
+            raise ShellyCloudConnectionError(str(exc) or type(exc).__name__) from exc
+
+        decode_start = time.monotonic()
+        try:
+            data = json.loads(raw)
+        except ValueError as exc:
+            raise ShellyCloudResponseError(f"Invalid JSON: {exc}", raw) from exc
+        if not isinstance(data, list):
+            raise ShellyCloudResponseError("Expected a list of device states", raw)
+        states = {
+            state["id"]: state
+            for state in data
+            if isinstance(state, dict) and state.get("id")
+        }
+        return GetStatesResponse(
+            states=states,
+            raw=raw,
+            http_time=decode_start - started,
+            decode_time=time.monotonic() - decode_start,
+        )
+
+    async def async_set(self, request: ControlRequest) -> ControlResponse:
+        """POST /v2/devices/api/set/<kind> and check the reply for errors."""
+        url = f"{self.base_url}/v2/devices/api/set/{request.kind}"
+        started = time.monotonic()
+        try:
+            async with self.session.post(
+                url,
+                params={"auth_key": self.auth_key},
+                json=request.body(),
+                timeout=self.timeout,
+            ) as resp:
+                status = resp.status
+                text = await resp.text()
+        except TimeoutError as exc:
+            raise ShellyCloudTimeoutError("Request timed out") from exc
+        except aiohttp.ClientError as exc:
+            raise ShellyCloudConnectionError(str(exc) or type(exc).__name__) from exc
+
+        if status != 200:
+            raise ShellyCloudHTTPError(status, text)
+        data = None
+        if text:
+            try:
+                data = json.loads(text)
+            except ValueError:
+                data = None
+            if isinstance(data, dict) and "error" in data:
+                details = data.get("data")
+                messages = (
+                    details.get("messages", []) if isinstance(details, dict) else []
+                )
+                raise ShellyCloudCommandError(data["error"], messages, text)
+        return ControlResponse(
+            status=status, text=text, elapsed=time.monotonic() - started, data=data
+        )
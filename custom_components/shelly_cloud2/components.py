@@ -0,0 +1,263 @@
+"""Registry of Shelly device components and the platforms they map to.
+
+Gen1 devices list their channels in status arrays (relays, covers,
+lights, inputs, emeters). Gen2+ devices report one "<type>:<id>" block
+per component instance (switch:0, cover:0, light:0, input:0, em:0). Each
+ComponentType knows both layouts, how to read an instance into common
+fields, and which control request drives it, so supporting a new device
+family means adding a registry entry rather than another parsing loop.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Tuple
+
+from .client import SetCoverRequest, SetLightRequest, SetSwitchRequest
+from .projection import StatePath
+
+Block = Dict[str, Any]
+
+# Gen1 cover "state" values mapped to a travel direction (+1 opening, -1 closing)
+_GEN1_COVER_DIRECTIONS = {
+    "opening": 1,
+    "open": 1,
+    "closing": -1,
+    "close": -1,
+}
+# Gen2+ cover states; "open" and "closed" are end positions, not motion
+_GEN2_COVER_DIRECTIONS = {
+    "opening": 1,
+    "closing": -1,
+}
+
+
+# Gen1 input "event" codes -> event types
+_GEN1_INPUT_EVENTS = {
+    "S": "single_push",
+    "SS": "double_push",
+    "SSS": "triple_push",
+    "L": "long_push",
+    "SL": "single_long_push",
+    "LS": "long_single_push",
+}
+# Every event type an input can produce
+INPUT_EVENT_TYPES = ("on", "off", *_GEN1_INPUT_EVENTS.values())
+
+
+def _number(value: Any) -> float | None:
+    """Return value if it is a number, else None."""
+    return value if isinstance(value, (int, float)) else None
+
+
+def _extract_switch(block: Block, gen2: bool) -> Dict[str, Any]:
+    """Read a relay (Gen1 "ison") or switch (Gen2+ "output")."""
+    return {"on": bool(block.get("output" if gen2 else "ison"))}
+
+
+def _extract_cover(block: Block, gen2: bool) -> Dict[str, Any]:
+    """Read a cover's travel direction and position."""
+    directions = _GEN2_COVER_DIRECTIONS if gen2 else _GEN1_COVER_DIRECTIONS
+    position = _number(block.get("current_pos"))
+    if position is None and not gen2:
+        position = _number(block.get("position"))
+    return {
+        "direction": directions.get(block.get("state"), 0),
+        "position": int(position) if position is not None else None,
+    }
+
+
+def _extract_light(block: Block, gen2: bool) -> Dict[str, Any]:
+    """Read a light's on state and 0-100 brightness."""
+    return {
+        "on": bool(block.get("output" if gen2 else "on")),
+        "brightness": _number(block.get("brightness")),
+    }
+
+
+def _extract_input(block: Block, gen2: bool) -> Dict[str, Any]:
+    """Read a digital input's level."""
+    return {"on": bool(block.get("state" if gen2 else "input"))}
+
+
+def _input_events(old: Block, new: Block, gen2: bool) -> List[str]:
+    """Return the events an input produced between two snapshots.
+
+    Level changes give "on"/"off". On Gen1, a grown event_cnt means the
+    button was pressed; only the latest press type is known, so several
+    presses between polls collapse into one event.
+    """
+    events: List[str] = []
+    level_key = "state" if gen2 else "input"
+    old_level, new_level = old.get(level_key), new.get(level_key)
+    if (
+        isinstance(old_level, (bool, int))
+        and isinstance(new_level, (bool, int))
+        and bool(old_level) != bool(new_level)
+    ):
+        events.append("on" if new_level else "off")
+    if not gen2:
+        old_count, new_count = old.get("event_cnt"), new.get("event_cnt")
+        if (
+            isinstance(old_count, int)
+            and isinstance(new_count, int)
+            and new_count > old_count
+        ):
+            event = _GEN1_INPUT_EVENTS.get(new.get("event"))
+            if event is not None:
+                events.append(event)
+    return events
+
+
+def _extract_em(block: Block, gen2: bool) -> Dict[str, Any]:
+    """Read an energy meter's active power."""
+    return {"power": _number(block.get("total_act_power" if gen2 else "power"))}
+
+
+@dataclass(frozen=True)
+class ComponentType:
+    """How one kind of component is found, read and commanded."""
+
+    key: str
+    platform: str
+    extract: Callable[[Block, bool], Dict[str, Any]]
+    # Control request class taking (device_id, channel, ...), if controllable
+    command: type | None = None
+    # Gen1 status list holding the instances
+    gen1_list: str | None = None
+    # Gen1 device types whose list is used; None for any type
+    gen1_types: Tuple[str, ...] | None = None
+    # Assume one instance for a matching Gen1 type that reports no list
+    gen1_default: bool = False
+    # Events between two snapshots of an instance, if it produces any
+    events: Callable[[Block, Block, bool], List[str]] | None = None
+
+    @property
+    def state_paths(self) -> Tuple[StatePath, ...]:
+        """Return the payload paths holding this component's instances."""
+        paths: Tuple[StatePath, ...] = (("status", f"{self.key}:*"),)
+        if self.gen1_list:
+            paths += (("status", self.gen1_list),)
+        return paths
+
+
+COMPONENT_TYPES: Dict[str, ComponentType] = {
+    component_type.key: component_type
+    for component_type in (
+        ComponentType(
+            "switch",
+            "switch",
+            _extract_switch,
+            command=SetSwitchRequest,
+            gen1_list="relays",
+            gen1_types=("relay",),
+        ),
+        ComponentType(
+            "cover",
+            "cover",
+            _extract_cover,
+            command=SetCoverRequest,
+            gen1_list="covers",
+            gen1_types=("cover",),
+            gen1_default=True,
+        ),
+        ComponentType(
+            "light",
+            "light",
+            _extract_light,
+            command=SetLightRequest,
+            gen1_list="lights",
+            gen1_types=("light",),
+            gen1_default=True,
+        ),
+        ComponentType(
+            "input",
+            "binary_sensor",
+            _extract_input,
+            gen1_list="inputs",
+            events=_input_events,
+        ),
+        ComponentType("em", "sensor", _extract_em, gen1_list="emeters"),
+    )
+}
+
+
+# Gen1 status list name -> the component type it holds
+_GEN1_LISTS: Dict[str, ComponentType] = {
+    component_type.gen1_list: component_type
+    for component_type in COMPONENT_TYPES.values()
+    if component_type.gen1_list
+}
+
+
+@dataclass(frozen=True)
+class Component:
+    """One instance of a component type on a device."""
+
+    type: ComponentType
+    index: int
+    gen2: bool
+
+    def block(self, state: Dict[str, Any]) -> Block:
+        """Return this instance's raw status block."""
+        status = state.get("status", {})
+        if self.gen2:
+            block = status.get(f"{self.type.key}:{self.index}")
+        else:
+            blocks = status.get(self.type.gen1_list)
+            block = (
+                blocks[self.index]
+                if isinstance(blocks, list) and len(blocks) > self.index
+                else None
+            )
+        return block if isinstance(block, dict) else {}
+
+    def read(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Return this instance's common fields from a device payload."""
+        return self.type.extract(self.block(state), self.gen2)
+
+    def events(self, old: Dict[str, Any], new: Dict[str, Any]) -> List[str]:
+        """Return the events this instance produced between two payloads."""
+        if self.type.events is None:
+            return []
+        return self.type.events(self.block(old), self.block(new), self.gen2)
+
+
+def find_components(status: Dict[str, Any], dev_type: Any) -> Tuple[Component, ...]:
+    """Find every registered component instance in one pass over status."""
+    found: List[Component] = []
+    for key, value in status.items():
+        prefix, sep, index = key.partition(":")
+        if sep:
+            component_type = COMPONENT_TYPES.get(prefix)
+            if (
+                component_type is not None
+                and index.isdigit()
+                and isinstance(value, dict)
+            ):
+                found.append(Component(component_type, int(index), True))
+            continue
+        component_type = _GEN1_LISTS.get(key)
+        if (
+            component_type is not None
+            and isinstance(value, list)
+            and value
+            and (
+                component_type.gen1_types is None
+                or dev_type in component_type.gen1_types
+            )
+        ):
+            found.extend(
+                Component(component_type, index, False) for index in range(len(value))
+            )
+
+    for component_type in COMPONENT_TYPES.values():
+        if (
+            component_type.gen1_default
+            and dev_type in (component_type.gen1_types or ())
+            and not any(c.type is component_type for c in found)
+        ):
+            found.append(Component(component_type, 0, False))
+
+    found.sort(key=lambda c: (c.type.key, c.index))
+    return tuple(found)
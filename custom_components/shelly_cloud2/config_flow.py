@@ -10,7 +10,37 @@ import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import callback
 
-from .const import DOMAIN, CONF_SERVER, CONF_AUTH_KEY, CONF_DEVICE_IDS
+from .const import (
+    DOMAIN,
+    CONF_SERVER,
+    CONF_AUTH_KEY,
+    CONF_DEVICE_IDS,
+    CONF_DEDICATED_SESSION,
+    CONF_CHUNK_SIZE_MIN,
+    CONF_CHUNK_SIZE_MAX,
+    CONF_REFRESH_DEBOUNCE,
+    CONF_CAPTURE_TRACE,
+    CONF_LOG_REQUEST_SPANS,
+    CONF_SENSOR_DEADBANDS,
+    CONF_SENSOR_MIN_INTERVAL,
+    CONF_SENSOR_MAX_SILENCE,
+    CONF_LOCAL_HOSTS,
+    CONF_POWER_STATISTICS,
+    CONF_FLEET_AGGREGATES,
+    CONF_DEVICE_TAGS,
+    CLOUD_MAX_IDS_PER_REQUEST,
+    DEFAULT_CHUNK_SIZE_MIN,
+    DEFAULT_CHUNK_SIZE_MAX,
+    DEFAULT_REFRESH_DEBOUNCE,
+    DEFAULT_SENSOR_DEADBANDS,
+    DEFAULT_SENSOR_MIN_INTERVAL,
+    DEFAULT_SENSOR_MAX_SILENCE,
+    DEFAULT_LOCAL_HOSTS,
+    DEFAULT_DEVICE_TAGS,
+)
+from .aggregate import parse_device_tags
+from .filters import parse_deadbands
+from .local import parse_local_hosts
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -30,6 +60,33 @@ def _device_ids_to_text(ids: list[str] | None) -> str:
     return ", ".join(ids)
 
 
+def _valid_deadbands(raw: str | None) -> bool:
+    """Return True if raw parses as sensor deadbands."""
+    try:
+        parse_deadbands(raw)
+    except ValueError:
+        return False
+    return True
+
+
+def _valid_local_hosts(raw: str | None) -> bool:
+    """Return True if raw parses as device_id=host pairs."""
+    try:
+        parse_local_hosts(raw)
+    except ValueError:
+        return False
+    return True
+
+
+def _valid_device_tags(raw: str | None) -> bool:
+    """Return True if raw parses as device_id=tag pairs."""
+    try:
+        parse_device_tags(raw)
+    except ValueError:
+        return False
+    return True
+
+
 def _build_schema(defaults: dict[str, Any] | None = None) -> vol.Schema:
     """Build the data entry schema for the user step."""
     defaults = defaults or {}
@@ -102,10 +159,11 @@ class ShellyCloud2OptionsFlow(config_entries.OptionsFlow):
         self.config_entry = config_entry
 
     async def async_step_init(self, user_input: dict[str, Any] | None = None):
-        """Manage the options for device IDs."""
+        """Manage the options for device IDs and polling behaviour."""
         errors: dict[str, str] = {}
 
-        current_ids: list[str] = self.config_entry.options.get(
+        options = self.config_entry.options
+        current_ids: list[str] = options.get(
             CONF_DEVICE_IDS,
             self.config_entry.data.get(CONF_DEVICE_IDS, []),
         )
@@ -115,18 +173,87 @@ class ShellyCloud2OptionsFlow(config_entries.OptionsFlow):
             device_ids = _parse_device_ids(raw_ids)
             if not device_ids:
                 errors["base"] = "no_devices"
+            elif user_input.get(CONF_CHUNK_SIZE_MIN, DEFAULT_CHUNK_SIZE_MIN) > user_input.get(
+                CONF_CHUNK_SIZE_MAX, DEFAULT_CHUNK_SIZE_MAX
+            ):
+                errors["base"] = "invalid_chunk_bounds"
+            elif not _valid_deadbands(user_input.get(CONF_SENSOR_DEADBANDS)):
+                errors["base"] = "invalid_deadbands"
+            elif not _valid_local_hosts(user_input.get(CONF_LOCAL_HOSTS)):
+                errors["base"] = "invalid_local_hosts"
+            elif not _valid_device_tags(user_input.get(CONF_DEVICE_TAGS)):
+                errors["base"] = "invalid_device_tags"
             else:
-                return self.async_create_entry(
-                    title="",
-                    data={CONF_DEVICE_IDS: device_ids},
-                )
+                data = dict(user_input)
+                data[CONF_DEVICE_IDS] = device_ids
+                return self.async_create_entry(title="", data=data)
 
         data_schema = vol.Schema(
             {
                 vol.Required(
                     CONF_DEVICE_IDS,
                     default=_device_ids_to_text(current_ids),
-                ): str
+                ): str,
+                vol.Optional(
+                    CONF_DEDICATED_SESSION,
+                    default=options.get(CONF_DEDICATED_SESSION, False),
+                ): bool,
+                vol.Optional(
+                    CONF_CHUNK_SIZE_MIN,
+                    default=options.get(CONF_CHUNK_SIZE_MIN, DEFAULT_CHUNK_SIZE_MIN),
+                ): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=CLOUD_MAX_IDS_PER_REQUEST)
+                ),
+                vol.Optional(
+                    CONF_CHUNK_SIZE_MAX,
+                    default=options.get(CONF_CHUNK_SIZE_MAX, DEFAULT_CHUNK_SIZE_MAX),
+                ): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=CLOUD_MAX_IDS_PER_REQUEST)
+                ),
+                vol.Optional(
+                    CONF_REFRESH_DEBOUNCE,
+                    default=options.get(CONF_REFRESH_DEBOUNCE, DEFAULT_REFRESH_DEBOUNCE),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=10)),
+                vol.Optional(
+                    CONF_CAPTURE_TRACE,
+                    default=options.get(CONF_CAPTURE_TRACE, False),
+                ): bool,
+                vol.Optional(
+                    CONF_LOG_REQUEST_SPANS,
+                    default=options.get(CONF_LOG_REQUEST_SPANS, False),
+                ): bool,
+                vol.Optional(
+                    CONF_SENSOR_DEADBANDS,
+                    default=options.get(CONF_SENSOR_DEADBANDS, DEFAULT_SENSOR_DEADBANDS),
+                ): str,
+                vol.Optional(
+                    CONF_SENSOR_MIN_INTERVAL,
+                    default=options.get(
+                        CONF_SENSOR_MIN_INTERVAL, DEFAULT_SENSOR_MIN_INTERVAL
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+                vol.Optional(
+                    CONF_SENSOR_MAX_SILENCE,
+                    default=options.get(
+                        CONF_SENSOR_MAX_SILENCE, DEFAULT_SENSOR_MAX_SILENCE
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=86400)),
+                vol.Optional(
+                    CONF_LOCAL_HOSTS,
+                    default=options.get(CONF_LOCAL_HOSTS, DEFAULT_LOCAL_HOSTS),
+                ): str,
+                vol.Optional(
+                    CONF_POWER_STATISTICS,
+                    default=options.get(CONF_POWER_STATISTICS, False),
+                ): bool,
+                vol.Optional(
+                    CONF_FLEET_AGGREGATES,
+                    default=options.get(CONF_FLEET_AGGREGATES, False),
+                ): bool,
+                vol.Optional(
+                    CONF_DEVICE_TAGS,
+                    default=options.get(CONF_DEVICE_TAGS, DEFAULT_DEVICE_TAGS),
+                ): str,
             }
         )
 
@@ -7,5 +7,101 @@ DOMAIN = "shelly_cloud2"
 CONF_SERVER = "server"
 CONF_AUTH_KEY = "auth_key"
 CONF_DEVICE_IDS = "device_ids"
+CONF_DEDICATED_SESSION = "dedicated_session"
+CONF_CHUNK_SIZE_MIN = "chunk_size_min"
+CONF_CHUNK_SIZE_MAX = "chunk_size_max"
+CONF_REFRESH_DEBOUNCE = "refresh_debounce"
+CONF_CAPTURE_TRACE = "capture_trace"
+CONF_LOG_REQUEST_SPANS = "log_request_spans"
+CONF_SENSOR_DEADBANDS = "sensor_deadbands"
+CONF_SENSOR_MIN_INTERVAL = "sensor_min_interval"
+CONF_SENSOR_MAX_SILENCE = "sensor_max_silence"
+CONF_LOCAL_HOSTS = "local_hosts"
+CONF_POWER_STATISTICS = "power_statistics"
+CONF_FLEET_AGGREGATES = "fleet_aggregates"
+CONF_DEVICE_TAGS = "device_tags"
+
+# Fired on the bus for every input edge or button press seen between polls
+EVENT_INPUT = f"{DOMAIN}_input"
 
 DEFAULT_SCAN_INTERVAL = 10  # seconds
+REQUEST_TIMEOUT = 15  # seconds
+
+# How long a shared fetch engine waits for the other hubs on the same
+# account to join a poll cycle before fetching without them
+ENGINE_COALESCE_WINDOW = 1.0  # seconds
+
+# Time a merged poll cycle may spend fetching; chunks not reached by then
+# keep their last state and are fetched first in the next cycle
+POLL_CYCLE_BUDGET = 8  # seconds, below DEFAULT_SCAN_INTERVAL
+# Remaining budget below which no further chunk is started
+POLL_MIN_SLICE = 0.5  # seconds
+
+# A trace capture switches itself off after writing this much or running
+# this long, so a forgotten capture cannot fill the disk
+CAPTURE_MAX_BYTES = 50 * 1024 * 1024
+CAPTURE_MAX_DURATION = 3600  # seconds
+
+# Window in which post-command refresh requests are merged into one fetch
+DEFAULT_REFRESH_DEBOUNCE = 0.3  # seconds
+
+# Circuit breaker around cloud requests
+CIRCUIT_FAILURE_THRESHOLD = 3  # consecutive failures before opening
+CIRCUIT_BACKOFF_INITIAL = 10  # seconds, doubled per failed probe
+CIRCUIT_BACKOFF_MAX = 300  # seconds
+
+# Offline devices are probed on an exponential backoff instead of every cycle
+OFFLINE_BACKOFF_INITIAL = 60  # seconds
+OFFLINE_BACKOFF_MAX = 900  # seconds
+
+# Burst polling of a single device after a control command
+CONVERGE_INITIAL_DELAY = 0.5  # seconds, doubled after every fetch
+CONVERGE_MAX_DELAY = 4  # seconds
+CONVERGE_TIMEOUT = 15  # seconds
+
+# The cloud accepts at most this many device IDs per /v2/devices/api/get call
+CLOUD_MAX_IDS_PER_REQUEST = 10
+
+# Device IDs per get call; the tuner starts at the cloud's limit, shrinks
+# when chunks get slow, large or fail and grows back up to the maximum
+DEFAULT_CHUNK_SIZE = CLOUD_MAX_IDS_PER_REQUEST
+DEFAULT_CHUNK_SIZE_MIN = 1
+DEFAULT_CHUNK_SIZE_MAX = CLOUD_MAX_IDS_PER_REQUEST
+
+# Sensor write filtering; deadbands are "kind=value[%]" pairs, e.g. "power=5%"
+DEFAULT_SENSOR_DEADBANDS = ""
+DEFAULT_SENSOR_MIN_INTERVAL = 0  # seconds
+DEFAULT_SENSOR_MAX_SILENCE = 900  # seconds
+
+# Rolling power statistics; the ring buffer holds an hour of 10 s polls plus
+# the extra refreshes that follow commands
+POWER_STATS_WINDOWS = (5, 15, 60)  # minutes
+POWER_STATS_CAPACITY = 512  # samples per metered channel
+
+# Energy accumulators; power is only integrated across polls closer than
+# ENERGY_MAX_GAP, and the totals are saved at most every ENERGY_SAVE_DELAY
+ENERGY_MAX_GAP = 300  # seconds
+ENERGY_SAVE_DELAY = 60  # seconds
+
+# Device tags grouping the fleet aggregates, "device_id=tag" pairs
+DEFAULT_DEVICE_TAGS = ""
+
+# LAN-first transport; hosts are "device_id=host" pairs, e.g. "abc123=192.168.1.20"
+DEFAULT_LOCAL_HOSTS = ""
+LOCAL_TIMEOUT = 2  # seconds, before falling back to the cloud
+LOCAL_RETRY_AFTER = 60  # seconds a failed device stays on the cloud
+
+# Fallback full-travel time for covers without maxtime_open/maxtime_close
+DEFAULT_COVER_TRAVEL_TIME = 30  # seconds
+
+# Shelly Cloud rate-limits requests per account; control commands are paced
+# to stay within this budget
+CLOUD_RATE_LIMIT = 5  # requests per second
+# Control commands a bulk_set call keeps in flight at once
+BULK_CONCURRENCY = 3
+
+# Dedicated HTTP session tuning, sized for one poll chunk plus the bulk
+# control commands the rate budget allows in flight
+SESSION_CONNECTION_LIMIT = 1 + BULK_CONCURRENCY
+SESSION_KEEPALIVE_TIMEOUT = 60  # seconds
+SESSION_DNS_CACHE_TTL = 300  # seconds
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import logging
+import time
 from typing import Any, Dict, List
 
 from homeassistant.components.cover import (
@@ -10,16 +11,24 @@ from homeassistant.components.cover import (
     CoverEntityFeature,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.helpers.event import async_call_later
 
-from . import ShellyCloud2Hub
-from .const import DOMAIN, CONF_DEVICE_IDS
+from . import ShellyCloud2Hub, timed_platform_setup
+from .components import COMPONENT_TYPES, Component
+from .const import DOMAIN, CONF_DEVICE_IDS, DEFAULT_COVER_TRAVEL_TIME
+from .entity import ShellyCloud2Entity
 
 _LOGGER = logging.getLogger(__name__)
 
+# How often the interpolated position is written while the cover moves
+_MOTION_TICK = 1.0  # seconds
+# Extra time given to the cloud before the confirmation fetch
+_CONFIRM_MARGIN = 2.0  # seconds
 
+
+@timed_platform_setup("cover")
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -34,30 +43,13 @@ async def async_setup_entry(
 
     entities: list[ShellyCloud2Cover] = []
 
-    data = hub.data or {}
-
     for dev_id in device_ids:
-        state = data.get(dev_id) or {}
-        if state.get("type") != "cover":
-            continue
-
-        status: Dict[str, Any] = state.get("status", {})
-        covers = status.get("covers")
-        if isinstance(covers, list) and covers:
-            for channel, cover in enumerate(covers):
-                entities.append(
-                    ShellyCloud2Cover(
-                        hub=hub,
-                        device_id=dev_id,
-                        channel=channel,
-                    )
-                )
-        else:
+        for component in hub.entity_plan(dev_id).components_for("cover"):
             entities.append(
                 ShellyCloud2Cover(
                     hub=hub,
                     device_id=dev_id,
-                    channel=0,
+                    component=component,
                 )
             )
 
@@ -65,9 +57,56 @@ async def async_setup_entry(
         async_add_entities(entities)
 
 
-class ShellyCloud2Cover(CoordinatorEntity, CoverEntity):
+class _CoverMotion:
+    """Linear travel model of a moving cover."""
+
+    __slots__ = ("start", "start_pos", "target", "duration", "commanded")
+
+    def __init__(
+        self,
+        start_pos: float,
+        target: int,
+        travel_time: float,
+        commanded: bool = True,
+    ) -> None:
+        """Start a motion from start_pos towards target."""
+        self.commanded = commanded
+        self.start = time.monotonic()
+        self.start_pos = start_pos
+        self.target = target
+        self.duration = abs(target - start_pos) / 100.0 * travel_time
+
+    @property
+    def direction(self) -> int:
+        """Return +1 when opening, -1 when closing, 0 when not moving."""
+        if self.target > self.start_pos:
+            return 1
+        if self.target < self.start_pos:
+            return -1
+        return 0
+
+    @property
+    def done(self) -> bool:
+        """Return True once the expected travel time has elapsed."""
+        return time.monotonic() - self.start >= self.duration
+
+    def position(self) -> float:
+        """Return the interpolated position at the current time."""
+        if self.duration <= 0:
+            return float(self.target)
+        fraction = min(1.0, (time.monotonic() - self.start) / self.duration)
+        return self.start_pos + (self.target - self.start_pos) * fraction
+
+
+class ShellyCloud2Cover(ShellyCloud2Entity, CoverEntity):
     """Representation of a Shelly cover channel."""
 
+    _state_paths = (
+        *COMPONENT_TYPES["cover"].state_paths,
+        ("settings", "covers"),
+        ("settings", "rollers"),
+    )
+
     _attr_supported_features = (
         CoverEntityFeature.OPEN
         | CoverEntityFeature.CLOSE
@@ -79,35 +118,62 @@ class ShellyCloud2Cover(CoordinatorEntity, CoverEntity):
         self,
         hub: ShellyCloud2Hub,
         device_id: str,
-        channel: int,
+        component: Component,
     ) -> None:
         """Initialize the cover."""
         super().__init__(hub)
         self._hub = hub
         self._device_id = device_id
-        self._channel = channel
+        self._component = component
+        self._channel = component.index
 
-        state = (hub.data or {}).get(device_id) or {}
-        settings = state.get("settings", {})
-        dev_type = state.get("type", "cover")
-        base_name = settings.get("name")
-        if not base_name:
-            base_name = f"Shelly {dev_type} {device_id}"
+        self._motion: _CoverMotion | None = None
+        self._unsub_tick = None
+        self._unsub_confirm = None
 
-        self._attr_name = f"{base_name} Cover {channel}"
-        self._attr_unique_id = f"shelly_cloud2_{device_id}_cover_{channel}"
+        base_name = hub.device_meta(device_id).name
+
+        self._attr_name = f"{base_name} Cover {self._channel}"
+        self._attr_unique_id = f"shelly_cloud2_{device_id}_cover_{self._channel}"
+
+    def _cover_status(self) -> Dict[str, Any]:
+        """Return the polled direction and position of this cover."""
+        state = (self.coordinator.data or {}).get(self._device_id) or {}
+        return self._component.read(state)
+
+    def _polled_position(self) -> int | None:
+        """Return the last position reported by the cloud."""
+        return self._cover_status()["position"]
+
+    def _travel_time(self, direction: int) -> float:
+        """Return the calibrated full-travel time for the given direction."""
+        state = (self.coordinator.data or {}).get(self._device_id) or {}
+        settings = state.get("settings", {})
+        key = "maxtime_open" if direction > 0 else "maxtime_close"
+        for block_name in ("covers", "rollers"):
+            blocks = settings.get(block_name)
+            if isinstance(blocks, list) and len(blocks) > self._channel:
+                value = blocks[self._channel].get(key)
+                if isinstance(value, (int, float)) and value > 0:
+                    return float(value)
+        return float(DEFAULT_COVER_TRAVEL_TIME)
 
     @property
     def current_cover_position(self) -> int | None:
         """Return the current position of the cover as a percentage."""
-        state = (self.coordinator.data or {}).get(self._device_id) or {}
-        status = state.get("status", {})
-        covers = status.get("covers")
-        if isinstance(covers, list) and len(covers) > self._channel:
-            pos = covers[self._channel].get("position")
-            if isinstance(pos, (int, float)):
-                return int(pos)
-        return None
+        if self._motion is not None:
+            return int(round(self._motion.position()))
+        return self._polled_position()
+
+    @property
+    def is_opening(self) -> bool:
+        """Return if the cover is opening."""
+        return self._motion is not None and self._motion.direction > 0
+
+    @property
+    def is_closing(self) -> bool:
+        """Return if the cover is closing."""
+        return self._motion is not None and self._motion.direction < 0
 
     @property
     def is_closed(self) -> bool | None:
@@ -117,44 +183,122 @@ class ShellyCloud2Cover(CoordinatorEntity, CoverEntity):
             return None
         return position == 0
 
+    def _start_motion(
+        self,
+        target: int,
+        start_pos: float | None = None,
+        commanded: bool = True,
+    ) -> None:
+        """Model a motion towards target and schedule its confirmation fetch."""
+        if start_pos is None:
+            current = self.current_cover_position
+            # Without a known position assume the cover travels end to end
+            start_pos = current if current is not None else 100 - target
+        direction = 1 if target > start_pos else -1
+        self._cancel_motion()
+        self._motion = _CoverMotion(
+            start_pos, target, self._travel_time(direction), commanded
+        )
+        if self._motion.direction == 0:
+            self._motion = None
+            return
+
+        self._unsub_tick = async_call_later(self.hass, _MOTION_TICK, self._async_tick)
+        self._unsub_confirm = async_call_later(
+            self.hass,
+            self._motion.duration + _CONFIRM_MARGIN,
+            self._async_confirm,
+        )
+
+    def _cancel_motion(self) -> None:
+        """Drop the motion model and its scheduled callbacks."""
+        self._motion = None
+        if self._unsub_tick is not None:
+            self._unsub_tick()
+            self._unsub_tick = None
+        if self._unsub_confirm is not None:
+            self._unsub_confirm()
+            self._unsub_confirm = None
+
+    @callback
+    def _async_tick(self, _now: Any) -> None:
+        """Write the interpolated position while the cover is moving."""
+        self._unsub_tick = None
+        if self._motion is None:
+            return
+        if not self._motion.done:
+            self._unsub_tick = async_call_later(
+                self.hass, _MOTION_TICK, self._async_tick
+            )
+        self.async_write_ha_state()
+
+    async def _async_confirm(self, _now: Any) -> None:
+        """Fetch the real state once the motion should have ended."""
+        self._unsub_confirm = None
+        await self._hub.async_request_device_refresh(self._device_id)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Reconcile the motion model with freshly polled state."""
+        cover = self._cover_status()
+        direction = cover["direction"]
+        polled = cover["position"]
+
+        if self._motion is None:
+            if direction and polled is not None:
+                # Motion started outside HA; follow it towards the end stop
+                self._start_motion(100 if direction > 0 else 0, polled, False)
+        elif self._motion.done or polled == self._motion.target:
+            self._cancel_motion()
+        elif direction == 0 and not self._motion.commanded:
+            # The cloud lags behind our own commands, but not behind itself
+            self._cancel_motion()
+
+        super()._handle_coordinator_update()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel scheduled motion callbacks."""
+        self._cancel_motion()
+        await super().async_will_remove_from_hass()
+
     async def async_open_cover(self, **kwargs: Any) -> None:
         """Open the cover."""
-        await self._hub.async_set_cover(
-            device_id=self._device_id,
-            channel=self._channel,
-            position="open",
+        await self._hub.async_command(
+            self._device_id, self._component, position="open"
         )
-        await self.coordinator.async_request_refresh()
+        self._start_motion(100)
+        self.async_write_ha_state()
 
     async def async_close_cover(self, **kwargs: Any) -> None:
         """Close the cover."""
-        await self._hub.async_set_cover(
-            device_id=self._device_id,
-            channel=self._channel,
-            position="close",
+        await self._hub.async_command(
+            self._device_id, self._component, position="close"
         )
-        await self.coordinator.async_request_refresh()
+        self._start_motion(0)
+        self.async_write_ha_state()
 
     async def async_stop_cover(self, **kwargs: Any) -> None:
         """Stop the cover."""
-        await self._hub.async_set_cover(
-            device_id=self._device_id,
-            channel=self._channel,
-            position="stop",
+        await self._hub.async_command(
+            self._device_id, self._component, position="stop"
         )
-        await self.coordinator.async_request_refresh()
+        position = self.current_cover_position
+        self._cancel_motion()
+        if position is not None:
+            # Hold the interpolated position until the refresh lands
+            self._motion = _CoverMotion(position, position, 0)
+        await self._hub.async_request_device_refresh(self._device_id)
 
     async def async_set_cover_position(self, **kwargs: Any) -> None:
         """Set the cover position."""
         position = kwargs.get("position")
         if position is None:
             return
-        await self._hub.async_set_cover(
-            device_id=self._device_id,
-            channel=self._channel,
-            position=int(position),
+        await self._hub.async_command(
+            self._device_id, self._component, position=int(position)
         )
-        await self.coordinator.async_request_refresh()
+        self._start_motion(int(position))
+        self.async_write_ha_state()
 
     @property
     def available(self) -> bool:
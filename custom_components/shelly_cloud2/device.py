@@ -0,0 +1,60 @@
+"""Per-device metadata for Shelly Cloud 2."""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from homeassistant.helpers.device_registry import DeviceInfo
+
+from .const import DOMAIN
+
+
+def _firmware(state: Dict[str, Any]) -> str | None:
+    """Return the firmware version reported in a device payload."""
+    return (
+        state.get("status", {})
+        .get("getinfo", {})
+        .get("fw_info", {})
+        .get("fw")
+    )
+
+
+class DeviceMeta:
+    """Name, model and firmware of one device.
+
+    Built from the settings payload and kept until that payload changes.
+    """
+
+    __slots__ = ("settings", "firmware", "name", "model", "device_info")
+
+    def __init__(self, device_id: str, state: Dict[str, Any]) -> None:
+        """Derive metadata from a device payload."""
+        settings = state.get("settings", {})
+        dev_type = state.get("type", "device")
+        device_meta = settings.get("device", {})
+
+        self.settings: Dict[str, Any] = settings
+        self.firmware = _firmware(state)
+        self.name: str = settings.get("name") or f"Shelly {dev_type} {device_id}"
+        self.model: str = device_meta.get("type") or state.get("code") or dev_type
+
+        info = DeviceInfo(
+            identifiers={(DOMAIN, device_id)},
+            name=self.name,
+            manufacturer="Shelly",
+            model=self.model,
+        )
+        if self.firmware:
+            info["sw_version"] = self.firmware
+        self.device_info = info
+
+    def matches(self, state: Dict[str, Any]) -> bool:
+        """Return True if state still describes the same device metadata."""
+        settings = state.get("settings", {})
+        if settings is self.settings:
+            return True
+        if settings != self.settings or _firmware(state) != self.firmware:
+            return False
+        # Same content; keep the newer object so the identity check hits
+        self.settings = settings
+        return True
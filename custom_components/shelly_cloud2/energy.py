@@ -0,0 +1,135 @@
+"""Per-channel energy accumulators that survive counter resets."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Tuple
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, ENERGY_MAX_GAP, ENERGY_SAVE_DELAY
+
+STORAGE_VERSION = 1
+
+
+class EnergyAccumulator:
+    """Monotonic energy total of one metered channel, in kWh.
+
+    With a meters[].total counter, the accumulator adds the counter's
+    increase since the last poll; a counter that went down was reset (e.g.
+    by a reboot) and its whole new value counts as the increase. Without a
+    counter, power is integrated over the poll timestamps with the
+    trapezoidal rule, skipping gaps longer than ENERGY_MAX_GAP.
+    """
+
+    __slots__ = ("energy", "last_total", "last_power", "last_time")
+
+    def __init__(
+        self,
+        energy: float = 0.0,
+        last_total: float | None = None,
+        last_power: float | None = None,
+        last_time: float | None = None,
+    ) -> None:
+        """Initialize, optionally from persisted values."""
+        self.energy = energy
+        self.last_total = last_total
+        self.last_power = last_power
+        self.last_time = last_time
+
+    def add(self, now: float, total: float | None, power: float | None) -> None:
+        """Account for one reading taken at wall-clock time now."""
+        if total is not None:
+            if self.last_total is None:
+                # First reading: adopt the device counter as is
+                if not self.energy:
+                    self.energy = total / 1000.0
+            elif total >= self.last_total:
+                self.energy += (total - self.last_total) / 1000.0
+            else:
+                self.energy += total / 1000.0
+            self.last_total = total
+        elif (
+            power is not None
+            and self.last_power is not None
+            and self.last_time is not None
+            and 0 < now - self.last_time <= ENERGY_MAX_GAP
+        ):
+            # W * s -> kWh
+            self.energy += (self.last_power + power) / 2 * (now - self.last_time) / 3.6e6
+        self.last_power = power
+        self.last_time = now
+
+    def as_list(self) -> List[Any]:
+        """Return the persisted form."""
+        return [self.energy, self.last_total, self.last_power, self.last_time]
+
+
+class EnergyMeters:
+    """Energy accumulators for every metered channel of one entry."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize; call async_load before adding readings."""
+        self._store: Store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.energy.{entry_id}"
+        )
+        self._channels: Dict[Tuple[str, int], EnergyAccumulator] = {}
+        # A delayed save is scheduled; rescheduling it on every poll would
+        # postpone the write indefinitely
+        self._save_pending = False
+
+    async def async_load(self) -> None:
+        """Restore the accumulators saved by the previous run."""
+        data = await self._store.async_load() or {}
+        for key, values in data.get("channels", {}).items():
+            dev_id, _, channel = key.rpartition(":")
+            try:
+                self._channels[(dev_id, int(channel))] = EnergyAccumulator(*values)
+            except (TypeError, ValueError):
+                continue
+
+    def add_states(self, now: float, states: Dict[str, Any]) -> None:
+        """Account for the meters of freshly fetched device states."""
+        changed = False
+        for dev_id, state in states.items():
+            meters = state.get("status", {}).get("meters")
+            if not isinstance(meters, list):
+                continue
+            for channel, meter in enumerate(meters):
+                if not isinstance(meter, dict):
+                    continue
+                total = meter.get("total")
+                power = meter.get("power")
+                if not isinstance(total, (int, float)):
+                    total = None
+                if not isinstance(power, (int, float)):
+                    power = None
+                if total is None and power is None:
+                    continue
+                acc = self._channels.get((dev_id, channel))
+                if acc is None:
+                    acc = self._channels[(dev_id, channel)] = EnergyAccumulator()
+                acc.add(now, total, power)
+                changed = True
+        if changed and not self._save_pending:
+            self._save_pending = True
+            self._store.async_delay_save(self._data_to_save, ENERGY_SAVE_DELAY)
+
+    def value(self, device_id: str, channel: int) -> float | None:
+        """Return the accumulated energy of a channel in kWh, if known."""
+        acc = self._channels.get((device_id, channel))
+        return acc.energy if acc is not None else None
+
+    def _data_to_save(self) -> Dict[str, Any]:
+        """Return the accumulators in their persisted form."""
+        self._save_pending = False
+        return {
+            "channels": {
+                f"{dev_id}:{channel}": acc.as_list()
+                for (dev_id, channel), acc in self._channels.items()
+            }
+        }
+
+    async def async_save(self) -> None:
+        """Write the accumulators right away."""
+        await self._store.async_save(self._data_to_save())
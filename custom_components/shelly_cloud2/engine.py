@@ -0,0 +1,473 @@
+"""Shared fetch engine for Shelly Cloud 2 hubs on the same account."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from .breaker import CircuitBreaker
+from .chunking import REJECTED_STATUSES, ChunkSizeTuner
+from .client import (
+    ControlRequest,
+    GetStatesRequest,
+    ShellyCloudClient,
+    ShellyCloudCommandError,
+    ShellyCloudError,
+    ShellyCloudHTTPError,
+    ShellyCloudResponseError,
+    ShellyCloudTimeoutError,
+)
+from .profiling import PHASE_HTTP_WAIT, PHASE_JSON_DECODE
+from .tracing import RequestSpan, RequestTracer
+from .const import (
+    CLOUD_MAX_IDS_PER_REQUEST,
+    CLOUD_RATE_LIMIT,
+    DEFAULT_CHUNK_SIZE,
+    ENGINE_COALESCE_WINDOW,
+    POLL_CYCLE_BUDGET,
+    POLL_MIN_SLICE,
+    REQUEST_TIMEOUT,
+    SESSION_CONNECTION_LIMIT,
+    SESSION_DNS_CACHE_TTL,
+    SESSION_KEEPALIVE_TIMEOUT,
+)
+
+if TYPE_CHECKING:
+    from . import ShellyCloud2Hub
+    from .profiling import CycleProfiler
+    from .recording import TraceRecorder
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_ENGINES = "shelly_cloud2_engines"
+
+try:
+    import brotli  # noqa: F401
+
+    _ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    _ACCEPT_ENCODING = "gzip, deflate"
+
+
+def normalize_base_url(server: str) -> str:
+    """Return the base URL for a server host or URL."""
+    server = server.strip()
+    if server.startswith("http://") or server.startswith("https://"):
+        return server.rstrip("/")
+    return f"https://{server.rstrip('/')}"
+
+
+def _create_dedicated_session() -> aiohttp.ClientSession:
+    """Create a keep-alive session tuned for a single Shelly Cloud server."""
+    connector = aiohttp.TCPConnector(
+        limit=SESSION_CONNECTION_LIMIT,
+        keepalive_timeout=SESSION_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=SESSION_DNS_CACHE_TTL,
+        use_dns_cache=True,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers={"Accept-Encoding": _ACCEPT_ENCODING},
+        auto_decompress=True,
+    )
+
+
+class ShellyCloud2FetchEngine:
+    """Fetch device state for every hub sharing one (server, auth_key).
+
+    Hubs poll through async_poll. Polls arriving within a short window are
+    merged into one cycle that fetches the union of their device IDs in
+    full chunks and fans the results back out. Because every hub in a
+    cycle finishes at the same time, their poll timers stay in phase.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        base_url: str,
+        auth_key: str,
+        dedicated_session: bool,
+        chunk_size_min: int,
+        chunk_size_max: int,
+        session: aiohttp.ClientSession | None = None,
+    ) -> None:
+        """Initialize the engine.
+
+        A given session is used as is and left open on release; otherwise
+        the engine uses Home Assistant's shared session or, with
+        dedicated_session, creates and owns its own.
+        """
+        self.hass = hass
+        self.base_url = base_url
+        self.auth_key = auth_key
+
+        self._owns_session = session is None and dedicated_session
+        if session is None:
+            session = (
+                _create_dedicated_session()
+                if dedicated_session
+                else async_get_clientsession(hass)
+            )
+        self.client = ShellyCloudClient(session, base_url, auth_key, REQUEST_TIMEOUT)
+
+        # Options saved before the form enforced the cloud's limit may exceed it
+        self.chunk_tuner = ChunkSizeTuner(
+            minimum=min(chunk_size_min, CLOUD_MAX_IDS_PER_REQUEST),
+            maximum=min(chunk_size_max, CLOUD_MAX_IDS_PER_REQUEST),
+            initial=DEFAULT_CHUNK_SIZE,
+            timeout=REQUEST_TIMEOUT,
+        )
+
+        # Set while a hub captures a request/response trace
+        self.recorder: TraceRecorder | None = None
+        # Set while a hub profiles its poll cycles
+        self.profiler: CycleProfiler | None = None
+        # Receives a span per API request once an exporter is registered
+        self.tracer = RequestTracer()
+
+        self._control_next_slot = 0.0
+        self.breaker = CircuitBreaker(f"Shelly Cloud 2 ({base_url})")
+
+        self._hubs: set[ShellyCloud2Hub] = set()
+        self._poll_waiting: Dict[ShellyCloud2Hub, List[str]] = {}
+        self._poll_ready = asyncio.Event()
+        self._poll_cycle: asyncio.Future | None = None
+        # Devices the last cycle did not reach before its deadline
+        self._carry_over: List[str] = []
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        """Return the (base_url, auth_key) this engine serves."""
+        return (self.base_url, self.auth_key)
+
+    @classmethod
+    def async_acquire(
+        cls,
+        hass: HomeAssistant,
+        hub: ShellyCloud2Hub,
+        server: str,
+        auth_key: str,
+        dedicated_session: bool,
+        chunk_size_min: int,
+        chunk_size_max: int,
+    ) -> ShellyCloud2FetchEngine:
+        """Return the engine for (server, auth_key), creating it if needed.
+
+        Session and chunk bounds come from the first entry on the account.
+        """
+        engines: Dict[Tuple[str, str], ShellyCloud2FetchEngine] = hass.data.setdefault(
+            DATA_ENGINES, {}
+        )
+        key = (normalize_base_url(server), auth_key)
+        engine = engines.get(key)
+        if engine is None:
+            engine = cls(
+                hass,
+                key[0],
+                auth_key,
+                dedicated_session,
+                chunk_size_min,
+                chunk_size_max,
+            )
+            engines[key] = engine
+        engine._hubs.add(hub)
+        return engine
+
+    async def async_release(self, hub: ShellyCloud2Hub) -> None:
+        """Detach a hub and close the engine once no hub uses it."""
+        self._hubs.discard(hub)
+        self._poll_waiting.pop(hub, None)
+        if self._hubs:
+            return
+        engines = self.hass.data.get(DATA_ENGINES, {})
+        if engines.get(self.key) is self:
+            engines.pop(self.key)
+        if self._owns_session and not self.client.session.closed:
+            await self.client.session.close()
+
+    async def async_poll(
+        self, hub: ShellyCloud2Hub, device_ids: List[str]
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """Join the next merged poll cycle.
+
+        Returns this hub's fetched states and its devices the cycle did
+        not reach before its deadline.
+        """
+        self._poll_waiting[hub] = device_ids
+        if self._poll_cycle is None:
+            self._poll_cycle = self.hass.loop.create_future()
+            self.hass.async_create_task(self._async_run_poll(self._poll_cycle))
+        if len(self._poll_waiting) >= sum(1 for h in self._hubs if h.device_ids):
+            self._poll_ready.set()
+
+        states, deferred = await asyncio.shield(self._poll_cycle)
+        return (
+            {dev_id: states[dev_id] for dev_id in device_ids if dev_id in states},
+            [dev_id for dev_id in device_ids if dev_id in deferred],
+        )
+
+    async def _async_run_poll(self, cycle: asyncio.Future) -> None:
+        """Wait for the other hubs briefly, then fetch their union."""
+        queued = time.monotonic()
+        try:
+            await asyncio.wait_for(self._poll_ready.wait(), ENGINE_COALESCE_WINDOW)
+        except asyncio.TimeoutError:
+            pass
+
+        waiting = self._poll_waiting
+        self._poll_waiting = {}
+        self._poll_ready.clear()
+        self._poll_cycle = None
+
+        device_ids = list(dict.fromkeys(d for ids in waiting.values() for d in ids))
+        if self._carry_over:
+            # Devices cut off by the last deadline go first this time
+            requested = set(device_ids)
+            first = [d for d in self._carry_over if d in requested]
+            device_ids = list(dict.fromkeys([*first, *device_ids]))
+        try:
+            # A hub's first refresh needs every device to plan its entities
+            deadline = (
+                None
+                if any(hub.data is None for hub in waiting)
+                else time.monotonic() + POLL_CYCLE_BUDGET
+            )
+            states, deferred = await self._async_fetch_chunks(
+                device_ids, deadline, queued
+            )
+            self._carry_over = deferred
+            cycle.set_result((states, set(deferred)))
+        except asyncio.CancelledError:
+            cycle.cancel()
+            raise
+        except Exception as exc:  # noqa: BLE001 - handed to every waiting hub
+            cycle.set_exception(exc)
+
+    def _record(
+        self,
+        endpoint: str,
+        request: GetStatesRequest | ControlRequest,
+        started: float,
+        status: int | None,
+        response: bytes | str | None,
+        error: Exception | None = None,
+        *,
+        queued: float,
+        chunk_index: int | None = None,
+        decode_time: float | None = None,
+        payload: Any = None,
+    ) -> None:
+        """Hand a finished request to the trace recorder and span exporters.
+
+        payload is the already decoded response, recorded instead of the
+        raw response when given.
+        """
+        if self.recorder is not None:
+            self.recorder.record(
+                endpoint,
+                request.body(),
+                started,
+                status,
+                response if payload is None else payload,
+                error,
+            )
+        if self.tracer.exporters:
+            if isinstance(response, str):
+                payload_bytes = len(response.encode())
+            else:
+                payload_bytes = len(response) if response else 0
+            self.tracer.emit(
+                RequestSpan(
+                    endpoint=endpoint,
+                    chunk_index=chunk_index,
+                    device_count=(
+                        len(request.ids) if isinstance(request, GetStatesRequest) else 1
+                    ),
+                    queue_wait=started - queued,
+                    duration=time.monotonic() - started,
+                    status=status,
+                    payload_bytes=payload_bytes,
+                    decode_time=decode_time,
+                    error=repr(error) if error is not None else None,
+                )
+            )
+
+    async def async_fetch_states(self, device_ids: List[str]) -> Dict[str, Any]:
+        """Fetch state for the given devices in tuned chunks."""
+        states, _ = await self._async_fetch_chunks(device_ids, None)
+        return states
+
+    async def _async_fetch_chunks(
+        self,
+        device_ids: List[str],
+        deadline: float | None,
+        queued: float | None = None,
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """Fetch device states chunk by chunk until done or the deadline.
+
+        The first chunk always runs with the full REQUEST_TIMEOUT, so a
+        cycle either progresses or fails on a real timeout; later chunks
+        may use the rest of the budget, up to REQUEST_TIMEOUT. Returns the
+        states and the devices left when the budget ran out.
+        queued is when the fetch was requested, for the spans' queue wait.
+        """
+        if queued is None:
+            queued = time.monotonic()
+        states: Dict[str, Any] = {}
+        tuner = self.chunk_tuner
+        i = 0
+        chunk_index = 0
+        while i < len(device_ids):
+            timeout: float = REQUEST_TIMEOUT
+            if i and deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining < POLL_MIN_SLICE:
+                    break
+                timeout = min(timeout, remaining)
+            chunk = device_ids[i : i + tuner.size]
+            probe = self.breaker.before_request()
+            if probe:
+                # Half-open: probe with the smallest possible request
+                chunk = chunk[:1]
+            request = GetStatesRequest(tuple(chunk))
+            trace = {"queued": queued, "chunk_index": chunk_index}
+            chunk_index += 1
+            started = time.monotonic()
+            try:
+                response = await self.client.async_get_states(request, timeout)
+            except asyncio.CancelledError:
+                if probe:
+                    self.breaker.abort_probe()
+                raise
+            except ShellyCloudTimeoutError as exc:
+                self._record("get", request, started, None, None, exc, **trace)
+                if i and deadline is not None:
+                    # Earlier chunks used up the budget; carry the rest over
+                    if probe:
+                        self.breaker.abort_probe()
+                    break
+                tuner.record_failure(len(chunk))
+                self.breaker.record_failure()
+                raise UpdateFailed(f"Error fetching devices state: {exc}") from exc
+            except ShellyCloudHTTPError as exc:
+                self._record("get", request, started, exc.status, exc.text, **trace)
+                if exc.status >= 500:
+                    self.breaker.record_failure()
+                else:
+                    # The cloud answered; a 4xx is not an outage
+                    self.breaker.record_success()
+                if exc.status in REJECTED_STATUSES and tuner.record_rejected(
+                    len(chunk)
+                ):
+                    _LOGGER.debug(
+                        "Cloud rejected %s IDs per request, retrying with %s",
+                        len(chunk),
+                        tuner.size,
+                    )
+                    continue
+                tuner.record_failure(len(chunk))
+                raise UpdateFailed(
+                    f"Error {exc.status} fetching devices state: {exc.text}"
+                ) from exc
+            except ShellyCloudResponseError as exc:
+                self._record("get", request, started, 200, exc.raw, **trace)
+                self.breaker.record_success()
+                tuner.record_failure(len(chunk))
+                raise UpdateFailed(
+                    "Unexpected response format from Shelly Cloud API"
+                ) from exc
+            except ShellyCloudError as exc:
+                tuner.record_failure(len(chunk))
+                self.breaker.record_failure()
+                self._record("get", request, started, None, None, exc, **trace)
+                raise UpdateFailed(f"Error fetching devices state: {exc}") from exc
+
+            self._record(
+                "get",
+                request,
+                started,
+                200,
+                response.raw,
+                decode_time=response.decode_time,
+                payload=list(response.states.values()),
+                **trace,
+            )
+            profiler = self.profiler
+            if profiler is not None:
+                profiler.add(PHASE_HTTP_WAIT, response.http_time)
+                profiler.add(PHASE_JSON_DECODE, response.decode_time)
+            self.breaker.record_success()
+            tuner.record_success(
+                len(chunk), time.monotonic() - started, len(response.raw)
+            )
+            i += len(chunk)
+            states.update(response.states)
+
+        deferred = device_ids[i:]
+        if deferred:
+            _LOGGER.debug(
+                "Poll deadline reached, %s devices carried over to the next cycle",
+                len(deferred),
+            )
+        return states, deferred
+
+    async def _async_pace_control(self) -> None:
+        """Space control commands to stay within the account rate budget."""
+        now = time.monotonic()
+        slot = max(now, self._control_next_slot)
+        self._control_next_slot = slot + 1 / CLOUD_RATE_LIMIT
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def async_send_control(self, request: ControlRequest) -> None:
+        """Send a control request through /v2/devices/api/set/<kind>."""
+        endpoint = f"set/{request.kind}"
+        queued = time.monotonic()
+        await self._async_pace_control()
+        probe = self.breaker.before_request()
+        started = time.monotonic()
+
+        try:
+            response = await self.client.async_set(request)
+        except asyncio.CancelledError:
+            if probe:
+                self.breaker.abort_probe()
+            raise
+        except ShellyCloudHTTPError as exc:
+            self._record(
+                endpoint, request, started, exc.status, exc.text, queued=queued
+            )
+            if exc.status >= 500:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise UpdateFailed(
+                f"Control command failed with HTTP {exc.status}: {exc.text}"
+            ) from exc
+        except ShellyCloudCommandError as exc:
+            self._record(endpoint, request, started, 200, exc.text, queued=queued)
+            self.breaker.record_success()
+            raise UpdateFailed(f"Control command error: {exc}") from exc
+        except ShellyCloudError as exc:
+            self.breaker.record_failure()
+            self._record(endpoint, request, started, None, None, exc, queued=queued)
+            raise UpdateFailed(f"Error sending control command: {exc}") from exc
+
+        self._record(
+            endpoint,
+            request,
+            started,
+            response.status,
+            response.text,
+            queued=queued,
+            payload=response.data,
+        )
+        self.breaker.record_success()
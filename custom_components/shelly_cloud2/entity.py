@@ -0,0 +1,31 @@
+"""Base entity for Shelly Cloud 2."""
+
+from __future__ import annotations
+
+from typing import Tuple
+
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from . import ShellyCloud2Hub
+from .projection import StatePath
+
+
+class ShellyCloud2Entity(CoordinatorEntity[ShellyCloud2Hub]):
+    """Coordinator entity that declares which payload fields it reads."""
+
+    _hub: ShellyCloud2Hub
+    _device_id: str
+
+    # Payload paths read by this entity, kept when the hub trims state
+    _state_paths: Tuple[StatePath, ...] = ()
+
+    async def async_added_to_hass(self) -> None:
+        """Register the payload fields this entity needs."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self.coordinator.async_track_state_paths(self._state_paths))
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return device information for the device registry."""
+        return self.coordinator.device_meta(self._device_id).device_info
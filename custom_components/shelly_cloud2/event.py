@@ -0,0 +1,92 @@
+"""Event platform for Shelly Cloud 2 inputs and buttons."""
+
+from __future__ import annotations
+
+import logging
+from typing import List
+
+from homeassistant.components.event import EventDeviceClass, EventEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from . import ShellyCloud2Hub, timed_platform_setup
+from .components import COMPONENT_TYPES, INPUT_EVENT_TYPES, Component
+from .const import DOMAIN, CONF_DEVICE_IDS
+from .entity import ShellyCloud2Entity
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@timed_platform_setup("event")
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up Shelly Cloud 2 input events from a config entry."""
+    hub: ShellyCloud2Hub = hass.data[DOMAIN][entry.entry_id]
+    device_ids: List[str] = entry.options.get(
+        CONF_DEVICE_IDS,
+        entry.data.get(CONF_DEVICE_IDS, []),
+    )
+
+    entities: list[ShellyCloud2InputEvent] = []
+
+    for dev_id in device_ids:
+        for component in hub.entity_plan(dev_id).components:
+            if component.type.events is None:
+                continue
+            entities.append(
+                ShellyCloud2InputEvent(
+                    hub=hub,
+                    device_id=dev_id,
+                    component=component,
+                )
+            )
+
+    if entities:
+        async_add_entities(entities)
+
+
+class ShellyCloud2InputEvent(ShellyCloud2Entity, EventEntity):
+    """Presses and level changes of a Shelly input, seen between polls."""
+
+    _state_paths = COMPONENT_TYPES["input"].state_paths
+
+    _attr_device_class = EventDeviceClass.BUTTON
+    _attr_event_types = list(INPUT_EVENT_TYPES)
+
+    def __init__(
+        self,
+        hub: ShellyCloud2Hub,
+        device_id: str,
+        component: Component,
+    ) -> None:
+        """Initialize the event entity."""
+        super().__init__(hub)
+        self._hub = hub
+        self._device_id = device_id
+        self._component = component
+
+        base_name = hub.device_meta(device_id).name
+
+        self._attr_name = f"{base_name} Input {component.index} event"
+        self._attr_unique_id = (
+            f"shelly_cloud2_{device_id}_input_{component.index}_event"
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the hub's input events."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._hub.async_add_input_listener(
+                self._device_id, self._component.index, self._async_handle_event
+            )
+        )
+
+    @callback
+    def _async_handle_event(self, event_type: str) -> None:
+        """Record an input event."""
+        self._trigger_event(event_type)
+        self.async_write_ha_state()
@@ -0,0 +1,82 @@
+"""Write filtering for noisy Shelly Cloud 2 sensors."""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, Tuple
+
+# kind -> (threshold, is_percent)
+Deadbands = Dict[str, Tuple[float, bool]]
+
+
+def parse_deadbands(raw: str | None) -> Deadbands:
+    """Parse "power=5%, temperature=0.2" into per-kind deadbands.
+
+    Raises ValueError on malformed entries and on negative, infinite or
+    NaN values.
+    """
+    deadbands: Deadbands = {}
+    if not raw:
+        return deadbands
+    for part in raw.replace("\n", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        kind, sep, value = part.partition("=")
+        kind = kind.strip()
+        value = value.strip()
+        if not sep or not kind or not value:
+            raise ValueError(f"Invalid deadband entry: {part}")
+        is_percent = value.endswith("%")
+        threshold = float(value.rstrip("%").strip())
+        if not math.isfinite(threshold) or threshold < 0:
+            # A NaN deadband would make every comparison False
+            raise ValueError(f"Deadband for {kind} must be finite and not negative")
+        deadbands[kind] = (threshold, is_percent)
+    return deadbands
+
+
+class SensorWriteFilter:
+    """Decide whether a sensor value change is worth a state write."""
+
+    def __init__(
+        self,
+        deadbands: Deadbands,
+        min_interval: float,
+        max_silence: float,
+    ) -> None:
+        """Initialize with per-kind deadbands and write intervals in seconds."""
+        self.deadbands = deadbands
+        self.min_interval = min_interval
+        self.max_silence = max_silence
+
+    @property
+    def active(self) -> bool:
+        """Return True if any filtering is configured."""
+        return bool(self.deadbands) or self.min_interval > 0
+
+    def should_write(
+        self,
+        kind: str,
+        last_value: Any,
+        value: Any,
+        since_last_write: float,
+    ) -> bool:
+        """Return True if value should replace last_value now."""
+        if value == last_value:
+            return False
+        if self.max_silence and since_last_write >= self.max_silence:
+            return True
+        if since_last_write < self.min_interval:
+            return False
+        if not isinstance(value, (int, float)) or not isinstance(
+            last_value, (int, float)
+        ):
+            return True
+        band = self.deadbands.get(kind)
+        if band is None:
+            return True
+        threshold, is_percent = band
+        if is_percent:
+            threshold = abs(last_value) * threshold / 100
+        return abs(value - last_value) >= threshold
@@ -1,14 +1,13 @@
 """Light platform for Shelly Cloud 2.
 
-This implementation prepares support for light devices. It relies on the
-Cloud 2 status format for lights, which may vary between models. The
-entities are only created for devices reported as type "light".
+Entities are created for Gen1 devices reported as type "light" and for
+every Gen2+ light:N component.
 """
 
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, List
+from typing import Any, List
 
 from homeassistant.components.light import (
     ATTR_BRIGHTNESS,
@@ -19,14 +18,16 @@ from homeassistant.components.light import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from . import ShellyCloud2Hub
+from . import ShellyCloud2Hub, timed_platform_setup
+from .components import COMPONENT_TYPES, Component
 from .const import DOMAIN, CONF_DEVICE_IDS
+from .entity import ShellyCloud2Entity
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@timed_platform_setup("light")
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -41,30 +42,13 @@ async def async_setup_entry(
 
     entities: list[ShellyCloud2Light] = []
 
-    data = hub.data or {}
-
     for dev_id in device_ids:
-        state = data.get(dev_id) or {}
-        if state.get("type") != "light":
-            continue
-
-        status: Dict[str, Any] = state.get("status", {})
-        lights = status.get("lights")
-        if isinstance(lights, list) and lights:
-            for channel, light in enumerate(lights):
-                entities.append(
-                    ShellyCloud2Light(
-                        hub=hub,
-                        device_id=dev_id,
-                        channel=channel,
-                    )
-                )
-        else:
+        for component in hub.entity_plan(dev_id).components_for("light"):
             entities.append(
                 ShellyCloud2Light(
                     hub=hub,
                     device_id=dev_id,
-                    channel=0,
+                    component=component,
                 )
             )
 
@@ -72,29 +56,27 @@ async def async_setup_entry(
         async_add_entities(entities)
 
 
-class ShellyCloud2Light(CoordinatorEntity, LightEntity):
+class ShellyCloud2Light(ShellyCloud2Entity, LightEntity):
     """Representation of a Shelly light channel."""
 
+    _state_paths = COMPONENT_TYPES["light"].state_paths
+
     _attr_supported_color_modes = {ColorMode.BRIGHTNESS}
 
     def __init__(
         self,
         hub: ShellyCloud2Hub,
         device_id: str,
-        channel: int,
+        component: Component,
     ) -> None:
         """Initialize the light."""
         super().__init__(hub)
         self._hub = hub
         self._device_id = device_id
-        self._channel = channel
+        self._component = component
+        channel = component.index
 
-        state = (hub.data or {}).get(device_id) or {}
-        settings = state.get("settings", {})
-        dev_type = state.get("type", "light")
-        base_name = settings.get("name")
-        if not base_name:
-            base_name = f"Shelly {dev_type} {device_id}"
+        base_name = hub.device_meta(device_id).name
 
         self._attr_name = f"{base_name} Light {channel}"
         self._attr_unique_id = f"shelly_cloud2_{device_id}_light_{channel}"
@@ -103,23 +85,16 @@ class ShellyCloud2Light(CoordinatorEntity, LightEntity):
     def is_on(self) -> bool:
         """Return true if light is on."""
         state = (self.coordinator.data or {}).get(self._device_id) or {}
-        status = state.get("status", {})
-        lights = status.get("lights")
-        if isinstance(lights, list) and len(lights) > self._channel:
-            return bool(lights[self._channel].get("on"))
-        return False
+        return self._component.read(state)["on"]
 
     @property
     def brightness(self) -> int | None:
         """Return brightness in 0-255 scale if available."""
         state = (self.coordinator.data or {}).get(self._device_id) or {}
-        status = state.get("status", {})
-        lights = status.get("lights")
-        if isinstance(lights, list) and len(lights) > self._channel:
-            br = lights[self._channel].get("brightness")
-            if isinstance(br, (int, float)):
-                return max(0, min(255, int(br * 2.55)))
-        return None
+        br = self._component.read(state)["brightness"]
+        if br is None:
+            return None
+        return max(0, min(255, int(br * 2.55)))
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the light on."""
@@ -137,24 +112,20 @@ class ShellyCloud2Light(CoordinatorEntity, LightEntity):
             mode = mode or "white"
             cloud_brightness = int(brightness / 2.55)
 
-        await self._hub.async_set_light(
-            device_id=self._device_id,
-            channel=self._channel,
+        await self._hub.async_command(
+            self._device_id,
+            self._component,
             on=True,
             mode=mode,
             temperature=temperature,
             brightness=cloud_brightness,
         )
-        await self.coordinator.async_request_refresh()
+        await self._hub.async_request_device_refresh(self._device_id)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the light off."""
-        await self._hub.async_set_light(
-            device_id=self._device_id,
-            channel=self._channel,
-            on=False,
-        )
-        await self.coordinator.async_request_refresh()
+        await self._hub.async_command(self._device_id, self._component, on=False)
+        await self._hub.async_request_device_refresh(self._device_id)
 
     @property
     def available(self) -> bool:
@@ -0,0 +1,178 @@
+"""LAN transport for Shelly devices reachable from Home Assistant.
+
+Gen1 devices answer ``GET /status`` and ``GET /relay/<n>?turn=on|off``.
+Gen2+ devices answer JSON-RPC on ``POST /rpc`` (``Shelly.GetStatus``,
+``Switch.Set``). Both status formats match what Shelly Cloud returns in a
+device's ``status`` block, so local results slot into the same state map.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import LOCAL_RETRY_AFTER, LOCAL_TIMEOUT
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class LocalUnavailable(Exception):
+    """Raised when a device cannot be reached on the LAN."""
+
+
+def parse_local_hosts(raw: str | None) -> Dict[str, str]:
+    """Parse "device_id=host, ..." into a device_id -> host mapping.
+
+    Raises ValueError on malformed entries.
+    """
+    hosts: Dict[str, str] = {}
+    if not raw:
+        return hosts
+    for part in raw.replace("\n", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        device_id, sep, host = part.partition("=")
+        device_id = device_id.strip()
+        host = host.strip().rstrip("/")
+        if not sep or not device_id or not host:
+            raise ValueError(f"Invalid local host entry: {part}")
+        hosts[device_id] = host
+    return hosts
+
+
+class LocalTransport:
+    """Read and switch devices directly over HTTP on the LAN."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        hosts: Dict[str, str],
+        session: aiohttp.ClientSession | None = None,
+    ) -> None:
+        """Initialize with a device_id -> host mapping.
+
+        Uses Home Assistant's shared session unless one is given.
+        """
+        self.hass = hass
+        self.hosts = hosts
+        self._session = session or async_get_clientsession(hass)
+        # device_id -> generation (1 or 2), learned from GET /shelly
+        self._generations: Dict[str, int] = {}
+        # device_id -> time before which the cloud is used instead
+        self._retry_at: Dict[str, float] = {}
+
+    def _base_url(self, device_id: str) -> str:
+        """Return the HTTP base URL of a device."""
+        host = self.hosts[device_id]
+        if host.startswith("http://") or host.startswith("https://"):
+            return host
+        return f"http://{host}"
+
+    def available(self, device_id: str) -> bool:
+        """Return True if the device should be tried locally now."""
+        if device_id not in self.hosts:
+            return False
+        return self._retry_at.get(device_id, 0.0) <= time.monotonic()
+
+    def _mark_failed(self, device_id: str, exc: Exception) -> None:
+        """Use the cloud for a while after a local failure."""
+        if device_id not in self._retry_at or self._retry_at[device_id] == 0.0:
+            _LOGGER.debug(
+                "Device %s not reachable locally, using the cloud: %s", device_id, exc
+            )
+        self._retry_at[device_id] = time.monotonic() + LOCAL_RETRY_AFTER
+
+    async def _async_request(
+        self, method: str, url: str, **kwargs: Any
+    ) -> Any:
+        """Send a request to a device and return the decoded JSON body."""
+        async with self._session.request(
+            method, url, timeout=aiohttp.ClientTimeout(total=LOCAL_TIMEOUT), **kwargs
+        ) as resp:
+            if resp.status != 200:
+                raise LocalUnavailable(f"HTTP {resp.status} from {url}")
+            return await resp.json(content_type=None)
+
+    async def _async_generation(self, device_id: str) -> int:
+        """Return the device generation, asking the device once."""
+        gen = self._generations.get(device_id)
+        if gen is None:
+            info = await self._async_request("GET", f"{self._base_url(device_id)}/shelly")
+            gen = int(info.get("gen", 1)) if isinstance(info, dict) else 1
+            self._generations[device_id] = gen
+        return gen
+
+    async def _async_call(self, device_id: str, coro_factory: Any) -> Any:
+        """Run a local call, translating failures into LocalUnavailable."""
+        try:
+            result = await coro_factory()
+        except asyncio.CancelledError:
+            raise
+        except LocalUnavailable as exc:
+            self._mark_failed(device_id, exc)
+            raise
+        except Exception as exc:
+            self._mark_failed(device_id, exc)
+            raise LocalUnavailable(str(exc)) from exc
+        self._retry_at[device_id] = 0.0
+        return result
+
+    async def async_get_status(self, device_id: str) -> Dict[str, Any]:
+        """Return the device's status block."""
+
+        async def _fetch() -> Dict[str, Any]:
+            base = self._base_url(device_id)
+            if await self._async_generation(device_id) >= 2:
+                reply = await self._async_request(
+                    "POST",
+                    f"{base}/rpc",
+                    json={"id": 1, "method": "Shelly.GetStatus"},
+                )
+                status = reply.get("result") if isinstance(reply, dict) else None
+            else:
+                status = await self._async_request("GET", f"{base}/status")
+            if not isinstance(status, dict):
+                raise LocalUnavailable(f"Unexpected status from {base}")
+            return status
+
+        return await self._async_call(device_id, _fetch)
+
+    async def async_set_switch(
+        self,
+        device_id: str,
+        channel: int,
+        on: bool,
+        toggle_after: int | None = None,
+    ) -> None:
+        """Switch a relay channel."""
+
+        async def _set() -> None:
+            base = self._base_url(device_id)
+            if await self._async_generation(device_id) >= 2:
+                params: Dict[str, Any] = {"id": channel, "on": on}
+                if toggle_after is not None:
+                    params["toggle_after"] = toggle_after
+                reply = await self._async_request(
+                    "POST",
+                    f"{base}/rpc",
+                    json={"id": 1, "method": "Switch.Set", "params": params},
+                )
+                if isinstance(reply, dict) and "error" in reply:
+                    raise LocalUnavailable(f"Switch.Set failed: {reply['error']}")
+            else:
+                query: Dict[str, Any] = {"turn": "on" if on else "off"}
+                if toggle_after is not None:
+                    query["timer"] = toggle_after
+                await self._async_request(
+                    "GET", f"{base}/relay/{channel}", params=query
+                )
+
+        await self._async_call(device_id, _set)
@@ -0,0 +1,124 @@
+"""Classification of Shelly Cloud 2 devices into per-platform entity plans."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Hashable, Tuple
+
+from .components import Component, find_components
+
+
+def find_status_block(status: dict, prefix: str) -> dict | None:
+    """Return the first status block whose key starts with prefix."""
+    for k, v in status.items():
+        if k.startswith(prefix) and isinstance(v, dict):
+            return v
+    return None
+
+
+class EntityPlan:
+    """Which entities each platform creates for one device."""
+
+    __slots__ = ("sensors", "components", "binary_sensors")
+
+    def __init__(
+        self,
+        sensors: Tuple[str, ...] = (),
+        components: Tuple[Component, ...] = (),
+        binary_sensors: Tuple[str, ...] = (),
+    ) -> None:
+        """Initialize the plan."""
+        self.sensors = sensors
+        self.components = components
+        self.binary_sensors = binary_sensors
+
+    def components_for(self, platform: str) -> Tuple[Component, ...]:
+        """Return the component instances that become entities of platform."""
+        return tuple(c for c in self.components if c.type.platform == platform)
+
+
+def payload_shape(state: Dict[str, Any]) -> Hashable:
+    """Return a key that changes whenever classification could change.
+
+    Covers the device type, the status block keys with their list lengths
+    or dict keys, and whether settings carry an update timestamp.
+    """
+    status = state.get("status", {})
+    blocks = tuple(
+        (
+            key,
+            len(value)
+            if isinstance(value, list)
+            else tuple(value)
+            if isinstance(value, dict)
+            else None,
+        )
+        for key, value in status.items()
+    )
+    return (state.get("type"), "_updated" in state.get("settings", {}), blocks)
+
+
+def _battery_value(status: Dict[str, Any]) -> Any:
+    """Return the battery percentage from G1 or G3 status, if any."""
+    bat = status.get("bat")
+    if isinstance(bat, dict) and bat.get("value") is not None:
+        return bat.get("value")
+    dp_block = find_status_block(status, "devicepower:")
+    if isinstance(dp_block, dict):
+        battery = dp_block.get("battery")
+        if isinstance(battery, dict):
+            return battery.get("percent")
+    return None
+
+
+def classify(state: Dict[str, Any]) -> EntityPlan:
+    """Probe a device payload once and plan the entities of every platform."""
+    status: Dict[str, Any] = state.get("status", {})
+    dev_type = state.get("type")
+
+    sensors: list[str] = []
+
+    tmp = status.get("tmp")
+    temp_block = find_status_block(status, "temperature:")
+    if (
+        "temperature" in status
+        or (isinstance(tmp, dict) and "tC" in tmp)
+        or (temp_block and "tC" in temp_block)
+    ):
+        sensors.append("temperature")
+
+    hum_block = find_status_block(status, "humidity:")
+    if hum_block and "rh" in hum_block:
+        sensors.append("humidity")
+
+    # Power and energy from meters[0] (typical for relays/plugs)
+    meters = status.get("meters")
+    if isinstance(meters, list) and meters:
+        sensors.extend(("power", "energy"))
+
+    if dev_type == "sensor":
+        if _battery_value(status) is not None:
+            sensors.append("battery")
+        lux = status.get("lux")
+        if isinstance(lux, dict) and "value" in lux:
+            sensors.append("illuminance")
+
+    wifi_sta = status.get("wifi_sta")
+    wifi = status.get("wifi")
+    if (isinstance(wifi_sta, dict) and "rssi" in wifi_sta) or (
+        isinstance(wifi, dict) and "rssi" in wifi
+    ):
+        sensors.append("rssi")
+
+    if "_updated" in status or "_updated" in state.get("settings", {}):
+        sensors.append("last_update")
+
+    binary_sensors: Tuple[str, ...] = ()
+    sensor_block = status.get("sensor")
+    if dev_type == "sensor" and isinstance(sensor_block, dict) and "state" in sensor_block:
+        binary_sensors = ("door",)
+
+    return EntityPlan(
+        sensors=tuple(sensors),
+        components=find_components(status, dev_type),
+        binary_sensors=binary_sensors,
+    )
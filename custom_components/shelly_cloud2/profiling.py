@@ -0,0 +1,117 @@
+"""On-demand profiling of Shelly Cloud 2 poll cycles."""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import logging
+import pstats
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+# Phases reported in the breakdown, in pipeline order
+PHASE_HTTP_WAIT = "http_wait"
+PHASE_JSON_DECODE = "json_decode"
+PHASE_STATE_EXTRACTION = "state_extraction"
+PHASE_STATE_WRITES = "state_writes"
+PHASES = (
+    PHASE_HTTP_WAIT,
+    PHASE_JSON_DECODE,
+    PHASE_STATE_EXTRACTION,
+    PHASE_STATE_WRITES,
+)
+
+_STATS_LIMIT = 60
+
+
+class CycleProfiler:
+    """Profile a fixed number of poll cycles and write a report.
+
+    The hub only holds a profiler while one was requested, so inactive
+    profiling costs a single attribute check per phase.
+    """
+
+    def __init__(self, hass: HomeAssistant, path: str, cycles: int) -> None:
+        """Initialize the profiler for the given number of cycles."""
+        self.hass = hass
+        self.path = path
+        self.remaining = cycles
+        self._cycles: List[Dict[str, float]] = []
+        self._phases: Dict[str, float] = defaultdict(float)
+        self._profile = cProfile.Profile()
+        self._profiling = False
+        self._cycle_start = 0.0
+
+    @property
+    def finished(self) -> bool:
+        """Return True once all requested cycles were profiled."""
+        return self.remaining <= 0
+
+    def add(self, name: str, seconds: float) -> None:
+        """Add time measured by the caller to a phase."""
+        self._phases[name] += seconds
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Accumulate wall time spent in a phase of the current cycle."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._phases[name] += time.perf_counter() - start
+
+    def start_cycle(self) -> None:
+        """Begin profiling one cycle."""
+        self._phases = defaultdict(float)
+        self._cycle_start = time.perf_counter()
+        try:
+            self._profile.enable()
+        except ValueError:
+            # Another profiler (e.g. of a different account) is active in
+            # this thread; record the phase times of this cycle only
+            _LOGGER.warning("Another profiler is active, skipping call stats")
+            return
+        self._profiling = True
+
+    def end_cycle(self) -> None:
+        """Finish the current cycle."""
+        if self._profiling:
+            self._profile.disable()
+            self._profiling = False
+        cycle = {name: self._phases.get(name, 0.0) for name in PHASES}
+        cycle["total"] = time.perf_counter() - self._cycle_start
+        self._cycles.append(cycle)
+        self.remaining -= 1
+
+    async def async_write_report(self) -> None:
+        """Write the phase breakdown and hot functions to the report file."""
+        out = io.StringIO()
+        out.write(f"Shelly Cloud 2 poll profile, {len(self._cycles)} cycle(s)\n\n")
+        out.write("Per-phase wall time (ms)\n")
+        header = ["cycle", *PHASES, "total"]
+        out.write("".join(f"{col:>18}" for col in header) + "\n")
+        for index, cycle in enumerate(self._cycles, 1):
+            row = [str(index)] + [
+                f"{cycle[name] * 1000:.1f}" for name in (*PHASES, "total")
+            ]
+            out.write("".join(f"{col:>18}" for col in row) + "\n")
+
+        out.write("\nHot functions (cumulative time)\n")
+        stats = pstats.Stats(self._profile, stream=out)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(_STATS_LIMIT)
+        out.write("\nHot functions (own time)\n")
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(_STATS_LIMIT)
+
+        await self.hass.async_add_executor_job(self._write, out.getvalue())
+        _LOGGER.info("Wrote Shelly Cloud 2 profile to %s", self.path)
+
+    def _write(self, report: str) -> None:
+        """Write the report file."""
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write(report)
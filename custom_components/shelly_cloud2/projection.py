@@ -0,0 +1,105 @@
+"""Trim raw Shelly Cloud 2 device payloads down to the fields in use."""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, Tuple
+
+# A path into a device payload, e.g. ("status", "meters"). A key ending in
+# "*" matches every key with that prefix, e.g. ("status", "temperature:*").
+StatePath = Tuple[str, ...]
+
+# Fields read by availability checks, naming and device_info
+BASE_STATE_PATHS: Tuple[StatePath, ...] = (
+    ("id",),
+    ("type",),
+    ("code",),
+    ("online",),
+    ("status", "cloud"),
+    ("status", "_updated"),
+    ("status", "getinfo", "fw_info", "fw"),
+    ("settings", "name"),
+    ("settings", "device", "type"),
+    ("settings", "_updated"),
+)
+
+# Marks a subtree that is kept whole
+_KEEP = True
+
+
+def build_projection(paths: Iterable[StatePath]) -> Dict[str, Any]:
+    """Build a projection tree from a set of payload paths."""
+    tree: Dict[str, Any] = {}
+    for path in paths:
+        node = tree
+        for key in path[:-1]:
+            child = node.get(key)
+            if child is _KEEP:
+                break
+            if child is None:
+                child = node[key] = {}
+            node = child
+        else:
+            node[path[-1]] = _KEEP
+    return tree
+
+
+def project(payload: Any, tree: Dict[str, Any] | bool) -> Any:
+    """Return a copy of payload holding only the fields named in tree.
+
+    Lists and scalars below a kept key are shared, not copied.
+    """
+    if tree is _KEEP or not isinstance(payload, dict):
+        return payload
+    wildcards = [(key[:-1], sub) for key, sub in tree.items() if key.endswith("*")]
+    out: Dict[str, Any] = {}
+    for key, value in payload.items():
+        sub = tree.get(key)
+        if sub is None:
+            for prefix, candidate in wildcards:
+                if key.startswith(prefix):
+                    sub = candidate
+                    break
+            else:
+                continue
+        out[key] = project(value, sub)
+    return out
+
+
+class StateProjection:
+    """Projection derived from the paths registered by active entities."""
+
+    def __init__(self) -> None:
+        """Initialize an empty projection; payloads stay whole until used."""
+        self._paths: Counter[StatePath] = Counter()
+        self._users = 0
+        self._tree: Dict[str, Any] | None = None
+
+    def track(self, paths: Iterable[StatePath]) -> Callable[[], None]:
+        """Register paths for one entity; returns a callable to release them."""
+        paths = tuple(paths)
+        self._add(paths, 1)
+        return lambda: self._add(paths, -1)
+
+    def _add(self, paths: Tuple[StatePath, ...], delta: int) -> None:
+        """Adjust path reference counts, invalidating the tree on change."""
+        self._users += delta
+        changed = False
+        for path in paths:
+            before = self._paths[path]
+            self._paths[path] = before + delta
+            if self._paths[path] <= 0:
+                del self._paths[path]
+            if (before > 0) != (self._paths.get(path, 0) > 0):
+                changed = True
+        if changed:
+            self._tree = None
+
+    def apply(self, states: Dict[str, Any]) -> Dict[str, Any]:
+        """Project every device payload in states."""
+        if self._users <= 0:
+            return states
+        if self._tree is None:
+            self._tree = build_projection((*BASE_STATE_PATHS, *self._paths))
+        tree = self._tree
+        return {dev_id: project(state, tree) for dev_id, state in states.items()}
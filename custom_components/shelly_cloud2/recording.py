@@ -0,0 +1,358 @@
+"""Capture and replay of Shelly Cloud 2 API traffic.
+
+A capture writes one JSON object per request to an NDJSON file::
+
+    {"t": 0.412, "ep": "get", "req": {...}, "st": 200, "ms": 183.2, "res": [...]}
+
+where ``t`` is the offset from the start of the capture, ``ep`` the API
+endpoint below ``/v2/devices/api/``, ``ms`` the request duration and
+``res`` the response as the engine decoded it, or its text when it was
+not JSON (``err`` for transport errors). Responses are kept untrimmed so
+a replay can serve builds that read other fields. The auth key is never
+written.
+
+async_replay_trace feeds such a trace through the real coordinator and
+platforms, with TraceReplaySession standing in for the HTTP session, and
+reports CPU time, state writes and allocations per poll cycle.
+install_session lets any other stand-in session take the cloud's place
+the same way.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+import tracemalloc
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Tuple
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant, callback
+
+from .const import (
+    CAPTURE_MAX_BYTES,
+    CAPTURE_MAX_DURATION,
+    CONF_AUTH_KEY,
+    CONF_SERVER,
+    DEFAULT_CHUNK_SIZE_MAX,
+    DEFAULT_CHUNK_SIZE_MIN,
+    DOMAIN,
+)
+from .engine import DATA_ENGINES, ShellyCloud2FetchEngine, normalize_base_url
+
+_LOGGER = logging.getLogger(__name__)
+
+_REDACTED = "**REDACTED**"
+
+
+class TraceRecorder:
+    """Buffer API requests and append them to an NDJSON trace file.
+
+    Requests are queued as they finish and serialized in the executor.
+    Recording stops by itself once max_bytes were written or max_duration
+    passed; on_full is then called once.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        path: str,
+        auth_key: str,
+        on_full: Callable[[], None] | None = None,
+        max_bytes: int = CAPTURE_MAX_BYTES,
+        max_duration: float = CAPTURE_MAX_DURATION,
+    ) -> None:
+        """Initialize the recorder."""
+        self.hass = hass
+        self.path = path
+        self._auth_key = auth_key
+        self._on_full = on_full
+        self._max_bytes = max_bytes
+        self._max_duration = max_duration
+        self._start = time.monotonic()
+        self._entries: List[Dict[str, Any]] = []
+        self._flush_pending = False
+        self._bytes = 0
+        self.full = False
+
+    @callback
+    def record(
+        self,
+        endpoint: str,
+        body: Dict[str, Any],
+        started: float,
+        status: int | None,
+        response: Any,
+        error: Exception | None = None,
+    ) -> None:
+        """Queue one finished request for writing.
+
+        response is the decoded response, or its raw body when it was not
+        JSON.
+        """
+        if self.full:
+            return
+        if time.monotonic() - self._start > self._max_duration:
+            self._set_full("duration")
+            return
+        auth_key = self._auth_key
+        entry: Dict[str, Any] = {
+            "t": round(started - self._start, 3),
+            "ep": endpoint,
+            "req": {
+                key: _REDACTED if auth_key and value == auth_key else value
+                for key, value in body.items()
+            },
+            "st": status,
+            "ms": round((time.monotonic() - started) * 1000, 1),
+        }
+        if error is not None:
+            err = repr(error)
+            entry["err"] = err.replace(auth_key, _REDACTED) if auth_key else err
+        elif isinstance(response, bytes):
+            entry["res"] = response.decode("utf-8", "replace") or None
+        elif isinstance(response, str):
+            entry["res"] = response or None
+        elif response is not None:
+            entry["res"] = response
+        self._entries.append(entry)
+
+        if not self._flush_pending:
+            self._flush_pending = True
+            self.hass.async_create_task(self.async_flush())
+
+    def _set_full(self, limit: str) -> None:
+        """Stop recording after reaching a limit."""
+        self.full = True
+        _LOGGER.warning(
+            "Stopped capturing Shelly Cloud 2 API traffic to %s: %s limit reached",
+            self.path,
+            limit,
+        )
+        if not self._flush_pending:
+            self._flush_pending = True
+            self.hass.async_create_task(self.async_flush())
+        if self._on_full is not None:
+            self._on_full()
+
+    async def async_flush(self) -> None:
+        """Write queued requests in the executor."""
+        self._flush_pending = False
+        entries, self._entries = self._entries, []
+        if not entries:
+            return
+        self._bytes += await self.hass.async_add_executor_job(self._write, entries)
+        if not self.full and self._bytes >= self._max_bytes:
+            self._set_full("size")
+
+    def _write(self, entries: List[Dict[str, Any]]) -> int:
+        """Append entries to the trace file and return the bytes written."""
+        text = "".join(
+            json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries
+        )
+        with open(self.path, "a", encoding="utf-8") as trace:
+            trace.write(text)
+        return len(text)
+
+
+def load_trace(path: str) -> List[Dict[str, Any]]:
+    """Read an NDJSON trace file."""
+    records: List[Dict[str, Any]] = []
+    with open(path, encoding="utf-8") as trace:
+        for line in trace:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+    return records
+
+
+class ReplayResponse:
+    """Minimal stand-in for an aiohttp response.
+
+    Stand-in sessions (see install_session) return these from post().
+    """
+
+    def __init__(self, status: int, payload: Any) -> None:
+        """Initialize with a status and decoded payload."""
+        self.status = status
+        if payload is None:
+            self._raw = b""
+        elif isinstance(payload, str):
+            self._raw = payload.encode()
+        else:
+            self._raw = json.dumps(payload).encode()
+
+    async def __aenter__(self) -> ReplayResponse:
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        return None
+
+    async def read(self) -> bytes:
+        """Return the raw body."""
+        return self._raw
+
+    async def text(self) -> str:
+        """Return the body as text."""
+        return self._raw.decode()
+
+    async def json(self) -> Any:
+        """Return the decoded body."""
+        return json.loads(self._raw)
+
+
+class TraceReplaySession:
+    """Serve recorded responses in place of an aiohttp ClientSession.
+
+    Device state is replayed per device rather than per request, so the
+    build under test may chunk differently from the one that recorded the
+    trace. Each device advances through its recorded payloads one fetch at
+    a time and repeats its last payload once the trace runs out.
+    """
+
+    closed = False
+
+    def __init__(self, records: List[Dict[str, Any]]) -> None:
+        """Index a loaded trace."""
+        self._states: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._controls: Dict[str, Deque[Tuple[int, Any]]] = {}
+        for record in records:
+            if record.get("st") is None:
+                continue
+            if record.get("ep") == "get":
+                if record["st"] != 200 or not isinstance(record.get("res"), list):
+                    continue
+                for state in record["res"]:
+                    dev_id = state.get("id")
+                    if dev_id:
+                        self._states.setdefault(dev_id, deque()).append(state)
+            else:
+                self._controls.setdefault(record["ep"], deque()).append(
+                    (record["st"], record.get("res"))
+                )
+
+    @property
+    def cycles(self) -> int:
+        """Return the number of poll cycles the trace covers."""
+        return max((len(states) for states in self._states.values()), default=0)
+
+    def post(self, url: str, **kwargs: Any) -> ReplayResponse:
+        """Answer a POST to the cloud API from the trace."""
+        endpoint = url.split("/v2/devices/api/", 1)[-1]
+        body = kwargs.get("json") or {}
+        if endpoint == "get":
+            states = []
+            for dev_id in body.get("ids", []):
+                queue = self._states.get(dev_id)
+                if not queue:
+                    continue
+                states.append(queue.popleft() if len(queue) > 1 else queue[0])
+            return ReplayResponse(200, states)
+
+        queue = self._controls.get(endpoint)
+        if queue:
+            status, payload = queue.popleft()
+            return ReplayResponse(status, payload)
+        return ReplayResponse(200, None)
+
+    async def close(self) -> None:
+        """Nothing to release."""
+
+
+def install_session(
+    hass: HomeAssistant, entry: ConfigEntry, session: Any
+) -> ShellyCloud2FetchEngine:
+    """Make the entry's hub talk to session instead of the cloud.
+
+    session needs a post(url, **kwargs) returning ReplayResponse-like
+    objects. Must be called before the entry is set up, which then picks
+    up the prepared fetch engine; no aiohttp session is created for it.
+    """
+    engine = ShellyCloud2FetchEngine(
+        hass,
+        normalize_base_url(entry.data[CONF_SERVER]),
+        entry.data[CONF_AUTH_KEY],
+        dedicated_session=False,
+        chunk_size_min=DEFAULT_CHUNK_SIZE_MIN,
+        chunk_size_max=DEFAULT_CHUNK_SIZE_MAX,
+        session=session,
+    )
+    hass.data.setdefault(DATA_ENGINES, {})[engine.key] = engine
+    return engine
+
+
+async def async_replay_trace(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    trace_path: str,
+    cycles: int | None = None,
+) -> Dict[str, Any]:
+    """Replay a trace through the entry's coordinator and platforms.
+
+    The entry must be added to hass but not yet set up. Returns a JSON
+    serializable report with per-cycle CPU time, state writes and
+    allocated bytes.
+    """
+    records = await hass.async_add_executor_job(load_trace, trace_path)
+    session = TraceReplaySession(records)
+
+    install_session(hass, entry, session)
+
+    writes = 0
+
+    @callback
+    def _count_write(event: Event) -> None:
+        nonlocal writes
+        writes += 1
+
+    unsub = hass.bus.async_listen(EVENT_STATE_CHANGED, _count_write)
+    try:
+        if not await hass.config_entries.async_setup(entry.entry_id):
+            raise RuntimeError("Config entry failed to set up from the trace")
+        await hass.async_block_till_done()
+        hub = hass.data[DOMAIN][entry.entry_id]
+
+        if cycles is None:
+            cycles = max(session.cycles - 1, 0)
+
+        results: List[Dict[str, Any]] = []
+        tracemalloc.start()
+        try:
+            for _ in range(cycles):
+                writes_before = writes
+                tracemalloc.reset_peak()
+                mem_before = tracemalloc.get_traced_memory()[0]
+                cpu_before = time.process_time()
+
+                await hub.async_refresh()
+                await hass.async_block_till_done()
+
+                cpu = time.process_time() - cpu_before
+                mem_after, mem_peak = tracemalloc.get_traced_memory()
+                results.append(
+                    {
+                        "cpu_ms": round(cpu * 1000, 3),
+                        "state_writes": writes - writes_before,
+                        "alloc_peak_bytes": mem_peak - mem_before,
+                        "retained_bytes": mem_after - mem_before,
+                    }
+                )
+        finally:
+            tracemalloc.stop()
+    finally:
+        unsub()
+
+    total_cpu = sum(r["cpu_ms"] for r in results)
+    return {
+        "trace": trace_path,
+        "devices": len(hub.device_ids),
+        "cycles": results,
+        "totals": {
+            "cycles": len(results),
+            "cpu_ms": round(total_cpu, 3),
+            "cpu_ms_per_cycle": round(total_cpu / len(results), 3) if results else 0,
+            "state_writes": sum(r["state_writes"] for r in results),
+        },
+    }
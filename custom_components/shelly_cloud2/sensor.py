@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import logging
+import time
 from datetime import datetime
 from typing import Any, Dict, List
 
@@ -20,25 +21,128 @@ from homeassistant.const import (
     PERCENTAGE,
     SIGNAL_STRENGTH_DECIBELS,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import dt as dt_util
 
-from . import ShellyCloud2Hub
-from .const import DOMAIN, CONF_DEVICE_IDS
+from . import ShellyCloud2Hub, timed_platform_setup
+from .aggregate import SITE_GROUP
+from .components import COMPONENT_TYPES, Component
+from .const import DOMAIN, CONF_DEVICE_IDS, POWER_STATS_WINDOWS
+from .entity import ShellyCloud2Entity
+from .plan import find_status_block as _find_status_block
 
 _LOGGER = logging.getLogger(__name__)
 
-def _find_status_block(status: dict, prefix: str) -> dict | None:
-    for k, v in status.items():
-        if k.startswith(prefix) and isinstance(v, dict):
-            return v
-    return None
-
-
-
+# Payload paths read by each sensor kind, kept when the hub trims state
+_SENSOR_STATE_PATHS: Dict[str, tuple] = {
+    "temperature": (
+        ("status", "temperature"),
+        ("status", "tmp", "tC"),
+        ("status", "temperature:*", "tC"),
+    ),
+    "humidity": (("status", "humidity:*", "rh"),),
+    "power": (("status", "meters"),),
+    "energy": (("status", "meters"),),
+    "battery": (
+        ("status", "bat", "value"),
+        ("status", "devicepower:*", "battery"),
+    ),
+    "illuminance": (("status", "lux", "value"),),
+    "rssi": (
+        ("status", "wifi_sta", "rssi"),
+        ("status", "wifi", "rssi"),
+    ),
+    "last_update": (),
+}
+
+# kind -> (name suffix, device class, state class, unit, entity category)
+_SENSOR_DESCRIPTIONS: Dict[str, tuple] = {
+    "temperature": (
+        "Temperature",
+        SensorDeviceClass.TEMPERATURE,
+        SensorStateClass.MEASUREMENT,
+        UnitOfTemperature.CELSIUS,
+        None,
+    ),
+    "humidity": (
+        "Humidity",
+        SensorDeviceClass.HUMIDITY,
+        SensorStateClass.MEASUREMENT,
+        PERCENTAGE,
+        None,
+    ),
+    "power": (
+        "Power",
+        SensorDeviceClass.POWER,
+        SensorStateClass.MEASUREMENT,
+        UnitOfPower.WATT,
+        None,
+    ),
+    "energy": (
+        "Energy",
+        SensorDeviceClass.ENERGY,
+        SensorStateClass.TOTAL_INCREASING,
+        UnitOfEnergy.KILO_WATT_HOUR,
+        None,
+    ),
+    "battery": (
+        "Battery",
+        SensorDeviceClass.BATTERY,
+        SensorStateClass.MEASUREMENT,
+        PERCENTAGE,
+        None,
+    ),
+    "illuminance": (
+        "Illuminance",
+        SensorDeviceClass.ILLUMINANCE,
+        SensorStateClass.MEASUREMENT,
+        "lx",
+        None,
+    ),
+    "rssi": (
+        "Wi-Fi signal",
+        SensorDeviceClass.SIGNAL_STRENGTH,
+        SensorStateClass.MEASUREMENT,
+        SIGNAL_STRENGTH_DECIBELS,
+        EntityCategory.DIAGNOSTIC,
+    ),
+    "last_update": (
+        "Last update",
+        SensorDeviceClass.TIMESTAMP,
+        None,
+        None,
+        EntityCategory.DIAGNOSTIC,
+    ),
+}
+
+# Fleet aggregate kind -> (name suffix, device class, state class, unit, digits)
+_AGGREGATE_DESCRIPTIONS: Dict[str, tuple] = {
+    "power": (
+        "Power",
+        SensorDeviceClass.POWER,
+        SensorStateClass.MEASUREMENT,
+        UnitOfPower.WATT,
+        1,
+    ),
+    "energy": (
+        "Energy",
+        SensorDeviceClass.ENERGY,
+        SensorStateClass.TOTAL_INCREASING,
+        UnitOfEnergy.KILO_WATT_HOUR,
+        3,
+    ),
+    "relays_on": ("Relays on", None, SensorStateClass.MEASUREMENT, None, None),
+    "doors_open": ("Doors open", None, SensorStateClass.MEASUREMENT, None, None),
+}
+
+# Rolling power statistics: name -> index in PowerWindowStats.snapshot()
+_POWER_STATS = {"mean": 0, "peak": 1, "min": 2}
+
+
+@timed_platform_setup("sensor")
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -51,169 +155,46 @@ async def async_setup_entry(
         entry.data.get(CONF_DEVICE_IDS, []),
     )
 
-    entities: list[ShellyCloud2Sensor] = []
-
-    data = hub.data or {}
+    entities: list[SensorEntity] = []
 
     for dev_id in device_ids:
-        state = data.get(dev_id) or {}
-        status: Dict[str, Any] = state.get("status", {})
-        dev_type = state.get("type")
-
-        
-        temp_block = _find_status_block(status, "temperature:")
-        if "temperature" in status or (
-            isinstance(status.get("tmp"), dict) and "tC" in status["tmp"]) or (temp_block and "tC" in temp_block):
-            entities.append(
-                ShellyCloud2Sensor(
-                    hub=hub,
-                    device_id=dev_id,
-                    kind="temperature",
-                    name_suffix="Temperature",
-                    device_class=SensorDeviceClass.TEMPERATURE,
-                    state_class=SensorStateClass.MEASUREMENT,
-                    unit=UnitOfTemperature.CELSIUS,
-                    entity_category=None,
-                )
+        for kind in hub.entity_plan(dev_id).sensors:
+            name_suffix, device_class, state_class, unit, category = (
+                _SENSOR_DESCRIPTIONS[kind]
             )
-
-        hum_block = _find_status_block(status, "humidity:")
-        if hum_block and "rh" in hum_block:
             entities.append(
                 ShellyCloud2Sensor(
                     hub=hub,
                     device_id=dev_id,
-                    kind="humidity",
-                    name_suffix="Humidity",
-                    device_class=SensorDeviceClass.HUMIDITY,
-                    state_class=SensorStateClass.MEASUREMENT,
-                    unit=PERCENTAGE,
-                    entity_category=None,
+                    kind=kind,
+                    name_suffix=name_suffix,
+                    device_class=device_class,
+                    state_class=state_class,
+                    unit=unit,
+                    entity_category=category,
                 )
             )
-
-
-        # Power and energy from meters[0] (typical for relays/plugs)
-        meters = status.get("meters")
-        if isinstance(meters, list) and meters:
-            entities.append(
-                ShellyCloud2Sensor(
-                    hub=hub,
-                    device_id=dev_id,
-                    kind="power",
-                    name_suffix="Power",
-                    device_class=SensorDeviceClass.POWER,
-                    state_class=SensorStateClass.MEASUREMENT,
-                    unit=UnitOfPower.WATT,
-                    entity_category=None,
-                )
-            )
-            entities.append(
-                ShellyCloud2Sensor(
-                    hub=hub,
-                    device_id=dev_id,
-                    kind="energy",
-                    name_suffix="Energy",
-                    device_class=SensorDeviceClass.ENERGY,
-                    state_class=SensorStateClass.TOTAL_INCREASING,
-                    unit=UnitOfEnergy.KILO_WATT_HOUR,
-                    entity_category=None,
-                )
-            )
-
-        if dev_type == "sensor":
-        # Battery percentage (G1: status.bat.value, G3/HTG3: status.devicepower:0.battery.percent)
-            battery_value = None
-            # G1 structure
-            bat = status.get("bat")
-            if isinstance(bat, dict):
-                battery_value = bat.get("value")
-
-            # G3/HTG3 structure
-            if battery_value is None:
-                dp_block = _find_status_block(status, "devicepower:")
-                if isinstance(dp_block, dict):
-                    battery = dp_block.get("battery")
-                    if isinstance(battery, dict):
-                        battery_value = battery.get("percent")
-
-    
-            if battery_value is not None:
-                entities.append(
-                    ShellyCloud2Sensor(
-                        hub=hub,
-                        device_id=dev_id,
-                        kind="battery",
-                        name_suffix="Battery",
-                        device_class=SensorDeviceClass.BATTERY,
-                        state_class=SensorStateClass.MEASUREMENT,
-                        unit=PERCENTAGE,
-                        entity_category=None,
+        for component in hub.entity_plan(dev_id).components_for("sensor"):
+            entities.append(ShellyCloud2MeterPowerSensor(hub, dev_id, component))
+        if hub.power_stats is not None and "power" in hub.entity_plan(dev_id).sensors:
+            for minutes in POWER_STATS_WINDOWS:
+                for stat in _POWER_STATS:
+                    entities.append(
+                        ShellyCloud2PowerStatSensor(hub, dev_id, stat, minutes)
                     )
-                )
 
-            # Illuminance (lux)
-            lux = status.get("lux")
-            if isinstance(lux, dict) and "value" in lux:
+    if hub.aggregates is not None:
+        for group in hub.aggregates.groups:
+            for kind in _AGGREGATE_DESCRIPTIONS:
                 entities.append(
-                    ShellyCloud2Sensor(
-                        hub=hub,
-                        device_id=dev_id,
-                        kind="illuminance",
-                        name_suffix="Illuminance",
-                        device_class=SensorDeviceClass.ILLUMINANCE,
-                        state_class=SensorStateClass.MEASUREMENT,
-                        unit="lx",
-                        entity_category=None,
-                    )
-                )
-
-        # Wi-Fi RSSI
-        rssi_found = False
-        wifi_sta = status.get("wifi_sta")
-        if isinstance(wifi_sta, dict) and "rssi" in wifi_sta:
-            rssi_found = True
-        else:
-            wifi = status.get("wifi")
-            if isinstance(wifi, dict) and "rssi" in wifi: 
-                rssi_found = True
-        if rssi_found:
-            entities.append(
-                ShellyCloud2Sensor(
-                    hub=hub,
-                    device_id=dev_id,
-                    kind="rssi",
-                    name_suffix="Wi-Fi signal",
-                    device_class=SensorDeviceClass.SIGNAL_STRENGTH,
-                    state_class=SensorStateClass.MEASUREMENT,
-                    unit=SIGNAL_STRENGTH_DECIBELS,
-                    entity_category=EntityCategory.DIAGNOSTIC,
-                )
-            )
-
-
-        # Last update timestamp
-        if "_updated" in status or "_updated" in state.get("settings", {}):
-            entities.append(
-                ShellyCloud2Sensor(
-                    hub=hub,
-                    device_id=dev_id,
-                    kind="last_update",
-                    name_suffix="Last update",
-                    device_class=SensorDeviceClass.TIMESTAMP,
-                    state_class=None,
-                    unit=None,
-                    entity_category=EntityCategory.DIAGNOSTIC,
+                    ShellyCloud2AggregateSensor(hub, entry.entry_id, group, kind)
                 )
-            )
-
-
 
     if entities:
         async_add_entities(entities)
 
 
-class ShellyCloud2Sensor(CoordinatorEntity, SensorEntity):
+class ShellyCloud2Sensor(ShellyCloud2Entity, SensorEntity):
     """Representation of a Shelly Cloud 2 sensor derived from device status."""
 
     def __init__(
@@ -232,14 +213,10 @@ class ShellyCloud2Sensor(CoordinatorEntity, SensorEntity):
         self._hub = hub
         self._device_id = device_id
         self._kind = kind
+        self._state_paths = _SENSOR_STATE_PATHS.get(kind, ())
 
-        dev_state = (hub.data or {}).get(device_id) or {}
-        dev_type = dev_state.get("type", "device")
-        base_name = dev_state.get("settings", {}).get("name")
-        if not base_name:
-            base_name = f"Shelly {dev_type} {device_id}"
+        base_name = hub.device_meta(device_id).name
 
-        self._device_name = base_name
         self._attr_name = f"{base_name} {name_suffix}"
         self._attr_unique_id = f"shelly_cloud2_{device_id}_{kind}"
 
@@ -248,6 +225,35 @@ class ShellyCloud2Sensor(CoordinatorEntity, SensorEntity):
         self._attr_native_unit_of_measurement = unit
         self._attr_entity_category = entity_category
 
+        # Last written value, availability and time, for the write filter
+        self._last_value: Any = None
+        self._last_available: bool | None = None
+        self._last_written_at: float | None = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state unless the change falls inside the deadband."""
+        write_filter = self._hub.sensor_filter
+        if not write_filter.active:
+            super()._handle_coordinator_update()
+            return
+
+        value = self.native_value
+        available = self.available
+        now = time.monotonic()
+        if (
+            self._last_written_at is not None
+            and available == self._last_available
+            and not write_filter.should_write(
+                self._kind, self._last_value, value, now - self._last_written_at
+            )
+        ):
+            return
+        self._last_value = value
+        self._last_available = available
+        self._last_written_at = now
+        super()._handle_coordinator_update()
+
     @property
     def native_value(self) -> Any:
         """Return the sensor value based on the coordinator data."""
@@ -278,13 +284,10 @@ class ShellyCloud2Sensor(CoordinatorEntity, SensorEntity):
             if self._kind == "power":
                 return meter0.get("power")
             if self._kind == "energy":
-                total_wh = meter0.get("total")
-                if total_wh is None:
-                    return None
-                try:
-                    return float(total_wh) / 1000.0
-                except (TypeError, ValueError):
+                # Stitched across counter resets, or integrated from power
+                if self._hub.energy is None:
                     return None
+                return self._hub.energy.value(self._device_id, 0)
             return None
 
         # Humidity
@@ -356,27 +359,135 @@ class ShellyCloud2Sensor(CoordinatorEntity, SensorEntity):
             return False
         return True
 
+
+class ShellyCloud2MeterPowerSensor(ShellyCloud2Sensor):
+    """Active power of an energy meter component (Gen1 emeters, Gen2+ em)."""
+
+    def __init__(
+        self,
+        hub: ShellyCloud2Hub,
+        device_id: str,
+        component: Component,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(
+            hub=hub,
+            device_id=device_id,
+            kind="power",
+            name_suffix=f"EM {component.index} Power",
+            device_class=SensorDeviceClass.POWER,
+            state_class=SensorStateClass.MEASUREMENT,
+            unit=UnitOfPower.WATT,
+            entity_category=None,
+        )
+        self._component = component
+        self._state_paths = COMPONENT_TYPES["em"].state_paths
+        self._attr_unique_id = (
+            f"shelly_cloud2_{device_id}_em_{component.index}_power"
+        )
+
     @property
-    def device_info(self) -> Dict[str, Any]:
-        """Return device information for the device registry."""
+    def native_value(self) -> Any:
+        """Return the meter's active power."""
         state = (self.coordinator.data or {}).get(self._device_id) or {}
-        settings = state.get("settings", {})
-        dev_type = state.get("type", "device")
-        base_name = settings.get("name") or self._device_name
-        device_meta = settings.get("device", {})
-        model = device_meta.get("type") or state.get("code") or dev_type
-        fw = (
-            state.get("status", {})
-            .get("getinfo", {})
-            .get("fw_info", {})
-            .get("fw")
+        return self._component.read(state)["power"]
+
+
+class ShellyCloud2PowerStatSensor(ShellyCloud2Sensor):
+    """Mean, peak or minimum power of a device over a rolling window."""
+
+    def __init__(
+        self,
+        hub: ShellyCloud2Hub,
+        device_id: str,
+        stat: str,
+        minutes: int,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(
+            hub=hub,
+            device_id=device_id,
+            kind="power",
+            name_suffix=f"Power {stat} {minutes} min",
+            device_class=SensorDeviceClass.POWER,
+            state_class=SensorStateClass.MEASUREMENT,
+            unit=UnitOfPower.WATT,
+            entity_category=None,
+        )
+        self._attr_unique_id = (
+            f"shelly_cloud2_{device_id}_power_{stat}_{minutes}m"
+        )
+        self._stat_index = _POWER_STATS[stat]
+        self._window = minutes * 60
+
+    @property
+    def native_value(self) -> Any:
+        """Return the statistic over the window from the hub's ring buffer."""
+        snapshot = self._hub.power_stats.snapshot(self._device_id, 0, self._window)
+        if snapshot is None:
+            return None
+        return round(snapshot[self._stat_index], 1)
+
+
+class ShellyCloud2AggregateSensor(ShellyCloud2Entity, SensorEntity):
+    """Total of one kind over the whole site or one device tag."""
+
+    _state_paths = (
+        ("status", "meters"),
+        *COMPONENT_TYPES["switch"].state_paths,
+        *COMPONENT_TYPES["em"].state_paths,
+        ("status", "sensor", "state"),
+    )
+
+    def __init__(
+        self,
+        hub: ShellyCloud2Hub,
+        entry_id: str,
+        group: str,
+        kind: str,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(hub)
+        self._hub = hub
+        self._entry_id = entry_id
+        self._group = group
+        self._kind = kind
+
+        name_suffix, device_class, state_class, unit, digits = (
+            _AGGREGATE_DESCRIPTIONS[kind]
         )
-        info: Dict[str, Any] = {
-            "identifiers": {(DOMAIN, self._device_id)},
-            "name": base_name,
-            "manufacturer": "Shelly",
-            "model": model,
-        }
-        if fw:
-            info["sw_version"] = fw
-        return info
\ No newline at end of file
+        label = "Site" if group == SITE_GROUP else group
+        group_key = "site" if group == SITE_GROUP else f"tag_{group}"
+        self._attr_name = f"{label} {name_suffix}"
+        self._attr_unique_id = f"shelly_cloud2_{entry_id}_{group_key}_{kind}"
+        self._attr_device_class = device_class
+        self._attr_state_class = state_class
+        self._attr_native_unit_of_measurement = unit
+        self._digits = digits
+        self._last_available: bool | None = None
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Group the aggregates under one device per entry."""
+        return DeviceInfo(
+            identifiers={(DOMAIN, f"site_{self._entry_id}")},
+            name="Shelly Cloud 2 site",
+            manufacturer="Shelly",
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when this group's totals or availability changed."""
+        available = self.available
+        if (
+            self._group in self._hub.aggregates.changed
+            or available != self._last_available
+        ):
+            self._last_available = available
+            super()._handle_coordinator_update()
+
+    @property
+    def native_value(self) -> Any:
+        """Return the current total."""
+        value = self._hub.aggregates.total(self._group, self._kind)
+        return round(value, self._digits) if self._digits is not None else value
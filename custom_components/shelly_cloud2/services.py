@@ -0,0 +1,168 @@
+"""Services for Shelly Cloud 2."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .const import BULK_CONCURRENCY, DOMAIN
+
+if TYPE_CHECKING:
+    from . import ShellyCloud2Hub
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_PROFILE = "profile"
+SERVICE_BULK_SET = "bulk_set"
+
+ATTR_ENTRY_ID = "entry_id"
+ATTR_CYCLES = "cycles"
+ATTR_TARGETS = "targets"
+ATTR_DEVICE_ID = "device_id"
+ATTR_CHANNEL = "channel"
+ATTR_ON = "on"
+ATTR_TOGGLE_AFTER = "toggle_after"
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_CYCLES, default=3): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=50)
+        ),
+    }
+)
+
+BULK_SET_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Required(ATTR_TARGETS): vol.All(
+            cv.ensure_list,
+            [
+                vol.Schema(
+                    {
+                        vol.Required(ATTR_DEVICE_ID): cv.string,
+                        vol.Optional(ATTR_CHANNEL, default=0): vol.All(
+                            vol.Coerce(int), vol.Range(min=0)
+                        ),
+                        vol.Required(ATTR_ON): cv.boolean,
+                        vol.Optional(ATTR_TOGGLE_AFTER): vol.All(
+                            vol.Coerce(int), vol.Range(min=1)
+                        ),
+                    }
+                )
+            ],
+        ),
+    }
+)
+
+
+def _hubs_for_call(
+    hass: HomeAssistant, call: ServiceCall
+) -> List[Tuple[str, ShellyCloud2Hub]]:
+    """Return (entry_id, hub) for the entries targeted by a service call."""
+    hubs: dict = hass.data.get(DOMAIN, {})
+    entry_id = call.data.get(ATTR_ENTRY_ID)
+    if entry_id is None:
+        return list(hubs.items())
+    if entry_id not in hubs:
+        raise HomeAssistantError(f"No loaded Shelly Cloud 2 entry {entry_id}")
+    return [(entry_id, hubs[entry_id])]
+
+
+async def _async_profile(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Profile the next poll cycles of one or all hubs."""
+    cycles: int = call.data[ATTR_CYCLES]
+    stamp = dt_util.now().strftime("%Y%m%d-%H%M%S")
+    targets = _hubs_for_call(hass, call)
+    for entry_id, hub in targets:
+        if hub.profiling and len(targets) > 1:
+            # Another entry on the same account is already being profiled
+            _LOGGER.info("Skipping %s, its account is already profiled", hub.name)
+            continue
+        path = hass.config.path(f"{DOMAIN}_profile_{entry_id}_{stamp}.txt")
+        hub.async_start_profile(path, cycles)
+        _LOGGER.info("Profiling %s poll cycles of %s into %s", cycles, hub.name, path)
+
+
+async def _async_bulk_set(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Switch many relays concurrently, then reconcile with one refresh."""
+    hubs = [hub for _entry_id, hub in _hubs_for_call(hass, call)]
+    semaphore = asyncio.Semaphore(BULK_CONCURRENCY)
+    touched: Dict[ShellyCloud2Hub, set[str]] = {}
+
+    async def _async_set(target: Dict[str, Any]) -> Dict[str, Any]:
+        device_id = target[ATTR_DEVICE_ID]
+        result: Dict[str, Any] = {
+            ATTR_DEVICE_ID: device_id,
+            ATTR_CHANNEL: target[ATTR_CHANNEL],
+            ATTR_ON: target[ATTR_ON],
+        }
+        hub = next((h for h in hubs if device_id in h.device_ids), None)
+        if hub is None:
+            result.update(success=False, error="unknown device")
+            return result
+        async with semaphore:
+            try:
+                await hub.async_set_switch(
+                    device_id=device_id,
+                    channel=target[ATTR_CHANNEL],
+                    on=target[ATTR_ON],
+                    toggle_after=target.get(ATTR_TOGGLE_AFTER),
+                )
+            except UpdateFailed as exc:
+                result.update(success=False, error=str(exc))
+                return result
+        touched.setdefault(hub, set()).add(device_id)
+        result["success"] = True
+        return result
+
+    results = await asyncio.gather(*(_async_set(t) for t in call.data[ATTR_TARGETS]))
+
+    # One merged reconciliation fetch per hub for every device that changed
+    await asyncio.gather(
+        *(
+            hub.async_request_device_refresh(device_id)
+            for hub, device_ids in touched.items()
+            for device_id in device_ids
+        )
+    )
+
+    failed = sum(1 for r in results if not r["success"])
+    if failed:
+        _LOGGER.warning("bulk_set: %s of %s targets failed", failed, len(results))
+    return {"results": list(results)}
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+
+    async def _handle_profile(call: ServiceCall) -> None:
+        await _async_profile(hass, call)
+
+    async def _handle_bulk_set(call: ServiceCall) -> ServiceResponse:
+        return await _async_bulk_set(hass, call)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE, _handle_profile, schema=PROFILE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BULK_SET,
+        _handle_bulk_set,
+        schema=BULK_SET_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,140 @@
+"""Rolling window statistics over recent power samples."""
+
+from __future__ import annotations
+
+from array import array
+from collections import deque
+from typing import Any, Dict, Iterable, Tuple
+
+from .const import POWER_STATS_CAPACITY
+
+
+class _Window:
+    """Running sum and monotonic min/max queues for one window length."""
+
+    __slots__ = ("seconds", "start", "total", "maxima", "minima")
+
+    def __init__(self, seconds: float, start: int) -> None:
+        """Initialize an empty window starting at sample sequence start."""
+        self.seconds = seconds
+        self.start = start
+        self.total = 0.0
+        # Sample sequence numbers with decreasing / increasing values
+        self.maxima: deque[int] = deque()
+        self.minima: deque[int] = deque()
+
+
+class PowerWindowStats:
+    """Mean, peak and minimum of one channel over several time windows.
+
+    Samples live in fixed-size arrays used as a ring buffer, so memory per
+    channel is bounded by POWER_STATS_CAPACITY whatever the poll rate.
+    Every window keeps a running sum and monotonic queues of the samples
+    inside it, which makes adding a sample amortized O(1) per window. If
+    samples arrive faster than the capacity covers, the longest windows
+    shrink to the samples still held.
+    """
+
+    def __init__(
+        self, windows: Iterable[float], capacity: int = POWER_STATS_CAPACITY
+    ) -> None:
+        """Initialize empty windows, given in seconds."""
+        self._capacity = capacity
+        self._times = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        # Sequence number of the next sample; slot is seq % capacity
+        self._seq = 0
+        self._windows = [_Window(seconds, 0) for seconds in windows]
+
+    def add(self, now: float, value: float) -> None:
+        """Add a sample taken at monotonic time now."""
+        seq = self._seq
+        capacity = self._capacity
+        # The slot about to be reused must leave every window first
+        for window in self._windows:
+            self._evict(window, seq - capacity + 1, None)
+
+        slot = seq % capacity
+        self._times[slot] = now
+        self._values[slot] = value
+        self._seq = seq + 1
+        values = self._values
+
+        for window in self._windows:
+            window.total += value
+            maxima = window.maxima
+            while maxima and values[maxima[-1] % capacity] <= value:
+                maxima.pop()
+            maxima.append(seq)
+            minima = window.minima
+            while minima and values[minima[-1] % capacity] >= value:
+                minima.pop()
+            minima.append(seq)
+            self._evict(window, seq, now - window.seconds)
+
+    def _evict(self, window: _Window, keep_from: int, cutoff: float | None) -> None:
+        """Drop samples before sequence keep_from or taken before cutoff."""
+        capacity = self._capacity
+        while window.start < keep_from and (
+            cutoff is None or self._times[window.start % capacity] < cutoff
+        ):
+            window.total -= self._values[window.start % capacity]
+            if window.maxima and window.maxima[0] == window.start:
+                window.maxima.popleft()
+            if window.minima and window.minima[0] == window.start:
+                window.minima.popleft()
+            window.start += 1
+
+    def snapshot(self, seconds: float) -> Tuple[float, float, float] | None:
+        """Return (mean, peak, min) over the window, or None if empty."""
+        for window in self._windows:
+            if window.seconds == seconds:
+                break
+        else:
+            return None
+        count = self._seq - window.start
+        if count <= 0:
+            return None
+        values = self._values
+        return (
+            window.total / count,
+            values[window.maxima[0] % self._capacity],
+            values[window.minima[0] % self._capacity],
+        )
+
+
+class PowerStatistics:
+    """Window statistics for every metered channel of a hub's devices."""
+
+    def __init__(self, windows: Iterable[float]) -> None:
+        """Initialize with window lengths in seconds."""
+        self.windows = tuple(windows)
+        self._channels: Dict[Tuple[str, int], PowerWindowStats] = {}
+
+    def add_states(self, now: float, states: Dict[str, Any]) -> None:
+        """Sample meters[].power from freshly fetched device states."""
+        for dev_id, state in states.items():
+            meters = state.get("status", {}).get("meters")
+            if not isinstance(meters, list):
+                continue
+            for channel, meter in enumerate(meters):
+                if not isinstance(meter, dict):
+                    continue
+                power = meter.get("power")
+                if not isinstance(power, (int, float)):
+                    continue
+                stats = self._channels.get((dev_id, channel))
+                if stats is None:
+                    stats = self._channels[(dev_id, channel)] = PowerWindowStats(
+                        self.windows
+                    )
+                stats.add(now, float(power))
+
+    def snapshot(
+        self, device_id: str, channel: int, seconds: float
+    ) -> Tuple[float, float, float] | None:
+        """Return (mean, peak, min) of a channel over a window, if sampled."""
+        stats = self._channels.get((device_id, channel))
+        if stats is None:
+            return None
+        return stats.snapshot(seconds)
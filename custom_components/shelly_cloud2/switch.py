@@ -9,14 +9,16 @@ from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from . import ShellyCloud2Hub
+from . import ShellyCloud2Hub, timed_platform_setup
+from .components import COMPONENT_TYPES, Component
 from .const import DOMAIN, CONF_DEVICE_IDS
+from .entity import ShellyCloud2Entity
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@timed_platform_setup("switch")
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -31,24 +33,15 @@ async def async_setup_entry(
 
     entities: list[ShellyCloud2Switch] = []
 
-    data = hub.data or {}
-
     for dev_id in device_ids:
-        state = data.get(dev_id) or {}
-        if state.get("type") != "relay":
-            continue
-
-        status: Dict[str, Any] = state.get("status", {})
-        relays = status.get("relays")
-        if not isinstance(relays, list):
-            continue
-
-        for channel, relay in enumerate(relays):
+        components = hub.entity_plan(dev_id).components_for("switch")
+        for component in components:
             entities.append(
                 ShellyCloud2Switch(
                     hub=hub,
                     device_id=dev_id,
-                    channel=channel,
+                    component=component,
+                    numbered=len(components) > 1,
                 )
             )
 
@@ -56,52 +49,35 @@ async def async_setup_entry(
         async_add_entities(entities)
 
 
-class ShellyCloud2Switch(CoordinatorEntity, SwitchEntity):
+class ShellyCloud2Switch(ShellyCloud2Entity, SwitchEntity):
     """Representation of a Shelly relay channel as a switch."""
 
+    _state_paths = COMPONENT_TYPES["switch"].state_paths
+
     def __init__(
         self,
         hub: ShellyCloud2Hub,
         device_id: str,
-        channel: int,
+        component: Component,
+        numbered: bool,
     ) -> None:
         """Initialize the switch."""
         super().__init__(hub)
         self._hub = hub
         self._device_id = device_id
-        self._channel = channel
+        self._component = component
 
-        state = (hub.data or {}).get(device_id) or {}
-        settings = state.get("settings", {})
-        dev_type = state.get("type", "relay")
-        base_name = settings.get("name")
-        if not base_name:
-            base_name = f"Shelly {dev_type} {device_id}"
+        base_name = hub.device_meta(device_id).name
+        channel = component.index
 
-        self._device_name = base_name
-
-        relays = state.get("status", {}).get("relays", [])
-        if len(relays) > 1:
-            name = f"{base_name} Relay {channel}"
-        else:
-            name = base_name
-
-        self._attr_name = name
+        self._attr_name = f"{base_name} Relay {channel}" if numbered else base_name
         self._attr_unique_id = f"shelly_cloud2_{device_id}_relay_{channel}"
 
     @property
     def is_on(self) -> bool:
         """Return true if switch is on."""
         state = (self.coordinator.data or {}).get(self._device_id) or {}
-        status = state.get("status", {})
-        relays = status.get("relays")
-        if not isinstance(relays, list):
-            return False
-        try:
-            relay = relays[self._channel]
-        except IndexError:
-            return False
-        return bool(relay.get("ison"))
+        return self._component.read(state)["on"]
 
     @property
     def available(self) -> bool:
@@ -118,43 +94,21 @@ class ShellyCloud2Switch(CoordinatorEntity, SwitchEntity):
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the switch on."""
-        await self._hub.async_set_switch(
-            device_id=self._device_id,
-            channel=self._channel,
-            on=True,
-        )
-        await self.coordinator.async_request_refresh()
+        await self._hub.async_command(self._device_id, self._component, on=True)
+        self._async_confirm_state(True)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the switch off."""
-        await self._hub.async_set_switch(
-            device_id=self._device_id,
-            channel=self._channel,
-            on=False,
-        )
-        await self.coordinator.async_request_refresh()
+        await self._hub.async_command(self._device_id, self._component, on=False)
+        self._async_confirm_state(False)
 
-    @property
-    def device_info(self) -> Dict[str, Any]:
-        """Return device information for the device registry."""
-        state = (self.coordinator.data or {}).get(self._device_id) or {}
-        settings = state.get("settings", {})
-        dev_type = state.get("type", "relay")
-        base_name = settings.get("name") or self._device_name
-        device_meta = settings.get("device", {})
-        model = device_meta.get("type") or state.get("code") or dev_type
-        fw = (
-            state.get("status", {})
-            .get("getinfo", {})
-            .get("fw_info", {})
-            .get("fw")
+    def _async_confirm_state(self, on: bool) -> None:
+        """Burst-poll the device until the switch reports the commanded state."""
+        component = self._component
+
+        def _converged(state: Dict[str, Any]) -> bool:
+            return component.read(state)["on"] == on
+
+        self._hub.async_start_convergence(
+            self._device_id, _converged, key=(component.type.key, component.index)
         )
-        info: Dict[str, Any] = {
-            "identifiers": {(DOMAIN, self._device_id)},
-            "name": base_name,
-            "manufacturer": "Shelly",
-            "model": model,
-        }
-        if fw:
-            info["sw_version"] = fw
-        return info
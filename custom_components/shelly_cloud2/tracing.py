@@ -0,0 +1,110 @@
+"""Per-request spans of Shelly Cloud 2 API traffic.
+
+The fetch engine describes every finished request to the cloud as a
+RequestSpan and hands it to the exporters registered on its RequestTracer.
+While no exporter is registered no span is built, so tracing costs one
+truthiness check per request.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Callable, List, Protocol
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RequestSpan:
+    """One finished request to /v2/devices/api/<endpoint>."""
+
+    endpoint: str
+    # Position of the chunk within its fetch; None for control requests
+    chunk_index: int | None
+    device_count: int
+    # Seconds between the request being queued and sent (coalescing,
+    # earlier chunks or control pacing)
+    queue_wait: float
+    duration: float
+    status: int | None
+    payload_bytes: int
+    decode_time: float | None
+    error: str | None = None
+
+
+class SpanExporter(Protocol):
+    """Receiver of finished request spans."""
+
+    def export(self, span: RequestSpan) -> None:
+        """Handle one span; called in the event loop, so must not block."""
+
+
+class LogSpanExporter:
+    """Write every span to a logger as one line."""
+
+    def __init__(
+        self, logger: logging.Logger | None = None, level: int = logging.DEBUG
+    ) -> None:
+        """Initialize with the logger and level to write at."""
+        self.logger = logger or _LOGGER
+        self.level = level
+
+    def export(self, span: RequestSpan) -> None:
+        """Log the span."""
+        self.logger.log(
+            self.level,
+            "%s chunk=%s devices=%s wait=%.1fms duration=%.1fms status=%s "
+            "bytes=%s decode=%s%s",
+            span.endpoint,
+            span.chunk_index,
+            span.device_count,
+            span.queue_wait * 1000,
+            span.duration * 1000,
+            span.status,
+            span.payload_bytes,
+            "-" if span.decode_time is None else f"{span.decode_time * 1000:.1f}ms",
+            f" error={span.error}" if span.error else "",
+        )
+
+
+class InMemorySpanExporter:
+    """Keep every span in a list, for tests and benchmarks."""
+
+    def __init__(self) -> None:
+        """Initialize an empty span list."""
+        self.spans: List[RequestSpan] = []
+
+    def export(self, span: RequestSpan) -> None:
+        """Store the span."""
+        self.spans.append(span)
+
+    def clear(self) -> None:
+        """Drop the stored spans."""
+        self.spans.clear()
+
+
+class RequestTracer:
+    """Fan request spans out to the registered exporters."""
+
+    def __init__(self) -> None:
+        """Initialize without exporters."""
+        self.exporters: List[SpanExporter] = []
+
+    def add_exporter(self, exporter: SpanExporter) -> Callable[[], None]:
+        """Register an exporter; returns a callable that removes it."""
+        self.exporters.append(exporter)
+
+        def _remove() -> None:
+            if exporter in self.exporters:
+                self.exporters.remove(exporter)
+
+        return _remove
+
+    def emit(self, span: RequestSpan) -> None:
+        """Hand a span to every exporter, isolating their failures."""
+        for exporter in list(self.exporters):
+            try:
+                exporter.export(span)
+            except Exception:  # noqa: BLE001 - an exporter must not break polling
+                _LOGGER.exception("Span exporter %r failed", exporter)
@@ -0,0 +1,405 @@
+"""Memory and setup-time benchmark of the integration at scale.
+
+Sets the integration up against a synthetic account of N made-up Gen1,
+Gen2 and Gen3 devices, served by SyntheticAccountSession instead of the
+cloud, and reports as JSON:
+
+- the setup time of each platform's async_setup_entry,
+- peak and retained allocations during setup,
+- the retained size of hub.data and of the entity objects,
+- CPU time and allocations per poll cycle.
+
+Needs Home Assistant and pytest-homeassistant-custom-component (see
+requirements_test.txt) for a throwaway Home Assistant instance:
+
+    python scripts/benchmark.py --devices 100 500 1000 --mix G1=50,G2=30,G3=20
+
+Run it with growing --devices to plot the scaling curve of one build.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from homeassistant import loader  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.helpers.entity_platform import async_get_platforms  # noqa: E402
+from pytest_homeassistant_custom_component.common import (  # noqa: E402
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from custom_components.shelly_cloud2.const import (  # noqa: E402
+    CONF_AUTH_KEY,
+    CONF_DEVICE_IDS,
+    CONF_SERVER,
+    DOMAIN,
+)
+from custom_components.shelly_cloud2.recording import (  # noqa: E402
+    ReplayResponse,
+    install_session,
+)
+
+_PACKAGE = "custom_components.shelly_cloud2"
+
+GENERATIONS = ("G1", "G2", "G3")
+
+
+def parse_mix(raw: str) -> Dict[str, float]:
+    """Parse "G1=50,G2=30,G3=20" into generation -> share of the fleet.
+
+    Weights need not add up to 100. Raises ValueError on malformed
+    entries, unknown generations or an all-zero mix.
+    """
+    weights: Dict[str, float] = {}
+    for part in raw.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        gen, sep, weight = part.partition("=")
+        gen = gen.strip().upper()
+        if not sep or gen not in GENERATIONS:
+            raise ValueError(f"Invalid generation mix entry: {part}")
+        try:
+            weights[gen] = float(weight)
+        except ValueError as exc:
+            raise ValueError(f"Invalid generation mix entry: {part}") from exc
+        if weights[gen] < 0:
+            raise ValueError(f"Invalid generation mix entry: {part}")
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("Generation mix is empty")
+    return {gen: weight / total for gen, weight in weights.items()}
+
+
+def synthetic_device_ids(devices: int, mix: Dict[str, float]) -> List[str]:
+    """Return device IDs for a synthetic account of the given mix.
+
+    Counts are split by largest remainder so they add up to devices.
+    """
+    exact = {gen: devices * share for gen, share in mix.items()}
+    counts = {gen: int(value) for gen, value in exact.items()}
+    by_remainder = sorted(exact, key=lambda gen: exact[gen] - counts[gen], reverse=True)
+    for gen in by_remainder[: devices - sum(counts.values())]:
+        counts[gen] += 1
+    return [
+        f"{gen.lower()}{n:06d}"
+        for gen in GENERATIONS
+        for n in range(counts.get(gen, 0))
+    ]
+
+
+def _generation(device_id: str) -> str:
+    """Return the generation encoded in a synthetic device ID."""
+    return device_id[:2].upper()
+
+
+def _gen1_state(device_id: str, rng: random.Random, cycle: int) -> Dict[str, Any]:
+    """Return a Gen1 plug: one relay, meter, input and temperature."""
+    return {
+        "id": device_id,
+        "type": "relay",
+        "gen": "G1",
+        "online": 1,
+        "status": {
+            "relays": [{"ison": rng.random() < 0.5}],
+            "meters": [
+                {"power": round(rng.uniform(0, 2000), 1), "total": 1000 + cycle * 7}
+            ],
+            "inputs": [{"input": 0, "event": "", "event_cnt": 0}],
+            "tmp": {"tC": round(rng.uniform(20, 45), 1)},
+            "wifi_sta": {"rssi": rng.randint(-90, -40)},
+            "cloud": {"connected": True},
+            "_updated": "2024-01-01 00:00:00",
+        },
+        "settings": {"name": f"Plug {device_id}", "device": {"type": "SHPLG-S"}},
+    }
+
+
+def _gen2_state(device_id: str, rng: random.Random, cycle: int) -> Dict[str, Any]:
+    """Return a Gen2 two-channel relay with inputs."""
+    status: Dict[str, Any] = {
+        "wifi": {"rssi": rng.randint(-90, -40)},
+        "cloud": {"connected": True},
+    }
+    for channel in range(2):
+        status[f"switch:{channel}"] = {
+            "id": channel,
+            "output": rng.random() < 0.5,
+            "apower": round(rng.uniform(0, 2000), 1),
+            "aenergy": {"total": 1000.0 + cycle * 7},
+            "temperature": {"tC": round(rng.uniform(20, 45), 1)},
+        }
+        status[f"input:{channel}"] = {"id": channel, "state": False}
+    return {
+        "id": device_id,
+        "type": "relay",
+        "gen": "G2",
+        "code": "SNSW-102P16EU",
+        "online": 1,
+        "status": status,
+        "settings": {"name": f"Plus 2PM {device_id}"},
+    }
+
+
+def _gen3_state(device_id: str, rng: random.Random, cycle: int) -> Dict[str, Any]:
+    """Return a Gen3 relay with an input and environment sensors."""
+    return {
+        "id": device_id,
+        "type": "relay",
+        "gen": "G3",
+        "code": "S3SW-001P16EU",
+        "online": 1,
+        "status": {
+            "switch:0": {
+                "id": 0,
+                "output": rng.random() < 0.5,
+                "apower": round(rng.uniform(0, 2000), 1),
+                "aenergy": {"total": 1000.0 + cycle * 7},
+            },
+            "input:0": {"id": 0, "state": False},
+            "temperature:0": {"id": 0, "tC": round(rng.uniform(15, 30), 1)},
+            "humidity:0": {"id": 0, "rh": round(rng.uniform(30, 70), 1)},
+            "wifi": {"rssi": rng.randint(-90, -40)},
+            "cloud": {"connected": True},
+        },
+        "settings": {"name": f"1PM Gen3 {device_id}"},
+    }
+
+
+_STATE_BUILDERS = {"G1": _gen1_state, "G2": _gen2_state, "G3": _gen3_state}
+
+
+class SyntheticAccountSession:
+    """Answer cloud API requests for synthetic devices in place of aiohttp.
+
+    Every fetch of a device advances it by one cycle with fresh readings;
+    a fixed seed makes runs comparable between builds.
+    """
+
+    closed = False
+
+    def __init__(self, seed: int = 0) -> None:
+        """Initialize the reading generator."""
+        self._rng = random.Random(seed)
+        self._cycles: Dict[str, int] = {}
+
+    def post(self, url: str, **kwargs: Any) -> ReplayResponse:
+        """Answer a POST to the cloud API."""
+        endpoint = url.split("/v2/devices/api/", 1)[-1]
+        if endpoint != "get":
+            return ReplayResponse(200, None)
+        states = []
+        for dev_id in (kwargs.get("json") or {}).get("ids", []):
+            builder = _STATE_BUILDERS.get(_generation(dev_id))
+            if builder is None:
+                continue
+            cycle = self._cycles.get(dev_id, 0)
+            self._cycles[dev_id] = cycle + 1
+            states.append(builder(dev_id, self._rng, cycle))
+        return ReplayResponse(200, states)
+
+    async def close(self) -> None:
+        """Nothing to release."""
+
+
+def _deep_size(roots: Iterable[Any], seen: set[int], stop: Iterable[Any] = ()) -> int:
+    """Return the bytes held by roots and everything they own.
+
+    Containers and objects of this integration are followed; other
+    objects count with their own size only. Objects in stop and objects
+    already in seen are not counted, so shared data is counted once.
+    """
+    seen.update(id(obj) for obj in stop)
+    pending = deque(roots)
+    total = 0
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            pending.extend(obj.keys())
+            pending.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            pending.extend(obj)
+        elif type(obj).__module__.startswith(_PACKAGE):
+            if hasattr(obj, "__dict__"):
+                pending.append(obj.__dict__)
+            for cls in type(obj).__mro__:
+                for slot in getattr(cls, "__slots__", ()):
+                    if hasattr(obj, slot):
+                        pending.append(getattr(obj, slot))
+    return total
+
+
+async def async_benchmark(
+    hass: HomeAssistant, devices: int, mix: Dict[str, float], cycles: int, seed: int
+) -> Dict[str, Any]:
+    """Set up an entry of synthetic devices and measure its memory and time."""
+    device_ids = synthetic_device_ids(devices, mix)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_SERVER: "shelly-benchmark.shelly.cloud",
+            CONF_AUTH_KEY: "benchmark",
+            CONF_DEVICE_IDS: device_ids,
+        },
+    )
+    entry.add_to_hass(hass)
+    install_session(hass, entry, SyntheticAccountSession(seed))
+
+    tracemalloc.start()
+    try:
+        started = time.perf_counter()
+        if not await hass.config_entries.async_setup(entry.entry_id):
+            raise RuntimeError("Config entry failed to set up")
+        await hass.async_block_till_done()
+        setup_total_ms = (time.perf_counter() - started) * 1000
+        setup_retained, setup_peak = tracemalloc.get_traced_memory()
+
+        hub = hass.data[DOMAIN][entry.entry_id]
+        hub_data_bytes = _deep_size((hub.data,), set())
+
+        # Platforms set up concurrently, so their allocations cannot be told
+        # apart; memory is measured on the entities they created instead
+        shared = (hass, hub, hub.data)
+        seen: set[int] = set()
+        platforms: Dict[str, Dict[str, Any]] = {}
+        entity_count = 0
+        for entity_platform in async_get_platforms(hass, DOMAIN):
+            if (
+                entity_platform.config_entry is None
+                or entity_platform.config_entry.entry_id != entry.entry_id
+            ):
+                continue
+            entities = list(entity_platform.entities.values())
+            entity_count += len(entities)
+            setup_s = hub.platform_setup_times.get(entity_platform.domain, 0.0)
+            platforms[entity_platform.domain] = {
+                "setup_ms": round(setup_s * 1000, 3),
+                "entities": len(entities),
+                "entity_bytes": _deep_size(entities, seen, shared),
+            }
+        entity_bytes = sum(p["entity_bytes"] for p in platforms.values())
+
+        results: List[Dict[str, Any]] = []
+        hub_data_peak = hub_data_bytes
+        for _ in range(cycles):
+            tracemalloc.reset_peak()
+            mem_before = tracemalloc.get_traced_memory()[0]
+            cpu_before = time.process_time()
+
+            await hub.async_refresh()
+            await hass.async_block_till_done()
+
+            cpu = time.process_time() - cpu_before
+            mem_after, mem_peak = tracemalloc.get_traced_memory()
+            hub_data_peak = max(hub_data_peak, _deep_size((hub.data,), set()))
+            results.append(
+                {
+                    "cpu_ms": round(cpu * 1000, 3),
+                    "alloc_peak_bytes": mem_peak - mem_before,
+                    "retained_bytes": mem_after - mem_before,
+                }
+            )
+    finally:
+        tracemalloc.stop()
+
+    await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+    counts = {gen: 0 for gen in GENERATIONS}
+    for dev_id in device_ids:
+        counts[_generation(dev_id)] += 1
+
+    def _per(value: float, count: int) -> float:
+        return round(value / count, 1) if count else 0.0
+
+    return {
+        "devices": devices,
+        "mix": counts,
+        "entities": entity_count,
+        "setup": {
+            "ms": round(setup_total_ms, 3),
+            "alloc_peak_bytes": setup_peak,
+            "retained_bytes": setup_retained,
+            "retained_bytes_per_device": _per(setup_retained, devices),
+            "platforms": platforms,
+        },
+        "memory": {
+            "hub_data_bytes": hub_data_bytes,
+            "hub_data_peak_bytes": hub_data_peak,
+            "hub_data_bytes_per_device": _per(hub_data_bytes, devices),
+            "entity_bytes": entity_bytes,
+            "entity_bytes_per_entity": _per(entity_bytes, entity_count),
+            "entity_bytes_per_device": _per(entity_bytes, devices),
+        },
+        "cycles": results,
+        "totals": {
+            "cycles": len(results),
+            "cpu_ms_per_cycle": _per(sum(r["cpu_ms"] for r in results), len(results)),
+            "alloc_peak_bytes_max": max(
+                (r["alloc_peak_bytes"] for r in results), default=0
+            ),
+            "retained_bytes": sum(r["retained_bytes"] for r in results),
+        },
+    }
+
+
+async def _run(args: argparse.Namespace, mix: Dict[str, float]) -> Dict[str, Any]:
+    """Benchmark every requested fleet size in a fresh Home Assistant."""
+    runs = []
+    for devices in args.devices:
+        with tempfile.TemporaryDirectory() as config_dir:
+            async with async_test_home_assistant(config_dir=config_dir) as hass:
+                # Let the loader find this repository's custom_components
+                hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+                runs.append(
+                    await async_benchmark(hass, devices, mix, args.cycles, args.seed)
+                )
+    return {"cycles": args.cycles, "seed": args.seed, "runs": runs}
+
+
+def main(argv: List[str] | None = None) -> int:
+    """Parse arguments, run the benchmark and write the JSON report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--devices", type=int, nargs="+", default=[100], help="fleet sizes to run"
+    )
+    parser.add_argument(
+        "--mix", default="G1=50,G2=30,G3=20", help="share of each generation"
+    )
+    parser.add_argument("--cycles", type=int, default=10, help="poll cycles per run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the report here instead of stdout")
+    args = parser.parse_args(argv)
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    report = asyncio.run(_run(args, mix))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
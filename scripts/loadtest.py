@@ -0,0 +1,204 @@
+"""Load-test a Shelly Cloud v2 endpoint with the integration's client.
+
+Runs without Home Assistant; only aiohttp is required. By default a local
+stand-in server that mimics /v2/devices/api/get and /set/<kind> is started
+in-process, so no real account is hammered:
+
+    python scripts/loadtest.py --requests 2000 --concurrency 20 --latency 50
+
+Point --url at another stand-in (or, carefully, a real server) to test it
+instead. Reports throughput and latency percentiles as text or JSON.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from aiohttp import ClientSession, web
+
+_CLIENT_PATH = (
+    Path(__file__).resolve().parent.parent
+    / "custom_components"
+    / "shelly_cloud2"
+    / "client.py"
+)
+
+
+def _load_client() -> Any:
+    """Import client.py by path, skipping the integration's package init."""
+    spec = importlib.util.spec_from_file_location("shelly_cloud2_client", _CLIENT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+client = _load_client()
+
+
+def _device_state(device_id: str) -> Dict[str, Any]:
+    """Return a plausible Gen1 relay payload."""
+    return {
+        "id": device_id,
+        "type": "relay",
+        "online": 1,
+        "status": {
+            "relays": [{"ison": random.random() < 0.5}],
+            "meters": [{"power": round(random.uniform(0, 2000), 1), "total": 123456}],
+            "wifi_sta": {"rssi": random.randint(-90, -40)},
+            "cloud": {"connected": True},
+        },
+        "settings": {"name": f"Plug {device_id}", "device": {"type": "SHPLG-S"}},
+    }
+
+
+def _stand_in_app(latency: float, error_rate: float) -> web.Application:
+    """Build an aiohttp app answering like the Shelly Cloud device API."""
+
+    async def _delay() -> web.Response | None:
+        if latency:
+            await asyncio.sleep(random.expovariate(1 / latency))
+        if error_rate and random.random() < error_rate:
+            return web.Response(status=503, text="stand-in failure")
+        return None
+
+    async def handle_get(request: web.Request) -> web.Response:
+        failure = await _delay()
+        if failure is not None:
+            return failure
+        body = await request.json()
+        return web.json_response([_device_state(d) for d in body.get("ids", [])])
+
+    async def handle_set(request: web.Request) -> web.Response:
+        failure = await _delay()
+        if failure is not None:
+            return failure
+        await request.json()
+        return web.json_response({"isok": True})
+
+    app = web.Application()
+    app.router.add_post("/v2/devices/api/get", handle_get)
+    app.router.add_post("/v2/devices/api/set/{kind}", handle_set)
+    return app
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    """Return the pct percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def _run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Send the requests and collect latencies."""
+    runner = None
+    base_url = args.url
+    if base_url is None:
+        runner = web.AppRunner(_stand_in_app(args.latency / 1000, args.error_rate))
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", args.port)
+        await site.start()
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    device_ids = [f"dev{n:05d}" for n in range(args.devices)]
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    try:
+        async with ClientSession() as session:
+            api = client.ShellyCloudClient(session, base_url, args.auth_key, args.timeout)
+
+            async def one(n: int) -> None:
+                async with semaphore:
+                    started = time.perf_counter()
+                    try:
+                        if args.mode == "get":
+                            offset = (n * args.chunk) % len(device_ids)
+                            ids = tuple(device_ids[offset : offset + args.chunk])
+                            await api.async_get_states(client.GetStatesRequest(ids))
+                        else:
+                            await api.async_set(
+                                client.SetSwitchRequest(
+                                    device_ids[n % len(device_ids)], 0, n % 2 == 0
+                                )
+                            )
+                    except client.ShellyCloudError as exc:
+                        name = type(exc).__name__
+                        errors[name] = errors.get(name, 0) + 1
+                        return
+                    latencies.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(one(n) for n in range(args.requests)))
+            elapsed = time.perf_counter() - started
+    finally:
+        if runner is not None:
+            await runner.cleanup()
+
+    latencies.sort()
+    return {
+        "target": base_url,
+        "mode": args.mode,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "ok": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            f"p{pct}": round(_percentile(latencies, pct) * 1000, 2)
+            for pct in (50, 90, 95, 99)
+        }
+        | {"max": round(latencies[-1] * 1000, 2) if latencies else 0.0},
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    """Parse arguments, run the load test and print the report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="base URL to test; default: in-process stand-in")
+    parser.add_argument("--auth-key", default="loadtest")
+    parser.add_argument("--mode", choices=("get", "switch"), default="get")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--chunk", type=int, default=10, help="device IDs per get")
+    parser.add_argument("--timeout", type=float, default=client.DEFAULT_TIMEOUT)
+    parser.add_argument("--port", type=int, default=8765, help="stand-in server port")
+    parser.add_argument(
+        "--latency", type=float, default=0, help="stand-in mean latency in ms"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0, help="stand-in share of 503 answers"
+    )
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(_run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"{report['ok']}/{report['requests']} ok against {report['target']}")
+    print(f"throughput: {report['throughput_rps']} req/s in {report['elapsed_s']} s")
+    print(
+        "latency ms: "
+        + ", ".join(f"{k}={v}" for k, v in report["latency_ms"].items())
+    )
+    if report["errors"]:
+        print(f"errors: {report['errors']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
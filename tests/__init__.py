@@ -0,0 +1 @@
+"""Tests for the Shelly Cloud 2 integration."""
@@ -0,0 +1,124 @@
+"""Fixtures for Shelly Cloud 2 tests."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.shelly_cloud2.const import (
+    CONF_AUTH_KEY,
+    CONF_DEVICE_IDS,
+    CONF_SERVER,
+    DOMAIN,
+)
+from custom_components.shelly_cloud2.engine import ShellyCloud2FetchEngine
+from custom_components.shelly_cloud2.recording import ReplayResponse
+
+SERVER = "shelly-test-eu.shelly.cloud"
+GET_URL = f"https://{SERVER}/v2/devices/api/get"
+
+
+def set_url(kind: str) -> str:
+    """Return the cloud URL of a control request."""
+    return f"https://{SERVER}/v2/devices/api/set/{kind}"
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations: Any) -> None:
+    """Load this repository's custom integration in every test."""
+
+
+def make_entry(
+    device_ids: List[str], options: Dict[str, Any] | None = None
+) -> MockConfigEntry:
+    """Return a config entry for the given devices."""
+    return MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_SERVER: SERVER,
+            CONF_AUTH_KEY: "test-key",
+            CONF_DEVICE_IDS: device_ids,
+        },
+        options=options or {},
+    )
+
+
+class StubResponse(ReplayResponse):
+    """ReplayResponse that takes delay seconds and honours the timeout."""
+
+    def __init__(
+        self, status: int, payload: Any, delay: float, timeout: float | None
+    ) -> None:
+        """Initialize with the answer and how long it takes."""
+        super().__init__(status, payload)
+        self._delay = delay
+        self._timeout = timeout
+
+    async def __aenter__(self) -> StubResponse:
+        if self._timeout is not None and self._delay > self._timeout:
+            await asyncio.sleep(self._timeout)
+            raise TimeoutError
+        await asyncio.sleep(self._delay)
+        return self
+
+
+class StubCloud:
+    """Answer cloud API requests from a dict of device states.
+
+    Stands in for the aiohttp session of a fetch engine. Every request is
+    kept in requests as (endpoint, body).
+    """
+
+    closed = False
+
+    def __init__(
+        self, states: Dict[str, Dict[str, Any]], delay: float = 0.0
+    ) -> None:
+        """Initialize with device_id -> state and a per-request delay."""
+        self.states = states
+        self.delay = delay
+        self.status = 200
+        self.requests: List[Tuple[str, Dict[str, Any]]] = []
+
+    def post(self, url: str, **kwargs: Any) -> StubResponse:
+        """Answer a POST to the cloud API."""
+        endpoint = url.split("/v2/devices/api/", 1)[-1]
+        body = kwargs.get("json") or {}
+        self.requests.append((endpoint, body))
+        if endpoint != "get":
+            payload: Any = {"isok": True}
+        else:
+            payload = [
+                self.states[dev_id]
+                for dev_id in body.get("ids", [])
+                if dev_id in self.states
+            ]
+        return StubResponse(self.status, payload, self.delay, kwargs.get("timeout"))
+
+    def fetched(self) -> List[List[str]]:
+        """Return the device IDs of every state request, in order."""
+        return [body["ids"] for endpoint, body in self.requests if endpoint == "get"]
+
+
+def make_engine(
+    hass: HomeAssistant,
+    session: StubCloud,
+    chunk_size_min: int = 1,
+    chunk_size_max: int = 10,
+) -> ShellyCloud2FetchEngine:
+    """Return a fetch engine that talks to session."""
+    return ShellyCloud2FetchEngine(
+        hass,
+        f"https://{SERVER}",
+        "test-key",
+        dedicated_session=False,
+        chunk_size_min=chunk_size_min,
+        chunk_size_max=chunk_size_max,
+        session=session,
+    )
@@ -0,0 +1,128 @@
+"""Tests for the incrementally maintained fleet aggregates."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.shelly_cloud2.aggregate import (
+    SITE_GROUP,
+    Contribution,
+    FleetAggregates,
+    parse_device_tags,
+)
+from custom_components.shelly_cloud2.const import (
+    CONF_DEVICE_TAGS,
+    CONF_FLEET_AGGREGATES,
+    DOMAIN,
+)
+from custom_components.shelly_cloud2.recording import install_session
+
+from .conftest import StubCloud, make_entry
+
+
+def test_parse_device_tags() -> None:
+    """Tags are parsed per device, and malformed entries are rejected."""
+    assert parse_device_tags("a=kitchen,\nb = garage") == {
+        "a": "kitchen",
+        "b": "garage",
+    }
+    assert parse_device_tags("") == {}
+    with pytest.raises(ValueError):
+        parse_device_tags("a=")
+
+
+def test_only_changed_contributions_are_applied() -> None:
+    """Totals follow per-device deltas and report the groups they touched."""
+    aggregates = FleetAggregates({"a": "kitchen"})
+    contributions: Dict[str, Contribution] = {
+        "a": (100.0, 1.0, 1, 0),
+        "b": (50.0, 2.0, 0, 1),
+    }
+    evaluated: List[str] = []
+
+    def _contribution(dev_id: str, state: Dict[str, Any]) -> Contribution:
+        evaluated.append(dev_id)
+        return contributions[dev_id]
+
+    aggregates.update({"a": {}, "b": {}}, _contribution)
+    assert aggregates.total(SITE_GROUP, "power") == 150.0
+    assert aggregates.total(SITE_GROUP, "doors_open") == 1
+    assert aggregates.total("kitchen", "power") == 100.0
+    assert aggregates.total("kitchen", "relays_on") == 1
+    assert aggregates.changed == {SITE_GROUP, "kitchen"}
+
+    # Only the devices in an update are looked at
+    evaluated.clear()
+    contributions["b"] = (80.0, 2.0, 0, 0)
+    aggregates.update({"b": {}}, _contribution)
+    assert evaluated == ["b"]
+    assert aggregates.total(SITE_GROUP, "power") == 180.0
+    assert aggregates.total(SITE_GROUP, "doors_open") == 0
+    assert aggregates.total("kitchen", "power") == 100.0
+    assert aggregates.changed == {SITE_GROUP}
+
+    # An unchanged contribution touches nothing
+    aggregates.update({"a": {}, "b": {}}, _contribution)
+    assert aggregates.changed == set()
+
+
+def _gen1_relay(power: float) -> Dict[str, Any]:
+    """Return a Gen1 plug that is on and meters power."""
+    return {
+        "id": "plug",
+        "type": "relay",
+        "online": 1,
+        "status": {
+            "relays": [{"ison": True}],
+            "meters": [{"power": power, "total": 1000}],
+            "cloud": {"connected": True},
+        },
+        "settings": {"name": "Plug"},
+    }
+
+
+def _gen2_meter(power: float) -> Dict[str, Any]:
+    """Return a Gen2 device with a switch that is on and an energy meter."""
+    return {
+        "id": "pro",
+        "type": "relay",
+        "online": 1,
+        "status": {
+            "switch:0": {"id": 0, "output": True},
+            "em:0": {"id": 0, "total_act_power": power},
+            "cloud": {"connected": True},
+        },
+        "settings": {"name": "Pro"},
+    }
+
+
+async def test_hub_keeps_aggregates_of_gen1_and_gen2(hass: HomeAssistant) -> None:
+    """The hub feeds Gen1 meters and Gen2 switch and em blocks to the totals."""
+    cloud = StubCloud({"plug": _gen1_relay(100.0), "pro": _gen2_meter(400.0)})
+    entry = make_entry(
+        ["plug", "pro"],
+        {CONF_FLEET_AGGREGATES: True, CONF_DEVICE_TAGS: "plug=kitchen"},
+    )
+    entry.add_to_hass(hass)
+    install_session(hass, entry, cloud)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    aggregates = hass.data[DOMAIN][entry.entry_id].aggregates
+
+    assert aggregates.total(SITE_GROUP, "power") == 500.0
+    assert aggregates.total(SITE_GROUP, "relays_on") == 2
+    assert aggregates.total("kitchen", "power") == 100.0
+
+    cloud.states["pro"] = _gen2_meter(300.0)
+    await hass.data[DOMAIN][entry.entry_id].async_refresh()
+
+    assert aggregates.total(SITE_GROUP, "power") == 400.0
+    assert aggregates.total("kitchen", "power") == 100.0
+    assert aggregates.changed == {SITE_GROUP}
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
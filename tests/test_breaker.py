@@ -0,0 +1,116 @@
+"""Tests for the circuit breaker around cloud requests."""
+
+from __future__ import annotations
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.shelly_cloud2.breaker import CircuitBreaker, CircuitOpenError
+from custom_components.shelly_cloud2.const import (
+    CIRCUIT_BACKOFF_INITIAL,
+    CIRCUIT_FAILURE_THRESHOLD,
+)
+
+from .conftest import StubCloud, make_engine
+
+
+def _open(breaker: CircuitBreaker) -> None:
+    """Fail requests until the circuit opens."""
+    for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+        assert not breaker.before_request()
+        breaker.record_failure()
+
+
+def _expire(breaker: CircuitBreaker) -> None:
+    """Let the current back-off run out."""
+    breaker._retry_at = 0.0
+
+
+def test_opens_after_consecutive_failures() -> None:
+    """The circuit opens at the threshold and then refuses requests."""
+    breaker = CircuitBreaker("test")
+    for _ in range(CIRCUIT_FAILURE_THRESHOLD - 1):
+        breaker.record_failure()
+    breaker.record_success()
+    for _ in range(CIRCUIT_FAILURE_THRESHOLD - 1):
+        breaker.record_failure()
+    # A success in between resets the count
+    assert not breaker.is_open
+
+    breaker.record_failure()
+
+    assert breaker.is_open
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+
+def test_half_open_probe_closes_on_success() -> None:
+    """After the back-off one caller probes, and its success closes."""
+    breaker = CircuitBreaker("test")
+    _open(breaker)
+    _expire(breaker)
+
+    assert breaker.before_request()
+    # Only one probe at a time
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    breaker.record_success()
+
+    assert not breaker.is_open
+    assert not breaker.before_request()
+
+
+def test_failed_probe_doubles_the_back_off() -> None:
+    """A failed probe reopens the circuit with a longer back-off."""
+    breaker = CircuitBreaker("test")
+    _open(breaker)
+    assert breaker._backoff == CIRCUIT_BACKOFF_INITIAL
+    _expire(breaker)
+
+    assert breaker.before_request()
+    breaker.record_failure()
+
+    assert breaker.is_open
+    assert breaker._backoff == 2 * CIRCUIT_BACKOFF_INITIAL
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+
+def test_aborted_probe_lets_another_caller_probe() -> None:
+    """A cancelled probe frees the probe slot without closing."""
+    breaker = CircuitBreaker("test")
+    _open(breaker)
+    _expire(breaker)
+    assert breaker.before_request()
+
+    breaker.abort_probe()
+
+    assert breaker.is_open
+    assert breaker.before_request()
+
+
+async def test_engine_fails_fast_while_open(hass: HomeAssistant) -> None:
+    """An open circuit sends nothing, and a one-device probe closes it."""
+    cloud = StubCloud({"a": {"id": "a"}, "b": {"id": "b"}})
+    cloud.status = 503
+    engine = make_engine(hass, cloud)
+    for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+        with pytest.raises(UpdateFailed):
+            await engine.async_fetch_states(["a", "b"])
+    sent = len(cloud.requests)
+
+    with pytest.raises(CircuitOpenError):
+        await engine.async_fetch_states(["a", "b"])
+    assert len(cloud.requests) == sent
+
+    cloud.status = 200
+    _expire(engine.breaker)
+    states = await engine.async_fetch_states(["a", "b"])
+
+    assert set(states) == {"a", "b"}
+    assert not engine.breaker.is_open
+    # The probe carried a single device, then the rest followed
+    assert cloud.fetched()[-2:] == [["a"], ["b"]]
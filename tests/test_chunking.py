@@ -0,0 +1,96 @@
+"""Tests for the adaptive chunk size of state requests."""
+
+from __future__ import annotations
+
+from custom_components.shelly_cloud2.chunking import ChunkSizeTuner
+
+
+def _tuner(initial: int = 10) -> ChunkSizeTuner:
+    """Return a tuner within [1, 10] for a 15 s request timeout."""
+    return ChunkSizeTuner(minimum=1, maximum=10, initial=initial, timeout=15)
+
+
+def test_grows_on_fast_full_chunks() -> None:
+    """Fast, small and full chunks grow the size by one up to the maximum."""
+    tuner = _tuner(initial=5)
+
+    sizes = []
+    for _ in range(7):
+        tuner.record_success(tuner.size, 0.1, 1000)
+        sizes.append(tuner.size)
+
+    assert sizes == [6, 7, 8, 9, 10, 10, 10]
+
+
+def test_partial_chunks_do_not_grow() -> None:
+    """A chunk smaller than the size says nothing about larger ones."""
+    tuner = _tuner(initial=5)
+
+    tuner.record_success(3, 0.1, 1000)
+
+    assert tuner.size == 5
+
+
+def test_shrinks_when_slow() -> None:
+    """Chunks slower than a quarter of the timeout shrink the size."""
+    tuner = _tuner()
+
+    tuner.record_success(10, 7.5, 1000)
+
+    assert tuner.size == 5
+
+
+def test_shrinks_for_large_payloads() -> None:
+    """Responses above the payload target shrink the size to fit it."""
+    tuner = _tuner()
+
+    tuner.record_success(10, 0.1, 10 * 100 * 1024)
+
+    assert tuner.size == 5
+
+
+def test_failure_halves_the_failed_chunk() -> None:
+    """A failed chunk halves the size, based on the chunk that failed."""
+    tuner = _tuner()
+
+    tuner.record_failure(10)
+    assert tuner.size == 5
+
+    tuner.record_failure(3)
+    assert tuner.size == 1
+
+
+def test_errors_hold_back_growth() -> None:
+    """The size does not grow again right after a failure."""
+    tuner = _tuner()
+    tuner.record_failure(10)
+
+    tuner.record_success(tuner.size, 0.1, 1000)
+
+    assert tuner.size == 5
+
+
+def test_rejected_chunk_lowers_the_ceiling_until_it_recovers() -> None:
+    """A rejected chunk caps the size, and successes raise the cap again."""
+    tuner = _tuner()
+
+    assert tuner.record_rejected(10)
+    assert tuner.ceiling == 9
+    assert tuner.size == 5
+
+    for _ in range(9):
+        tuner.record_success(tuner.size, 0.1, 1000)
+    assert tuner.ceiling == 9
+    assert tuner.size == 9
+
+    tuner.record_success(tuner.size, 0.1, 1000)
+    assert tuner.ceiling == 10
+    assert tuner.size == 10
+
+
+def test_rejected_minimum_chunk_is_not_retried() -> None:
+    """A rejected chunk at the minimum size cannot be split further."""
+    tuner = _tuner(initial=1)
+
+    assert not tuner.record_rejected(1)
+    assert tuner.ceiling == 10
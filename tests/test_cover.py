@@ -0,0 +1,58 @@
+"""Tests for the Shelly Cloud 2 cover platform."""
+
+from __future__ import annotations
+
+from homeassistant.components.cover import ATTR_CURRENT_POSITION, CoverState
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from pytest_homeassistant_custom_component.test_util.aiohttp import (
+    AiohttpClientMocker,
+)
+
+from custom_components.shelly_cloud2.const import DOMAIN
+
+from .conftest import GET_URL, make_entry, set_url
+
+COVER_STATE = {
+    "id": "cov1",
+    "type": "cover",
+    "online": 1,
+    "status": {
+        "covers": [{"state": "stop", "current_pos": 40}],
+        "cloud": {"connected": True},
+    },
+    "settings": {"name": "Blinds"},
+}
+
+
+async def test_cover_setup_and_open(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """A Gen1 cover becomes a cover entity that opens through the cloud."""
+    aioclient_mock.post(GET_URL, json=[COVER_STATE])
+    aioclient_mock.post(set_url("cover"), json={"isok": True})
+    entry = make_entry(["cov1"])
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_id = er.async_get(hass).async_get_entity_id(
+        "cover", DOMAIN, "shelly_cloud2_cov1_cover_0"
+    )
+    assert entity_id is not None
+    state = hass.states.get(entity_id)
+    assert state.state == CoverState.OPEN
+    assert state.attributes[ATTR_CURRENT_POSITION] == 40
+
+    await hass.services.async_call(
+        "cover", "open_cover", {"entity_id": entity_id}, blocking=True
+    )
+    _method, url, body, _headers = aioclient_mock.mock_calls[-1]
+    assert str(url).startswith(set_url("cover"))
+    assert body == {"id": "cov1", "channel": 0, "position": "open"}
+    assert hass.states.get(entity_id).state == CoverState.OPENING
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
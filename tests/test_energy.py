@@ -0,0 +1,79 @@
+"""Tests for reset-stitched and integrated energy totals."""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.shelly_cloud2.const import ENERGY_MAX_GAP
+from custom_components.shelly_cloud2.energy import EnergyAccumulator, EnergyMeters
+
+
+def _meter_state(
+    total: float | None = None, power: float | None = None
+) -> Dict[str, Any]:
+    """Return a device payload with one meter."""
+    meter: Dict[str, Any] = {}
+    if total is not None:
+        meter["total"] = total
+    if power is not None:
+        meter["power"] = power
+    return {"id": "dev1", "status": {"meters": [meter]}}
+
+
+def test_counter_resets_are_stitched() -> None:
+    """A counter that goes down was reset; its new value is added on top."""
+    acc = EnergyAccumulator()
+
+    acc.add(0, 1000, None)
+    assert acc.energy == pytest.approx(1.0)
+    acc.add(10, 1500, None)
+    assert acc.energy == pytest.approx(1.5)
+
+    # Reboot: the device counter starts over
+    acc.add(20, 200, None)
+    assert acc.energy == pytest.approx(1.7)
+    acc.add(30, 300, None)
+    assert acc.energy == pytest.approx(1.8)
+
+
+def test_power_only_meters_are_integrated() -> None:
+    """Without a counter, power is integrated with the trapezoidal rule."""
+    acc = EnergyAccumulator()
+
+    acc.add(0, None, 1000)
+    acc.add(60, None, 2000)
+
+    # (1000 W + 2000 W) / 2 over 60 s
+    assert acc.energy == pytest.approx(1500 * 60 / 3.6e6)
+
+
+def test_long_gaps_are_not_integrated() -> None:
+    """A gap longer than ENERGY_MAX_GAP adds nothing."""
+    acc = EnergyAccumulator()
+
+    acc.add(0, None, 1000)
+    acc.add(ENERGY_MAX_GAP + 1, None, 1000)
+
+    assert acc.energy == 0.0
+
+
+async def test_totals_survive_a_restart(hass: HomeAssistant) -> None:
+    """Accumulated totals and counters are restored from storage."""
+    meters = EnergyMeters(hass, "entry1")
+    await meters.async_load()
+    meters.add_states(0, {"dev1": _meter_state(total=1000)})
+    meters.add_states(10, {"dev1": _meter_state(total=200)})
+    await meters.async_save()
+
+    restored = EnergyMeters(hass, "entry1")
+    await restored.async_load()
+
+    assert restored.value("dev1", 0) == pytest.approx(1.2)
+    restored.add_states(20, {"dev1": _meter_state(total=300)})
+    assert restored.value("dev1", 0) == pytest.approx(1.3)
+    assert restored.value("dev1", 1) is None
+    await restored.async_save()
@@ -0,0 +1,145 @@
+"""Tests for the shared fetch engine."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.shelly_cloud2 import engine as engine_module
+from custom_components.shelly_cloud2.const import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    DEFAULT_CHUNK_SIZE,
+    DOMAIN,
+)
+from custom_components.shelly_cloud2.engine import DATA_ENGINES
+from custom_components.shelly_cloud2.recording import install_session
+
+from .conftest import StubCloud, make_engine, make_entry
+
+
+class _Hub:
+    """The parts of a hub the engine reads."""
+
+    def __init__(self, device_ids: list) -> None:
+        """Initialize a hub that has polled before."""
+        self.device_ids = device_ids
+        self.data: dict = {}
+
+
+def _states(*device_ids: str) -> dict:
+    """Return minimal cloud payloads for the given devices."""
+    return {dev_id: {"id": dev_id, "online": 1} for dev_id in device_ids}
+
+
+async def test_first_chunk_outlasts_the_budget(hass: HomeAssistant) -> None:
+    """A first chunk slower than the budget still succeeds every cycle."""
+    cloud = StubCloud(_states("a", "b"), delay=0.2)
+    engine = make_engine(hass, cloud)
+
+    for _ in range(CIRCUIT_FAILURE_THRESHOLD + 1):
+        states, deferred = await engine._async_fetch_chunks(
+            ["a", "b"], time.monotonic() + 0.05
+        )
+        assert set(states) == {"a", "b"}
+        assert deferred == []
+
+    assert not engine.breaker.is_open
+    assert engine.chunk_tuner.size == DEFAULT_CHUNK_SIZE
+
+
+async def test_late_chunks_carry_over(
+    hass: HomeAssistant, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Chunks cut off by the deadline are deferred without a failure."""
+    monkeypatch.setattr(engine_module, "POLL_MIN_SLICE", 0.001)
+    cloud = StubCloud(_states("a", "b", "c"), delay=0.05)
+    engine = make_engine(hass, cloud, chunk_size_max=1)
+
+    for _ in range(CIRCUIT_FAILURE_THRESHOLD + 1):
+        states, deferred = await engine._async_fetch_chunks(
+            ["a", "b", "c"], time.monotonic() + 0.08
+        )
+        assert set(states) == {"a"}
+        assert deferred == ["b", "c"]
+
+    assert not engine.breaker.is_open
+
+
+async def test_first_chunk_timeout_fails(
+    hass: HomeAssistant, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A first chunk that hits REQUEST_TIMEOUT fails and shrinks the chunks."""
+    monkeypatch.setattr(engine_module, "REQUEST_TIMEOUT", 0.05)
+    cloud = StubCloud(_states("a", "b", "c", "d"), delay=0.2)
+    engine = make_engine(hass, cloud)
+
+    with pytest.raises(UpdateFailed):
+        await engine._async_fetch_chunks(
+            ["a", "b", "c", "d"], time.monotonic() + 0.01
+        )
+    assert engine.chunk_tuner.size == 2
+
+
+async def test_carried_over_devices_go_first(hass: HomeAssistant) -> None:
+    """The next cycle starts with the devices the last one did not reach."""
+    cloud = StubCloud(_states("a", "b", "c"))
+    engine = make_engine(hass, cloud, chunk_size_max=1)
+    hub = _Hub(["a", "b", "c"])
+    engine._hubs.add(hub)
+    engine._carry_over = ["c"]
+
+    states, deferred = await engine.async_poll(hub, hub.device_ids)
+
+    assert set(states) == {"a", "b", "c"}
+    assert deferred == []
+    assert cloud.fetched() == [["c"], ["a"], ["b"]]
+
+
+def _relay(device_id: str) -> dict:
+    """Return a Gen1 relay payload."""
+    return {
+        "id": device_id,
+        "type": "relay",
+        "online": 1,
+        "status": {"relays": [{"ison": False}], "cloud": {"connected": True}},
+        "settings": {"name": f"Plug {device_id}"},
+    }
+
+
+async def test_entries_on_one_account_share_polls(
+    hass: HomeAssistant, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Hubs of one account share an engine that merges their polls."""
+    monkeypatch.setattr(engine_module, "ENGINE_COALESCE_WINDOW", 0.05)
+    cloud = StubCloud({"a": _relay("a"), "b": _relay("b")})
+    first = make_entry(["a"])
+    second = make_entry(["b"])
+    first.add_to_hass(hass)
+    second.add_to_hass(hass)
+    install_session(hass, first, cloud)
+    for entry in (first, second):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    hub_a = hass.data[DOMAIN][first.entry_id]
+    hub_b = hass.data[DOMAIN][second.entry_id]
+    assert hub_a._engine is hub_b._engine
+    assert len(cloud.fetched()) == 2
+
+    await asyncio.gather(hub_a.async_refresh(), hub_b.async_refresh())
+
+    # One request for both hubs, each getting its own devices back
+    assert len(cloud.fetched()) == 3
+    assert sorted(cloud.fetched()[-1]) == ["a", "b"]
+    assert set(hub_a.data) == {"a"}
+    assert set(hub_b.data) == {"b"}
+
+    assert await hass.config_entries.async_unload(first.entry_id)
+    assert hass.data[DATA_ENGINES]
+    assert await hass.config_entries.async_unload(second.entry_id)
+    await hass.async_block_till_done()
+    assert not hass.data[DATA_ENGINES]
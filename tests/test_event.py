@@ -0,0 +1,103 @@
+"""Tests for input and button events fired from poll deltas."""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from pytest_homeassistant_custom_component.common import async_capture_events
+
+from custom_components.shelly_cloud2.const import DOMAIN, EVENT_INPUT
+from custom_components.shelly_cloud2.recording import install_session
+
+from .conftest import StubCloud, make_entry
+
+
+def _gen1_button(event: str, event_cnt: int) -> Dict[str, Any]:
+    """Return a Gen1 relay whose input reported event event_cnt times."""
+    return {
+        "id": "g1",
+        "type": "relay",
+        "online": 1,
+        "status": {
+            "relays": [{"ison": False}],
+            "inputs": [{"input": 0, "event": event, "event_cnt": event_cnt}],
+            "cloud": {"connected": True},
+        },
+        "settings": {"name": "Button"},
+    }
+
+
+def _gen2_input(level: bool) -> Dict[str, Any]:
+    """Return a Gen2 device with one input at level."""
+    return {
+        "id": "g2",
+        "type": "relay",
+        "online": 1,
+        "status": {
+            "switch:0": {"id": 0, "output": False},
+            "input:0": {"id": 0, "state": level},
+            "cloud": {"connected": True},
+        },
+        "settings": {"name": "Plus"},
+    }
+
+
+async def test_input_changes_fire_events(hass: HomeAssistant) -> None:
+    """Gen1 presses and Gen2 level changes reach the bus and event entities."""
+    cloud = StubCloud({"g1": _gen1_button("", 0), "g2": _gen2_input(False)})
+    entry = make_entry(["g1", "g2"])
+    entry.add_to_hass(hass)
+    install_session(hass, entry, cloud)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    hub = hass.data[DOMAIN][entry.entry_id]
+    events = async_capture_events(hass, EVENT_INPUT)
+
+    cloud.states["g1"] = _gen1_button("L", 1)
+    cloud.states["g2"] = _gen2_input(True)
+    await hub.async_refresh()
+    await hass.async_block_till_done()
+
+    assert sorted(
+        (event.data["device_id"], event.data["channel"], event.data["event_type"])
+        for event in events
+    ) == [("g1", 0, "long_push"), ("g2", 0, "on")]
+    entity_id = er.async_get(hass).async_get_entity_id(
+        "event", DOMAIN, "shelly_cloud2_g1_input_0_event"
+    )
+    assert entity_id is not None
+    assert hass.states.get(entity_id).attributes["event_type"] == "long_push"
+
+    # Nothing changed, nothing fires
+    await hub.async_refresh()
+    await hass.async_block_till_done()
+    assert len(events) == 2
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_offline_devices_fire_no_events(hass: HomeAssistant) -> None:
+    """A device going offline is not mistaken for an input change."""
+    cloud = StubCloud({"g2": _gen2_input(True)})
+    entry = make_entry(["g2"])
+    entry.add_to_hass(hass)
+    install_session(hass, entry, cloud)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    hub = hass.data[DOMAIN][entry.entry_id]
+    events = async_capture_events(hass, EVENT_INPUT)
+
+    offline = _gen2_input(False)
+    offline["online"] = 0
+    cloud.states["g2"] = offline
+    await hub.async_refresh()
+    await hass.async_block_till_done()
+
+    assert events == []
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
@@ -0,0 +1,24 @@
+"""Tests for sensor deadband parsing."""
+
+from __future__ import annotations
+
+import pytest
+
+from custom_components.shelly_cloud2.filters import parse_deadbands
+
+
+def test_parse_deadbands() -> None:
+    """Absolute and percentage deadbands are parsed per kind."""
+    assert parse_deadbands("power=5%, temperature=0.2") == {
+        "power": (5.0, True),
+        "temperature": (0.2, False),
+    }
+
+
+@pytest.mark.parametrize(
+    "raw", ["power=nan", "power=-1", "power=inf", "power=-inf%", "power", "power=x"]
+)
+def test_parse_deadbands_rejects_invalid(raw: str) -> None:
+    """Malformed, negative and non-finite deadbands are rejected."""
+    with pytest.raises(ValueError):
+        parse_deadbands(raw)
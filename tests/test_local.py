@@ -0,0 +1,264 @@
+"""Tests for reading and switching Shelly devices over the LAN.
+
+The devices are stand-in HTTP servers on 127.0.0.1, so requests go
+through aiohttp and LocalTransport end to end.
+"""
+
+from __future__ import annotations
+
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Tuple
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.shelly_cloud2 import local as local_module
+from custom_components.shelly_cloud2.const import CONF_LOCAL_HOSTS, DOMAIN
+from custom_components.shelly_cloud2.local import LocalTransport, LocalUnavailable
+from custom_components.shelly_cloud2.recording import install_session
+
+from .conftest import StubCloud, make_entry
+
+CLOUD_UPDATED = "2024-01-01 00:00:00"
+
+RELAY_STATE = {
+    "id": "dev1",
+    "type": "relay",
+    "online": 1,
+    "status": {
+        "relays": [{"ison": False}],
+        "cloud": {"connected": True},
+        "getinfo": {"fw_info": {"fw": "20230913-112003/v1.14.0-gcb84623"}},
+        "_updated": CLOUD_UPDATED,
+    },
+    "settings": {"name": "Plug"},
+}
+
+Requests = List[Tuple[str, str, Any]]
+Serve = Callable[[web.Application], Awaitable[str]]
+
+
+@pytest.fixture
+async def session() -> AsyncIterator[aiohttp.ClientSession]:
+    """Return a real aiohttp session for the stand-in devices."""
+    async with aiohttp.ClientSession() as client_session:
+        yield client_session
+
+
+@pytest.fixture
+async def serve() -> AsyncIterator[Serve]:
+    """Start stand-in devices and return their host:port."""
+    servers: List[TestServer] = []
+
+    async def _serve(app: web.Application) -> str:
+        server = TestServer(app, host="127.0.0.1")
+        await server.start_server()
+        servers.append(server)
+        return f"127.0.0.1:{server.port}"
+
+    yield _serve
+    for server in servers:
+        await server.close()
+
+
+def _gen1_device(requests: Requests, ison: bool) -> web.Application:
+    """Return a Gen1 relay answering /shelly, /status and /relay/<n>."""
+
+    async def _shelly(request: web.Request) -> web.Response:
+        requests.append((request.method, request.path_qs, None))
+        return web.json_response({"type": "SHSW-1", "fw": "v1.14.0"})
+
+    async def _status(request: web.Request) -> web.Response:
+        requests.append((request.method, request.path_qs, None))
+        return web.json_response({"relays": [{"ison": ison}]})
+
+    async def _relay(request: web.Request) -> web.Response:
+        requests.append((request.method, request.path_qs, None))
+        return web.json_response({"ison": request.query.get("turn") == "on"})
+
+    app = web.Application()
+    app.router.add_get("/shelly", _shelly)
+    app.router.add_get("/status", _status)
+    app.router.add_get("/relay/{channel}", _relay)
+    return app
+
+
+def _gen2_device(requests: Requests) -> web.Application:
+    """Return a Gen2 switch answering /shelly and JSON-RPC on /rpc."""
+
+    async def _shelly(request: web.Request) -> web.Response:
+        requests.append((request.method, request.path_qs, None))
+        return web.json_response({"gen": 2, "ver": "1.0.8"})
+
+    async def _rpc(request: web.Request) -> web.Response:
+        body: Dict[str, Any] = await request.json()
+        requests.append((request.method, request.path_qs, body))
+        if body["method"] == "Shelly.GetStatus":
+            result: Dict[str, Any] = {"switch:0": {"id": 0, "output": True}}
+        else:
+            result = {"was_on": False}
+        return web.json_response({"id": body["id"], "result": result})
+
+    app = web.Application()
+    app.router.add_get("/shelly", _shelly)
+    app.router.add_post("/rpc", _rpc)
+    return app
+
+
+def _broken_device(requests: Requests) -> web.Application:
+    """Return a device that answers every request with HTTP 500."""
+
+    async def _fail(request: web.Request) -> web.Response:
+        requests.append((request.method, request.path_qs, None))
+        return web.Response(status=500)
+
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", _fail)
+    return app
+
+
+async def test_gen1_status_and_switch(
+    hass: HomeAssistant, session: aiohttp.ClientSession, serve: Serve
+) -> None:
+    """A Gen1 device is read with GET /status and switched with /relay/<n>."""
+    requests: Requests = []
+    host = await serve(_gen1_device(requests, ison=True))
+    transport = LocalTransport(hass, {"dev1": host}, session)
+
+    assert await transport.async_get_status("dev1") == {"relays": [{"ison": True}]}
+    await transport.async_set_switch("dev1", 0, on=False, toggle_after=30)
+
+    assert transport.available("dev1")
+    # The generation is asked for once
+    assert [path for _method, path, _body in requests] == [
+        "/shelly",
+        "/status",
+        "/relay/0?turn=off&timer=30",
+    ]
+
+
+async def test_gen2_rpc_status_and_switch(
+    hass: HomeAssistant, session: aiohttp.ClientSession, serve: Serve
+) -> None:
+    """A Gen2+ device is read and switched over JSON-RPC."""
+    requests: Requests = []
+    host = await serve(_gen2_device(requests))
+    transport = LocalTransport(hass, {"dev1": host}, session)
+
+    status = await transport.async_get_status("dev1")
+    await transport.async_set_switch("dev1", 0, on=True)
+
+    assert status == {"switch:0": {"id": 0, "output": True}}
+    rpc = [body for _method, path, body in requests if path == "/rpc"]
+    assert rpc[0]["method"] == "Shelly.GetStatus"
+    assert rpc[1]["method"] == "Switch.Set"
+    assert rpc[1]["params"] == {"id": 0, "on": True}
+
+
+async def test_http_error_marks_device_unavailable(
+    hass: HomeAssistant, session: aiohttp.ClientSession, serve: Serve
+) -> None:
+    """A device answering with an HTTP error is left to the cloud."""
+    host = await serve(_broken_device([]))
+    transport = LocalTransport(hass, {"dev1": host}, session)
+
+    with pytest.raises(LocalUnavailable):
+        await transport.async_get_status("dev1")
+
+    assert not transport.available("dev1")
+
+
+async def test_refused_connection_marks_device_unavailable(
+    hass: HomeAssistant, session: aiohttp.ClientSession
+) -> None:
+    """A device nothing listens for is left to the cloud."""
+    server = TestServer(web.Application(), host="127.0.0.1")
+    await server.start_server()
+    host = f"127.0.0.1:{server.port}"
+    await server.close()
+    transport = LocalTransport(hass, {"dev1": host}, session)
+
+    with pytest.raises(LocalUnavailable):
+        await transport.async_get_status("dev1")
+
+    assert not transport.available("dev1")
+
+
+async def _async_setup_hub(
+    hass: HomeAssistant,
+    session: aiohttp.ClientSession,
+    monkeypatch: pytest.MonkeyPatch,
+    host: str,
+    cloud: StubCloud,
+) -> Any:
+    """Set up an entry whose device dev1 is reachable at host."""
+    monkeypatch.setattr(local_module, "async_get_clientsession", lambda hass: session)
+    entry = make_entry(["dev1"], {CONF_LOCAL_HOSTS: f"dev1={host}"})
+    entry.add_to_hass(hass)
+    install_session(hass, entry, cloud)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+async def test_hub_reads_lan_and_keeps_cloud_metadata(
+    hass: HomeAssistant,
+    session: aiohttp.ClientSession,
+    serve: Serve,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A LAN-read device keeps its firmware and gets a fresh update time."""
+    requests: Requests = []
+    host = await serve(_gen1_device(requests, ison=True))
+    cloud = StubCloud({"dev1": RELAY_STATE})
+    entry = await _async_setup_hub(hass, session, monkeypatch, host, cloud)
+    hub = hass.data[DOMAIN][entry.entry_id]
+    # The first refresh has no payload to merge into, so it used the cloud
+    assert cloud.fetched() == [["dev1"]]
+    assert requests == []
+
+    await hub.async_refresh()
+
+    status = hub.data["dev1"]["status"]
+    assert status["relays"] == [{"ison": True}]
+    assert status["getinfo"] == RELAY_STATE["status"]["getinfo"]
+    assert status["_updated"] != CLOUD_UPDATED
+    assert hub.device_meta("dev1").firmware == "20230913-112003/v1.14.0-gcb84623"
+    assert cloud.fetched() == [["dev1"]]
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_unreachable_device_falls_back_to_cloud(
+    hass: HomeAssistant,
+    session: aiohttp.ClientSession,
+    serve: Serve,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """The hub reads a device from the cloud when the LAN fails."""
+    requests: Requests = []
+    host = await serve(_broken_device(requests))
+    cloud = StubCloud({"dev1": RELAY_STATE})
+    entry = await _async_setup_hub(hass, session, monkeypatch, host, cloud)
+    hub = hass.data[DOMAIN][entry.entry_id]
+    assert len(cloud.fetched()) == 1
+
+    await hub.async_refresh()
+
+    assert hub.last_update_success
+    assert hub.data["dev1"]["status"]["relays"] == [{"ison": False}]
+    assert len(requests) == 1
+    assert len(cloud.fetched()) == 2
+
+    await hub.async_refresh()
+
+    # Within the retry period the LAN is skipped
+    assert len(requests) == 1
+    assert len(cloud.fetched()) == 3
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
@@ -0,0 +1,67 @@
+"""Tests for the polling back-off of offline devices."""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.shelly_cloud2.const import (
+    DOMAIN,
+    OFFLINE_BACKOFF_INITIAL,
+)
+from custom_components.shelly_cloud2.recording import install_session
+
+from .conftest import StubCloud, make_entry
+
+
+def _relay(device_id: str, online: bool) -> Dict[str, Any]:
+    """Return a Gen1 relay payload."""
+    return {
+        "id": device_id,
+        "type": "relay",
+        "online": 1 if online else 0,
+        "status": {"relays": [{"ison": False}], "cloud": {"connected": online}},
+        "settings": {"name": f"Plug {device_id}"},
+    }
+
+
+def _make_due(hub: Any, device_id: str) -> None:
+    """Let the back-off of an offline device run out."""
+    _probe_at, backoff = hub._offline[device_id]
+    hub._offline[device_id] = (0.0, backoff)
+
+
+async def test_offline_device_is_backed_off(hass: HomeAssistant) -> None:
+    """Offline devices are skipped until their doubling back-off runs out."""
+    cloud = StubCloud({"on": _relay("on", True), "off": _relay("off", False)})
+    entry = make_entry(["on", "off"])
+    entry.add_to_hass(hass)
+    install_session(hass, entry, cloud)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    hub = hass.data[DOMAIN][entry.entry_id]
+    assert hub._offline["off"][1] == OFFLINE_BACKOFF_INITIAL
+
+    await hub.async_refresh()
+
+    # Only the online device is fetched; the offline one keeps its payload
+    assert cloud.fetched()[-1] == ["on"]
+    assert set(hub.data) == {"on", "off"}
+
+    _make_due(hub, "off")
+    await hub.async_refresh()
+
+    assert cloud.fetched()[-1] == ["on", "off"]
+    assert hub._offline["off"][1] == 2 * OFFLINE_BACKOFF_INITIAL
+
+    cloud.states["off"] = _relay("off", True)
+    _make_due(hub, "off")
+    await hub.async_refresh()
+
+    assert "off" not in hub._offline
+    await hub.async_refresh()
+    assert cloud.fetched()[-1] == ["on", "off"]
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
@@ -0,0 +1,169 @@
+"""Tests for trace replay and the scale benchmark."""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+from homeassistant.core import HomeAssistant
+
+from pytest_homeassistant_custom_component.test_util.aiohttp import (
+    AiohttpClientMocker,
+)
+
+from custom_components.shelly_cloud2.const import (
+    CONF_CAPTURE_TRACE,
+    CONF_POWER_STATISTICS,
+    DOMAIN,
+)
+from custom_components.shelly_cloud2.engine import DATA_ENGINES
+from custom_components.shelly_cloud2.recording import (
+    TraceRecorder,
+    TraceReplaySession,
+    async_replay_trace,
+    install_session,
+    load_trace,
+)
+
+from .conftest import GET_URL, make_entry
+
+BENCHMARK = Path(__file__).resolve().parent.parent / "scripts" / "benchmark.py"
+
+
+def _relay_state(on: bool) -> Dict[str, Any]:
+    """Return a Gen1 relay payload."""
+    return {
+        "id": "dev1",
+        "type": "relay",
+        "online": 1,
+        "status": {"relays": [{"ison": on}], "cloud": {"connected": True}},
+        "settings": {"name": "Plug"},
+    }
+
+
+def _load_benchmark() -> Any:
+    """Import scripts/benchmark.py, which is not part of a package."""
+    spec = importlib.util.spec_from_file_location("shelly_benchmark", BENCHMARK)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+async def test_recorder_writes_and_stops_when_full(
+    hass: HomeAssistant, tmp_path: Path
+) -> None:
+    """Requests are written redacted and decoded until the size limit."""
+    path = tmp_path / "trace.ndjson"
+    full = []
+    recorder = TraceRecorder(
+        hass, str(path), "secret", lambda: full.append(True), max_bytes=200
+    )
+    body = {"ids": ["dev1"], "auth_key": "secret"}
+
+    recorder.record("get", body, time.monotonic(), 200, [_relay_state(True)])
+    await hass.async_block_till_done()
+
+    records = load_trace(str(path))
+    assert records[0]["req"] == {"ids": ["dev1"], "auth_key": "**REDACTED**"}
+    assert records[0]["res"] == [_relay_state(True)]
+    assert recorder.full
+    assert full == [True]
+
+    recorder.record("get", body, time.monotonic(), 200, [_relay_state(False)])
+    await hass.async_block_till_done()
+    assert len(load_trace(str(path))) == 1
+
+
+async def test_capture_off_keeps_the_hub(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Turning the capture off stops it without reloading the entry."""
+    aioclient_mock.post(GET_URL, json=[_relay_state(False)])
+    entry = make_entry(["dev1"], {CONF_CAPTURE_TRACE: True})
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    hub = hass.data[DOMAIN][entry.entry_id]
+
+    hass.config_entries.async_update_entry(
+        entry, options={**entry.options, CONF_CAPTURE_TRACE: False}
+    )
+    await hass.async_block_till_done()
+
+    assert hass.data[DOMAIN][entry.entry_id] is hub
+    assert hub._engine.recorder is None
+
+    # Any other change still reloads
+    hass.config_entries.async_update_entry(
+        entry, options={**entry.options, CONF_POWER_STATISTICS: True}
+    )
+    await hass.async_block_till_done()
+
+    assert hass.data[DOMAIN][entry.entry_id] is not hub
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_install_session_uses_the_stand_in(hass: HomeAssistant) -> None:
+    """The prepared engine talks to the given session and nothing else."""
+    entry = make_entry(["dev1"])
+    entry.add_to_hass(hass)
+    session = TraceReplaySession([])
+
+    engine = install_session(hass, entry, session)
+
+    assert engine.client.session is session
+    assert hass.data[DATA_ENGINES][engine.key] is engine
+
+
+async def test_replay_trace(hass: HomeAssistant, tmp_path: Path) -> None:
+    """A recorded trace is replayed through the coordinator and platforms."""
+    trace = tmp_path / "trace.ndjson"
+    trace.write_text(
+        "\n".join(
+            json.dumps(
+                {
+                    "t": n,
+                    "ep": "get",
+                    "req": {"ids": ["dev1"]},
+                    "st": 200,
+                    "ms": 1.0,
+                    "res": [_relay_state(on)],
+                }
+            )
+            for n, on in enumerate((False, True))
+        )
+        + "\n",
+        encoding="utf-8",
+    )
+    entry = make_entry(["dev1"])
+    entry.add_to_hass(hass)
+
+    report = await async_replay_trace(hass, entry, str(trace))
+
+    assert report["devices"] == 1
+    assert report["totals"]["cycles"] == 1
+    assert report["totals"]["state_writes"] >= 1
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_benchmark_run(hass: HomeAssistant) -> None:
+    """The benchmark sets up a synthetic fleet and measures its poll cycles."""
+    benchmark = _load_benchmark()
+    mix = benchmark.parse_mix("G1=1,G2=1,G3=1")
+
+    run = await benchmark.async_benchmark(hass, 6, mix, cycles=2, seed=0)
+
+    assert run["devices"] == 6
+    assert run["mix"] == {"G1": 2, "G2": 2, "G3": 2}
+    assert run["entities"] > 0
+    assert "switch" in run["setup"]["platforms"]
+    assert run["setup"]["platforms"]["switch"]["entities"] == 2 + 4 + 2
+    assert len(run["cycles"]) == 2
+    json.dumps(run)
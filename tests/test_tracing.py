@@ -0,0 +1,162 @@
+"""Tests for the per-request spans of the fetch engine."""
+
+from __future__ import annotations
+
+import logging
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.shelly_cloud2 import engine as engine_module
+from custom_components.shelly_cloud2.client import SetSwitchRequest
+from custom_components.shelly_cloud2.tracing import (
+    InMemorySpanExporter,
+    LogSpanExporter,
+    RequestSpan,
+    RequestTracer,
+)
+
+from .conftest import StubCloud, make_engine
+
+STATES = {
+    dev_id: {"id": dev_id, "type": "relay", "online": 1, "status": {}}
+    for dev_id in ("dev1", "dev2", "dev3")
+}
+
+
+def _span(**kwargs: object) -> RequestSpan:
+    """Return a successful state request span, with fields overridden."""
+    fields: dict = {
+        "endpoint": "get",
+        "chunk_index": 0,
+        "device_count": 2,
+        "queue_wait": 0.001,
+        "duration": 0.25,
+        "status": 200,
+        "payload_bytes": 512,
+        "decode_time": 0.002,
+    }
+    fields.update(kwargs)
+    return RequestSpan(**fields)
+
+
+class _FailingExporter:
+    """Exporter that raises on every span."""
+
+    def export(self, span: RequestSpan) -> None:
+        raise RuntimeError("exporter down")
+
+
+def test_tracer_adds_and_removes_exporters() -> None:
+    """Spans reach registered exporters until they are removed."""
+    tracer = RequestTracer()
+    exporter = InMemorySpanExporter()
+
+    remove = tracer.add_exporter(exporter)
+    tracer.emit(_span())
+    remove()
+    tracer.emit(_span(chunk_index=1))
+
+    assert [span.chunk_index for span in exporter.spans] == [0]
+    assert tracer.exporters == []
+
+
+def test_failing_exporter_does_not_stop_the_others(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """An exporter that raises is logged and the others still get the span."""
+    tracer = RequestTracer()
+    exporter = InMemorySpanExporter()
+    tracer.add_exporter(_FailingExporter())
+    tracer.add_exporter(exporter)
+
+    tracer.emit(_span())
+
+    assert len(exporter.spans) == 1
+    assert "Span exporter" in caplog.text
+
+
+def test_log_exporter_writes_one_line(caplog: pytest.LogCaptureFixture) -> None:
+    """The log exporter writes each span as one line at its level."""
+    logger = logging.getLogger("tests.shelly_cloud2.spans")
+    caplog.set_level(logging.INFO, logger=logger.name)
+
+    LogSpanExporter(logger, logging.INFO).export(_span())
+
+    assert len(caplog.records) == 1
+    message = caplog.records[0].getMessage()
+    assert message.startswith("get chunk=0 devices=2 ")
+    assert "status=200" in message
+    assert "bytes=512" in message
+
+
+def test_in_memory_exporter_clear() -> None:
+    """clear forgets the spans collected so far."""
+    exporter = InMemorySpanExporter()
+    exporter.export(_span())
+
+    exporter.clear()
+
+    assert exporter.spans == []
+
+
+async def test_engine_emits_one_span_per_chunk(hass: HomeAssistant) -> None:
+    """Every state request is traced with its chunk, size and payload."""
+    cloud = StubCloud(STATES)
+    engine = make_engine(hass, cloud, chunk_size_max=2)
+    exporter = InMemorySpanExporter()
+    engine.tracer.add_exporter(exporter)
+
+    await engine.async_fetch_states(["dev1", "dev2", "dev3"])
+
+    assert [(s.chunk_index, s.device_count) for s in exporter.spans] == [
+        (0, 2),
+        (1, 1),
+    ]
+    for span in exporter.spans:
+        assert span.endpoint == "get"
+        assert span.status == 200
+        assert span.payload_bytes > 0
+        assert span.decode_time is not None
+        assert span.error is None
+
+
+async def test_engine_traces_failed_and_control_requests(
+    hass: HomeAssistant,
+) -> None:
+    """Failed requests carry their status and control requests no chunk."""
+    cloud = StubCloud(STATES)
+    engine = make_engine(hass, cloud)
+    exporter = InMemorySpanExporter()
+    engine.tracer.add_exporter(exporter)
+
+    await engine.async_send_control(SetSwitchRequest("dev1", 0, on=True))
+    cloud.status = 500
+    with pytest.raises(UpdateFailed):
+        await engine.async_fetch_states(["dev1"])
+
+    control, failed = exporter.spans
+    assert control.endpoint == "set/switch"
+    assert control.chunk_index is None
+    assert control.device_count == 1
+    assert control.status == 200
+    assert failed.endpoint == "get"
+    assert failed.status == 500
+
+
+async def test_no_spans_without_exporters(
+    hass: HomeAssistant, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Without an exporter the engine does not build spans at all."""
+
+    def _fail(**kwargs: object) -> RequestSpan:
+        raise AssertionError("span built without an exporter")
+
+    monkeypatch.setattr(engine_module, "RequestSpan", _fail)
+    engine = make_engine(hass, StubCloud(STATES))
+
+    states = await engine.async_fetch_states(["dev1", "dev2"])
+
+    assert set(states) == {"dev1", "dev2"}